@@ -1,16 +1,19 @@
 import asyncio
 import threading
 import os
-import json
 import sys
-import subprocess
 import shutil
-from gtts import gTTS
 import base64
 from services import auth_service
 from data import tokens as token_manager
 from event_bus import bus
 import data.database as db
+from data.usage_counters import command_counters
+from services.attendance_service import attendance_service
+from services.tts_service import tts_service
+from services.tts_scheduler import PRIORITY_STREAMER
+from services.tts_cache import tts_cache
+from data.config_store import config_store
 from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build
 import csv  # <--- NUEVO
@@ -19,17 +22,13 @@ import webview # <--- Necesario para el diálogo de guardar
 # Asegúrate de importar el servicio que creamos
 from services.youtube_service import yt_listener
 from data.database import (
-    log_user_assistance,
     get_all_asistencias,
     get_connection
 )
 
 APP_DATA = os.path.join(os.getenv("LOCALAPPDATA"), "StreamCoreData")
-ASISTENCIA_CONFIG_FILE = os.path.join(APP_DATA, "asistencia_config.json")
 SOUNDS_DIR = os.path.join(APP_DATA, "sounds") 
 TTS_DIR = os.path.join(APP_DATA, "audio_tts")
-TTS_CONFIG_FILE = os.path.join(APP_DATA, "tts_config.json")
-SETTINGS_FILE = os.path.join(APP_DATA, "settings.json")
 os.makedirs(SOUNDS_DIR, exist_ok=True)
 os.makedirs(TTS_DIR, exist_ok=True)
 
@@ -47,28 +46,21 @@ ffmpeg_exe = get_resource_path(os.path.join("bin", "ffmpeg.exe"))
 ffmpeg_path = get_resource_path(os.path.join("bin", "ffmpeg.exe"))
 ffprobe_path = get_resource_path(os.path.join("bin", "ffprobe.exe"))
 
-asistencias_registradas = set()
-asistencias_lock = threading.Lock()
-
 class Api:
+    """
+    Puente con el frontend (js_api de pywebview). Se crea una sola vez desde
+    AppContext; construirla no tiene efectos secundarios: la reconexión de
+    Kick/YouTube la lanza AppContext.start() con start_background_services().
+    """
     def __init__(self):
         print("(API) Instancia creada.")
-        
+
+    def start_background_services(self):
+        """Reconexiones automáticas al iniciar la app (una sola vez)."""
         if token_manager.check_tokens_exist("kick"):
             print("(API) Reconectando Kick automáticamente...")
             self.run_kick_auth()
-
-        # Cargar config TTS inicial
-        self.tts_config = {
-            "voice": "es-ES-Standard-A",
-            "speed": 1.0,
-            "pitch": 1.0,
-            "volume": 80,
-            "tts_permission": "all" # Valor por defecto seguro
-        }
-        self.load_tts_config()
         self.start_youtube_listener_if_configured()
-        pass
 
     def get_all_auth_status(self):
         print("(API) Solicitando estado de autenticación de todas las plataformas...")
@@ -155,24 +147,41 @@ class Api:
         return {"success": success, "message": f"Desvinculación de {platform} {'exitosa' if success else 'fallida'}."}
     
     def get_commands(self):
+        command_counters.flush()  # Que la tabla muestre usos/contadores al día
         bus.publish("stats:updated", {})
         return db.get_commands()
 
     def create_command(self, data):
         bus.publish("stats:updated", {})
-        return db.create_command(data)
+        result = db.create_command(data)
+        if result.get("success"):
+            bus.publish("commands:changed", {"action": "upsert", "id": result["id"]})
+        return result
 
     def update_command(self, command_id, data):
-        return db.update_command(command_id, data)
+        # Volcamos antes: si cambia el nombre, los deltas pendientes irían al nombre viejo
+        command_counters.flush()
+        result = db.update_command(command_id, data)
+        command_counters.invalidate()
+        if result.get("success"):
+            bus.publish("commands:changed", {"action": "upsert", "id": command_id})
+        return result
 
     def delete_command(self, command_id):
-        return db.delete_command(command_id)
+        command_counters.flush()
+        result = db.delete_command(command_id)
+        command_counters.invalidate()
+        bus.publish("commands:changed", {"action": "delete", "id": command_id})
+        return result
 
     def toggle_command_status(self, command_id, status):
         bus.publish("stats:updated", {})
-        return db.toggle_command_status(command_id, status)
+        result = db.toggle_command_status(command_id, status)
+        bus.publish("commands:changed", {"action": "upsert", "id": command_id})
+        return result
         
     def get_all_asistencias(self):
+        attendance_service.flush()
         return db.get_all_asistencias()
     
     # ---------------------------------------------------------
@@ -188,28 +197,34 @@ class Api:
             if not settings.get('command'):
                 return {"success": False, "error": "El comando no puede estar vacío."}
 
-            self.tts_config.update({
+            tts_config = config_store.update("tts", {
                 'command': settings.get('command'),
                 'tts_permission': settings.get('tts_permission'), # <--- CORREGIDO AQUÍ
                 'banned_words': settings.get('banned_words'),
             })
 
-            with open(TTS_CONFIG_FILE, "w") as f:
-                json.dump(self.tts_config, f, indent=4)
-
-            bus.publish("tts:command_config_updated", self.tts_config)
+            bus.publish("tts:command_config_updated", tts_config)
             return {"success": True}
         except Exception as e:
             print(f"(API) Error al guardar config de comando TTS: {e}")
             return {"success": False, "error": str(e)}
     
     def clear_tts_queue(self):
-        from services import tts_service 
-        tts_service.tts_service.clear_queue()
+        tts_service.clear_queue()
         return {"success": True}
 
+    def get_tts_queue(self):
+        """Cola real del TTS: lo que suena, lo que se prepara y lo que espera."""
+        return {"success": True, "data": tts_service.queue_snapshot()}
+
+    def remove_tts_item(self, item_id):
+        return {"success": tts_service.remove(item_id)}
+
+    def skip_tts(self):
+        return {"success": tts_service.skip()}
+
     def get_tts_global_status(self):
-        config = self.tts_config.copy()
+        config = config_store.get("tts")
         config.setdefault('tts_enabled', True)
         config.setdefault('tts_command_enabled', True)
         config.setdefault('tts_permission', 'all') # Default a 'all'
@@ -217,86 +232,64 @@ class Api:
 
     def toggle_tts_status(self, is_enabled: bool):
         try:
-            self.tts_config['tts_enabled'] = is_enabled
-            with open(TTS_CONFIG_FILE, "w") as f:
-                json.dump(self.tts_config, f, indent=4)
-            bus.publish("tts:config", self.tts_config)
+            tts_config = config_store.update("tts", {'tts_enabled': is_enabled})
+            bus.publish("tts:config", tts_config)
             return {"success": True, "enabled": is_enabled}
         except Exception as e:
             return {"success": False, "error": str(e)}
     
     def get_tts_config(self):
-        return {"success": True, "data": self.tts_config}
+        return {"success": True, "data": config_store.get("tts")}
 
     def update_tts_settings(self, settings):
         print(f"(API) Actualizando TTS: {settings}")
         try:
-            self.tts_config.update(settings)
-            with open(TTS_CONFIG_FILE, "w") as f:
-                json.dump(self.tts_config, f, indent=4)
-            bus.publish("tts:config", self.tts_config)
+            tts_config = config_store.update("tts", settings)
+            bus.publish("tts:config", tts_config)
             return {"success": True}
         except Exception as e:
             return {"success": False, "error": str(e)}
         
     def load_tts_config(self):
-        try:
-            if os.path.exists(TTS_CONFIG_FILE):
-                with open(TTS_CONFIG_FILE, "r") as f:
-                    self.tts_config.update(json.load(f))
-        except: pass
+        """Vuelve a leer tts_config.json del disco."""
+        config_store.reload("tts")
     
     def generate_tts(self, text):
         if not text or text.strip() == "":
             return {"success": False, "error": "Texto vacío"}
 
-        raw_path = os.path.join(TTS_DIR, "preview_raw.mp3")
-        final_path = os.path.join(TTS_DIR, "preview_final.mp3")
-
         try:
-            tts = gTTS(text=text, lang="es", slow=False)
-            tts.save(raw_path)
-
-            ui_speed = float(self.tts_config.get("speed", 0.6))
-            real_speed = ui_speed 
-            
-            base_rate = 44100
-            new_rate = int(base_rate * real_speed)
-
-            cmd = [
-                FFMPEG_EXE, 
-                "-y", "-i", raw_path, 
-                "-af", f"asetrate={new_rate},aresample={base_rate}", 
-                "-v", "error", final_path
-            ]
-            
-            subprocess.run(cmd, check=True, creationflags=subprocess.CREATE_NO_WINDOW if os.name=='nt' else 0)
-
-            with open(final_path, "rb") as f:
-                b64_audio = base64.b64encode(f.read()).decode("utf-8")
-
-            try:
-                os.remove(raw_path)
-                os.remove(final_path)
-            except: pass
+            mime, audio = tts_service.render_preview(text)
+            b64_audio = base64.b64encode(audio).decode("utf-8")
 
             return {
                 "success": True, 
-                "data": f"data:audio/mp3;base64,{b64_audio}"
+                "data": f"data:{mime};base64,{b64_audio}"
             }
 
         except Exception as e:
             print(f"(API Test Error) {e}")
             return {"success": False, "error": f"Error: {str(e)}"}
+
+    def get_tts_stats(self):
+        """Tiempo hasta el primer audio del TTS (avg/p50/p95 en ms), cola y caché."""
+        return {"success": True, "data": tts_service.stats()}
+
+    def get_tts_cache_stats(self):
+        """Aciertos, fallos y tamaño de la caché de audio TTS."""
+        return {"success": True, "data": tts_cache.stats()}
+
+    def clear_tts_cache(self):
+        tts_cache.clear()
+        return {"success": True}
     
     def tts_enqueue(self, user, message):
-        if not message: return {"success": False}
-        bus.publish("tts:speak", {"user": user, "message": message})
-        bus.publish("tts:new", {"user": user, "message": message, "audio": None})
-        return {"success": True}
+        # Pruebas desde el panel: las lanza el streamer, van por delante del chat
+        return {"success": tts_service.enqueue(user, message, priority=PRIORITY_STREAMER)}
     
     def get_asistencias(self):
         try:
+            attendance_service.flush()  # Que la tabla incluya lo registrado hace un instante
             asistencias = get_all_asistencias()
             return {"success": True, "data": asistencias}
         except Exception as e:
@@ -304,16 +297,8 @@ class Api:
 
     def registrar_asistencia(self, nickname, platform):
         try:
-            nickname = nickname.lower()
-            platform = platform.lower()
-
-            global asistencias_registradas
-            with asistencias_lock:
-                if (nickname, platform) in asistencias_registradas:
-                    return {"success": False, "error": "Ya registraste tu asistencia en esta sesión 😊"}
-                asistencias_registradas.add((nickname, platform))
-
-            log_user_assistance(nickname, platform)
+            if not attendance_service.register(nickname, platform):
+                return {"success": False, "error": "Ya registraste tu asistencia en esta sesión 😊"}
             return {"success": True, "message": "Asistencia registrada"}
 
         except Exception as e:
@@ -321,6 +306,7 @@ class Api:
 
     def delete_asistencia(self, asistencia_id):
         try:
+            attendance_service.flush()
             with get_connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute("DELETE FROM asistencias WHERE id = ?", (asistencia_id,))
@@ -335,6 +321,7 @@ class Api:
     def editar_asistencia(self, asistencia_id, nuevo_total):
         try:
             nuevo_total = int(nuevo_total)
+            attendance_service.flush()
             with get_connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute(
@@ -352,29 +339,11 @@ class Api:
             return {"success": False, "error": str(e)}
 
     def get_asistencia_config(self):
-            default_config = {
-                "command": "!asistencia",
-                "aliases": "",
-                "cooldown": 0,
-                "reset_mode": "stream",
-                "sound_enabled": False,
-                "sound_file": "",
-                "msg_success": "@{user}, tu asistencia ha sido registrada correctamente ✔️",
-                "msg_error": "@{user}, ya registraste tu asistencia hoy ❌"
-            }
-            try:
-                if os.path.exists(ASISTENCIA_CONFIG_FILE):
-                    with open(ASISTENCIA_CONFIG_FILE, "r", encoding="utf-8") as f:
-                        saved = json.load(f)
-                        default_config.update(saved)
-            except Exception as e:
-                print(f"(API) Error leyendo config asistencia: {e}")
-            return {"success": True, "data": default_config}
+        return {"success": True, "data": config_store.get("asistencia")}
 
     def update_asistencia_config(self, config):
         try:
-            with open(ASISTENCIA_CONFIG_FILE, "w", encoding="utf-8") as f:
-                json.dump(config, f, indent=4)
+            config_store.update("asistencia", config)
             print("(API) Configuración de asistencia actualizada.")
             bus.publish("asistencia:config_updated", config)
             return {"success": True}
@@ -417,18 +386,38 @@ class Api:
 
     def reset_session_asistencias(self):
         try:
-            global asistencias_registradas
-            with asistencias_lock:
-                asistencias_registradas.clear()
+            attendance_service.reset_session()
             return {"success": True, "message": "Sesión reiniciada."}
         except Exception as e:
             return {"success": False, "error": str(e)}
         
     def clear_database_platform(self, platform):
+        attendance_service.flush()
         return db.clear_all_asistencias(platform)
         
     def get_command_stats(self):
+         command_counters.flush()
          return db.get_command_stats()
+
+    def get_event_bus_metrics(self):
+        """Latencias, errores y colas del bus de eventos, por tema y suscriptor."""
+        return {
+            "success": True,
+            "data": {
+                "enabled": bus.metrics_enabled(),
+                "topics": bus.metrics_snapshot(),
+                "queues": bus.queue_stats(),
+            }
+        }
+
+    def get_twitch_send_stats(self):
+        """Estado de la cola de salida de Twitch (profundidad, límite activo, tiempo hasta envío)."""
+        from connectors import twitch_connector
+        return {"success": True, "data": twitch_connector.twitch_connector_instance.send_stats()}
+
+    def set_event_bus_metrics(self, is_enabled: bool):
+        bus.set_metrics_enabled(bool(is_enabled))
+        return {"success": True, "enabled": bus.metrics_enabled()}
      
     def run_youtube_auth(self):
        """Inicia login de Google solo para obtener el ID del canal."""
@@ -471,8 +460,7 @@ class Api:
                    "username": title,
                    "profile_pic": img
                }
-               with open(os.path.join(APP_DATA, "youtube_config.json"), "w") as f:
-                   json.dump(yt_config, f)
+               config_store.update("youtube", yt_config)
                # ARRANCAR PYTCHAT
                yt_listener.start(channel_id)
                bus.publish("auth:youtube_completed", {"success": True, "username": title})
@@ -484,14 +472,11 @@ class Api:
 
     def start_youtube_listener_if_configured(self):
         """Reconectar automáticamente al iniciar la app"""
-        path = os.path.join(APP_DATA, "youtube_config.json")
-        if os.path.exists(path):
-            try:
-                with open(path, "r") as f:
-                    data = json.load(f)
-                    if "channel_id" in data:
-                        yt_listener.start(data["channel_id"])
-            except: pass
+        try:
+            data = config_store.get("youtube")
+            if "channel_id" in data:
+                yt_listener.start(data["channel_id"])
+        except: pass
 
     def exportar_csv(self, platform):
         """Genera un CSV de asistencia y pide al usuario dónde guardarlo"""
@@ -500,6 +485,7 @@ class Api:
         try:
             # 1. Obtener datos filtrados
             # Reutilizamos tu función existente que trae todo y filtramos aquí
+            attendance_service.flush()
             todas = db.get_all_asistencias() 
             datos_filtrados = [row for row in todas if row['platform'] == platform]
 
@@ -554,53 +540,22 @@ class Api:
         
     def get_modules_status(self):
         """Devuelve el estado (ON/OFF) de cada módulo global."""
-        default_settings = {
-            "tts_enabled": True,        # Este ya existía en tts_config, pero lo centralizamos visualmente
-            "commands_enabled": True,   # Nuevo
-            "attendance_enabled": True  # Nuevo
-        }
-        
-        # 1. Leer config de settings general
-        try:
-            if os.path.exists(SETTINGS_FILE):
-                with open(SETTINGS_FILE, "r") as f:
-                    default_settings.update(json.load(f))
-            else:
-                # Si no existe, lo creamos
-                with open(SETTINGS_FILE, "w") as f:
-                    json.dump(default_settings, f)
-        except: pass
-
-        # Sincronización especial para TTS (que tiene su propio config)
-        # Priorizamos lo que diga tts_config.json si existe
-        if os.path.exists(TTS_CONFIG_FILE):
-            try:
-                with open(TTS_CONFIG_FILE, "r") as f:
-                    tts_data = json.load(f)
-                    default_settings['tts_enabled'] = tts_data.get('tts_enabled', True)
-            except: pass
-
-        return {"success": True, "data": default_settings}
+        return {"success": True, "data": config_store.modules_state()}
 
     def toggle_module_status(self, module_name, is_enabled):
         """Activa o desactiva un módulo completo."""
         print(f"(API) Toggle módulo {module_name} -> {is_enabled}")
         
         try:
-            # Cargar actual
-            current = self.get_modules_status().get("data", {})
-            current[module_name] = is_enabled # Actualizar valor
-
-            # Guardar en settings.json
-            with open(SETTINGS_FILE, "w") as f:
-                json.dump(current, f, indent=4)
+            # Actualizar y guardar en settings.json
+            config_store.update("settings", {module_name: is_enabled})
 
             # CASO ESPECIAL: TTS (Tiene su propio archivo y sistema)
             if module_name == "tts_enabled":
                 self.toggle_tts_status(is_enabled) # Llama a tu función existente
 
             # Notificar al sistema (Chat Processor)
-            bus.publish("system:modules_updated", current)
+            bus.publish("system:modules_updated", config_store.modules_state())
 
             return {"success": True}
         except Exception as e:
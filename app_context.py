@@ -0,0 +1,93 @@
+import asyncio
+import threading
+from event_bus import bus
+import data.database as db
+from data.config_store import config_store
+
+
+class AppContext:
+    """
+    Contenedor único de servicios de la app.
+
+    build() importa y crea cada pieza una sola vez (Api, TTS, asistencias,
+    contadores, registro de comandos, conectores, procesadores); los módulos
+    se suscriben al bus al importarse. start() lanza el trabajo de arranque
+    (reconexión de Kick/YouTube) y shutdown() lo cierra todo en orden.
+    """
+    def __init__(self):
+        self.bus = bus
+        self.db = db
+        self.config = config_store
+        self.api = None
+        self.tts = None
+        self.attendance = None
+        self.counters = None
+        self.commands = None
+        self.twitch = None
+        self.kick = None
+        self.youtube = None
+        self._lock = threading.Lock()
+        self._built = False
+        self._started = False
+
+    def build(self):
+        """Crea los servicios (idempotente)."""
+        with self._lock:
+            if self._built:
+                return self
+            from api import Api
+            from processing import chat_processor, sender_processor  # noqa: F401 (se suscriben al bus)
+            from processing.command_registry import command_registry
+            from services.tts_service import tts_service
+            from services.attendance_service import attendance_service
+            from services.youtube_service import yt_listener
+            from data.usage_counters import command_counters
+            from connectors import twitch_connector, kick_connector
+
+            self.tts = tts_service
+            self.attendance = attendance_service
+            self.counters = command_counters
+            self.commands = command_registry
+            self.youtube = yt_listener
+            self.twitch = twitch_connector.twitch_connector_instance
+            self.kick = kick_connector.kick_connector_instance
+            self.api = Api()
+            self._built = True
+            return self
+
+    def start(self):
+        """Trabajo de arranque que antes repetía cada Api(): solo la primera vez."""
+        self.build()
+        with self._lock:
+            if self._started:
+                return self
+            self._started = True
+        self.api.start_background_services()
+        return self
+
+    def shutdown(self):
+        """Detiene conectores y vuelca lo pendiente (contadores, asistencias) antes de cerrar el bus."""
+        if not self._built:
+            bus.shutdown()
+            return
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            print("   - Solicitando detención de Kick...")
+            loop.run_until_complete(self.kick.stop())
+        except Exception as e: print(f"   - Error deteniendo Kick: {e}")
+
+        try:
+            print("   - Solicitando detención de Twitch...")
+            self.twitch.stop()
+        except Exception as e: print(f"   - Error deteniendo Twitch: {e}")
+
+        print("\nAplicación cerrada. Deteniendo componentes...")
+        self.tts.stop()
+        bus.shutdown()           # Antes que los volcados: el chat encolado aún suma usos y asistencias
+        self.counters.close()    # Último volcado de usos/contadores
+        self.attendance.close()  # Últimas asistencias pendientes
+        loop.close()
+
+
+context = AppContext()
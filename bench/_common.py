@@ -0,0 +1,36 @@
+"""Utilidades compartidas por los benchmarks (se ejecutan con: python bench/<script>.py)."""
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+# Datos en una carpeta temporal: los benchmarks nunca tocan la BD ni la config reales
+# (Windows usa LOCALAPPDATA; Linux, XDG_DATA_HOME)
+DATA_DIR = tempfile.mkdtemp(prefix="streamcore-bench-")
+os.environ["LOCALAPPDATA"] = DATA_DIR
+os.environ["XDG_DATA_HOME"] = DATA_DIR
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+
+def best_of(fn, number, repeat=5):
+    """Mejor tiempo por llamada (segundos) de 'repeat' tandas de 'number' llamadas a fn()."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
+
+
+def report(label, seconds, unit="op"):
+    """Imprime una fila: tiempo por operación y operaciones por segundo."""
+    if seconds < 1e-3:
+        per = f"{seconds * 1e6:10.2f} µs"
+    else:
+        per = f"{seconds * 1e3:10.2f} ms"
+    print(f"  {label:<44} {per}/{unit}  {1 / seconds:>14,.0f} {unit}/s")
@@ -0,0 +1,34 @@
+"""
+EventBus tal como estaba antes de las optimizaciones (referencia para los
+benchmarks): un hilo + asyncio.run() por callback async, iscoroutinefunction
+y print en cada publish.
+"""
+import asyncio
+import threading
+from collections import defaultdict
+
+
+class LegacyEventBus:
+    def __init__(self):
+        self._subscribers = defaultdict(list)
+
+    def subscribe(self, event_type, callback):
+        self._subscribers[event_type].append(callback)
+
+    def publish(self, event_type, data=None):
+        print(f"Publicando evento '{event_type}'...")
+        if event_type in self._subscribers:
+            for callback in self._subscribers[event_type]:
+                if asyncio.iscoroutinefunction(callback):
+                    def run_async_task(coro, data):
+                        try:
+                            asyncio.run(coro(data))
+                        except Exception as e:
+                            print(f"Error en hilo de callback async para '{event_type}': {e}")
+
+                    threading.Thread(target=run_async_task, args=(callback, data), daemon=True).start()
+                else:
+                    try:
+                        callback(data)
+                    except Exception as e:
+                        print(f"Error ejecutando callback síncrono para '{event_type}': {e}")
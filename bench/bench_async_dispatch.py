@@ -0,0 +1,61 @@
+"""
+Suscriptores async del EventBus: antes, un hilo nuevo + asyncio.run() por
+evento; ahora, el bucle persistente del bus. Mide eventos/s hasta que todos
+los callbacks han terminado y el pico de hilos vivos.
+
+    python bench/bench_async_dispatch.py
+"""
+import contextlib
+import io
+import threading
+import time
+
+from _common import report
+from _legacy_bus import LegacyEventBus
+
+from event_bus import EventBus
+
+EVENTS = 2000
+
+
+def run(bus):
+    done = threading.Event()
+    count = [0]
+    peak_threads = [threading.active_count()]
+
+    async def handler(data):
+        count[0] += 1
+        if count[0] % 100 == 0:
+            peak_threads[0] = max(peak_threads[0], threading.active_count())
+        if count[0] == EVENTS:
+            done.set()
+
+    bus.subscribe("reply", handler)
+    start = time.perf_counter()
+    for i in range(EVENTS):
+        bus.publish("reply", i)
+        if i % 100 == 0:
+            peak_threads[0] = max(peak_threads[0], threading.active_count())
+    done.wait(60)
+    elapsed = time.perf_counter() - start
+    return elapsed / EVENTS, peak_threads[0]
+
+
+def main():
+    print(f"{EVENTS} eventos a un suscriptor async")
+    quiet = contextlib.redirect_stdout(io.StringIO())
+    with quiet:
+        legacy = run(LegacyEventBus())
+    report("antes: hilo + asyncio.run por evento", legacy[0], "evento")
+    print(f"    hilos vivos (pico): {legacy[1]}")
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        bus = EventBus()
+        current = run(bus)
+        bus.shutdown()
+    report("ahora: bucle persistente del bus", current[0], "evento")
+    print(f"    hilos vivos (pico): {current[1]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Efecto de velocidad del TTS, latencia por mensaje:
+  - antes: MP3 a disco + ffmpeg archivo -> archivo + leer el WAV (como el
+    TTSService original);
+  - FFmpeg por tuberías (el camino por defecto, sin archivos temporales);
+  - NumPy en proceso con paso bajo (services/audio_fx.py, opcional con
+    'tts_effects_backend': "numpy").
+
+Entrada: ~4 s de audio MP3 mono a 24 kHz, como lo que devuelve gTTS.
+Necesita pygame, numpy y un ffmpeg: bin/ffmpeg.exe, FFMPEG=<ruta>,
+imageio-ffmpeg o ffmpeg en el PATH.
+
+    python bench/bench_audio_fx.py
+"""
+import contextlib
+import io
+import os
+import shutil
+import subprocess
+import tempfile
+
+from _common import best_of, report
+
+import pygame
+from services import audio_fx
+from services.tts_synth import StubSynthesizer, Synthesizer
+
+with contextlib.redirect_stdout(io.StringIO()):
+    from services import tts_service  # El singleton del módulo imprime al arrancar
+
+
+def find_ffmpeg():
+    candidates = [os.environ.get("FFMPEG"), tts_service.ffmpeg_exe]
+    try:
+        import imageio_ffmpeg
+        candidates.append(imageio_ffmpeg.get_ffmpeg_exe())
+    except ImportError:
+        pass
+    candidates.append(shutil.which("ffmpeg"))
+    for path in candidates:
+        if path and os.path.isfile(path):
+            return path
+    raise SystemExit("No se encontró ffmpeg (usa FFMPEG=<ruta>)")
+
+
+class _Mp3Source(Synthesizer):
+    """Devuelve siempre el mismo MP3 (declara el formato de entrada para _apply_speed_ffmpeg)."""
+    name = "bench"
+    format = "mp3"
+
+    def __init__(self, mp3: bytes):
+        self.mp3 = mp3
+
+    def synthesize(self, text: str, lang: str = "es") -> bytes:
+        return self.mp3
+
+
+def make_mp3(ffmpeg):
+    wav = StubSynthesizer(delay=0, seconds_per_char=0.04).synthesize("x" * 100)
+    return subprocess.run([ffmpeg, "-v", "error", "-f", "wav", "-i", "pipe:0", "-f", "mp3", "pipe:1"],
+                          input=wav, capture_output=True, check=True).stdout
+
+
+def legacy_file_roundtrip(ffmpeg, mp3, speed, workdir):
+    """TTSService antes: tts_raw.mp3 -> ffmpeg -> tts_final.wav -> (pygame lo cargaba del disco)."""
+    raw_file = os.path.join(workdir, "tts_raw.mp3")
+    final_file = os.path.join(workdir, "tts_final.wav")
+    with open(raw_file, "wb") as f:
+        f.write(mp3)
+    subprocess.run([ffmpeg, "-y", "-i", raw_file, "-af", f"asetrate={int(44100 * speed)},aresample=44100",
+                    "-v", "error", final_file], check=True)
+    with open(final_file, "rb") as f:
+        return f.read()
+
+
+def main():
+    ffmpeg = find_ffmpeg()
+    pygame.mixer.init()
+    tts_service.ffmpeg_exe = ffmpeg
+    mp3 = make_mp3(ffmpeg)
+    with contextlib.redirect_stdout(io.StringIO()):
+        service = tts_service.TTSService(synthesizer=_Mp3Source(mp3), autostart=False, cache=None,
+                                         subscribe=False)
+    workdir = tempfile.mkdtemp(prefix="streamcore-bench-fx-")
+    print(f"MP3 de entrada: {len(mp3):,} bytes; numpy en proceso disponible: {audio_fx.available()}")
+    for speed in (0.6, 1.0, 1.5):
+        print(f"\nvelocidad {speed}")
+        report("antes: archivos temporales + ffmpeg",
+               best_of(lambda: legacy_file_roundtrip(ffmpeg, mp3, speed, workdir), 5), "msg")
+        report("ahora: FFmpeg por tuberías (por defecto)",
+               best_of(lambda: service._apply_speed_ffmpeg(mp3, speed), 5), "msg")
+        report("opcional: NumPy en proceso",
+               best_of(lambda: audio_fx.apply_speed(mp3, "mp3", speed), 5), "msg")
+    service.stop()
+    shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Procesado del chat repartido en N workers por plataforma+usuario (como
+chat:message_received). El handler simula 2 ms de E/S (SQLite, carga de
+audio), que suelta el GIL igual que el trabajo real. Mide mensajes/s de 1 a
+8 workers y comprueba que los mensajes de cada usuario llegan en orden.
+
+    python bench/bench_chat_workers.py
+"""
+import contextlib
+import io
+import random
+import threading
+import time
+
+from _common import report
+
+from event_bus import EventBus, POLICY_BLOCK
+from connectors.chat_message import ChatMessage
+
+MESSAGES = 800
+USERS = 37
+HANDLER_SECONDS = 0.002
+
+
+def run(workers, messages):
+    with contextlib.redirect_stdout(io.StringIO()):
+        bus = EventBus()
+        bus.configure_topic("chat", maxsize=MESSAGES, policy=POLICY_BLOCK, workers=workers,
+                            shard_key=lambda m: (m.platform, m.sender))
+    seen = {}
+    lock = threading.Lock()
+    done = threading.Event()
+    count = [0]
+
+    def handler(message):
+        time.sleep(HANDLER_SECONDS)
+        with lock:
+            seen.setdefault(message.sender, []).append(int(message.content))
+            count[0] += 1
+            if count[0] == len(messages):
+                done.set()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        bus.subscribe("chat", handler)
+    start = time.perf_counter()
+    for message in messages:
+        bus.publish("chat", message)
+    done.wait(60)
+    elapsed = time.perf_counter() - start
+    bus.shutdown()
+    ordered = all(seq == sorted(seq) for seq in seen.values())
+    return elapsed, ordered
+
+
+def main():
+    rng = random.Random(3)
+    messages = [ChatMessage("twitch", f"user{rng.randrange(USERS)}", str(i)) for i in range(MESSAGES)]
+    print(f"{MESSAGES} mensajes de {USERS} usuarios, handler de {HANDLER_SECONDS * 1000:.0f} ms")
+    for workers in (1, 2, 4, 8):
+        elapsed, ordered = run(workers, messages)
+        report(f"{workers} worker(s){'' if ordered else '  ¡DESORDENADO!'}", elapsed / MESSAGES, "msg")
+
+
+if __name__ == "__main__":
+    main()
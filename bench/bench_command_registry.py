@@ -0,0 +1,73 @@
+"""
+Enrutado de '!comando': antes, una conexión SQLite + SELECT por mensaje
+(get_command_for_bot, reconstruida aquí); ahora, un .get() en el registro en
+memoria. Comandos/s con 1k y 10k comandos registrados, sobre una BD
+temporal (nunca la real).
+
+    python bench/bench_command_registry.py
+"""
+import contextlib
+import io
+import os
+import random
+
+from _common import DATA_DIR, best_of, report
+
+import data.database as db
+
+MESSAGES = 2000
+
+
+def legacy_get_command_for_bot(command_name):
+    """data.database.get_command_for_bot antes del registro en memoria."""
+    with db.get_db_conn_dict() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT * FROM comandos WHERE name = ?", (command_name.lower(),))
+        row = cursor.fetchone()
+        if row:
+            return dict(row)
+        return None
+
+
+def fill(count):
+    with db.get_connection() as conn:
+        conn.execute("DELETE FROM comandos")
+        conn.executemany(
+            "INSERT INTO comandos (name, type, response, cooldown, permission, active, active_twitch, active_kick) "
+            "VALUES (?, 'text', ?, 5, 'everyone', 1, 1, 1)",
+            [(f"!cmd{i}", f"Respuesta {i} para {{user}}") for i in range(count)],
+        )
+        conn.commit()
+
+
+def main():
+    db.DB_PATH = os.path.join(DATA_DIR, "bench.db")
+    with contextlib.redirect_stdout(io.StringIO()):
+        db.init_db()
+        fill(10)
+        from processing.command_registry import command_registry
+
+    rng = random.Random(7)
+    for count in (1_000, 10_000):
+        fill(count)
+        with contextlib.redirect_stdout(io.StringIO()):
+            command_registry.load()
+        # 90 % comandos existentes, 10 % inexistentes (typos, comandos de otros bots)
+        names = [f"!cmd{rng.randrange(count)}" if rng.random() < 0.9 else f"!nada{i}" for i in range(MESSAGES)]
+
+        def legacy():
+            for name in names:
+                legacy_get_command_for_bot(name)
+
+        def current():
+            get = command_registry.get
+            for name in names:
+                get(name)
+
+        print(f"\n{count:,} comandos registrados, {MESSAGES} mensajes")
+        report("antes: SQLite por mensaje", best_of(legacy, 1, repeat=3) / MESSAGES, "cmd")
+        report("ahora: registro en memoria", best_of(current, 1, repeat=5) / MESSAGES, "cmd")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Parseo de líneas IRC de Twitch: el camino antiguo del conector (_parse_tags
+trocea todos los tags + split del contenido) contra parse_line() con lectura
+perezosa de tags. Mensajes/s sobre un corpus con la mezcla típica de un
+canal: PRIVMSG con distintas insignias, USERNOTICE, CLEARCHAT, ROOMSTATE y PING.
+
+El corpus se genera con semilla fija (mismas líneas en cada ejecución); se
+puede pasar un archivo grabado con una línea IRC por línea:
+
+    python bench/bench_irc_parser.py [corpus.txt]
+"""
+import random
+import sys
+
+from _common import best_of, report
+
+from connectors.irc_parser import parse_line
+from connectors.roles import twitch_roles
+
+BADGES = ["", "subscriber/12", "moderator/1,subscriber/24", "vip/1", "founder/0,premium/1",
+          "broadcaster/1,subscriber/0", "subscriber/6,sub-gifter/50", "glhf-pledge/1"]
+WORDS = "hola qué tal gg buen stream jajaja xd !redes !discord saludos desde méxico pog".split()
+
+
+def build_corpus(size=5000, seed=1234):
+    rng = random.Random(seed)
+    lines = []
+    for i in range(size):
+        roll = rng.random()
+        user = f"user{rng.randrange(800)}"
+        if roll < 0.90:
+            text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 12)))
+            tags = (f"badge-info=subscriber/{rng.randrange(40)};badges={rng.choice(BADGES)};"
+                    f"client-nonce={rng.getrandbits(64):016x};color=#{rng.getrandbits(24):06X};"
+                    f"display-name={user.capitalize()};emotes=;first-msg=0;flags=;id={rng.getrandbits(64):x};"
+                    f"mod=0;returning-chatter=0;room-id=123456;subscriber=1;tmi-sent-ts=17000000{i:05d};"
+                    f"turbo=0;user-id={rng.randrange(10**8)};user-type=")
+            lines.append(f"@{tags} :{user}!{user}@{user}.tmi.twitch.tv PRIVMSG #canal :{text}")
+        elif roll < 0.95:
+            lines.append(f"@badges=subscriber/0;display-name={user};login={user};msg-id=sub;"
+                         f"system-msg={user}\\ssubscribed\\sat\\sTier\\s1.;room-id=123456 "
+                         f":tmi.twitch.tv USERNOTICE #canal :{rng.choice(WORDS)}")
+        elif roll < 0.97:
+            lines.append(f"@ban-duration=600;room-id=123456;target-user-id=99 :tmi.twitch.tv CLEARCHAT #canal :{user}")
+        elif roll < 0.98:
+            lines.append("@emote-only=0;followers-only=-1;r9k=0;room-id=123456;slow=0;subs-only=0 "
+                         ":tmi.twitch.tv ROOMSTATE #canal")
+        else:
+            lines.append("PING :tmi.twitch.tv")
+    return lines
+
+
+def legacy_parse_tags(raw_line):
+    """_TwitchIRCBot._parse_tags antes del parser IRCv3."""
+    tags_dict = {}
+    if not raw_line.startswith('@'):
+        return tags_dict
+    tags_string = raw_line[1:].split(' ', 1)[0]
+    for tag in tags_string.split(';'):
+        try:
+            key, value = tag.split('=', 1)
+            tags_dict[key] = value
+        except ValueError:
+            pass
+    return tags_dict
+
+
+def legacy_handle(lines):
+    out = None
+    for line in lines:
+        if "PRIVMSG" in line:
+            tags = legacy_parse_tags(line)
+            username = tags.get('display-name', 'Desconocido')
+            content = line.split("PRIVMSG", 1)[1].split(":", 1)[1]
+            out = (username, content, tags)
+    return out
+
+
+def current_handle(lines):
+    """Lo que hace TwitchConnector._handle_line con cada línea antes de publicar."""
+    out = None
+    for line in lines:
+        msg = parse_line(line)
+        if msg is None:
+            continue
+        if msg.command == "PRIVMSG":
+            out = (msg.tag('display-name') or msg.nick, msg.trailing, twitch_roles(msg.tag('badges')))
+        elif msg.command == "PING":
+            out = msg.trailing
+    return out
+
+
+def delimit_only(lines):
+    for line in lines:
+        parse_line(line)
+
+
+def main():
+    if len(sys.argv) > 1:
+        with open(sys.argv[1], encoding="utf-8") as f:
+            lines = [line.rstrip("\r\n") for line in f if line.strip()]
+    else:
+        lines = build_corpus()
+    print(f"{len(lines)} líneas ({sum('PRIVMSG' in l for l in lines)} PRIVMSG)")
+    n = len(lines)
+    report("antes: _parse_tags + split", best_of(lambda: legacy_handle(lines), 1, repeat=7) / n, "msg")
+    report("ahora: parse_line + tag() perezoso + roles", best_of(lambda: current_handle(lines), 1, repeat=7) / n, "msg")
+    report("ahora: solo delimitar (parse_line)", best_of(lambda: delimit_only(lines), 1, repeat=7) / n, "msg")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Comprobación de permisos: la función antigua por cadenas (reconstruida aquí
+tal cual estaba antes de la máscara de roles) contra has_permission() con
+los roles calculados al recibir el mensaje.
+
+    python bench/bench_permissions.py
+"""
+from _common import best_of, report
+
+from connectors.roles import twitch_roles, kick_roles, youtube_roles, permission_mask, has_permission
+
+N = 200_000
+
+
+def legacy_user_has_permission(platform, command_permission, message_data):
+    """user_has_permission de processing/chat_processor.py antes de la máscara de roles."""
+    if command_permission == 'everyone' or command_permission == 'all':
+        return True
+    is_broadcaster = False
+    is_moderator = False
+    is_subscriber = False
+    if platform == 'twitch':
+        badges = message_data.get('tags', {}).get('badges', '')
+        badges = badges if badges else ''
+        is_broadcaster = 'broadcaster' in badges
+        is_moderator = 'moderator' in badges or is_broadcaster
+        is_subscriber = 'subscriber' in badges or is_broadcaster
+    elif platform == 'kick':
+        identity = message_data.get('raw_message', {}).get('sender', {}).get('identity', {})
+        is_broadcaster = identity.get('is_broadcaster', False)
+        is_moderator = identity.get('is_moderator', False) or is_broadcaster
+        is_subscriber = identity.get('is_subscriber', False) or is_broadcaster
+    elif platform == 'youtube':
+        is_broadcaster = message_data.get('is_owner', False)
+        is_moderator = message_data.get('is_moderator', False) or is_broadcaster
+        is_subscriber = message_data.get('is_sponsor', False) or is_broadcaster
+    if command_permission == 'subscribers' or command_permission == 'subscriber':
+        return is_subscriber
+    if command_permission == 'moderators' or command_permission == 'moderator':
+        return is_moderator
+    if command_permission == 'streamer':
+        return is_broadcaster
+    return False
+
+
+CASES = {
+    "twitch": {"tags": {"badges": "vip/1,subscriber/3012,sub-gifter/5"}},
+    "kick": {"raw_message": {"sender": {"identity": {"is_subscriber": True, "badges": [{"type": "subscriber"}]}}}},
+    "youtube": {"is_sponsor": True},
+}
+
+
+def ingest_roles(platform, data):
+    if platform == "twitch":
+        return twitch_roles(data["tags"]["badges"])
+    if platform == "kick":
+        return kick_roles(data["raw_message"])
+    return youtube_roles(data.get("is_owner"), data.get("is_moderator"), data.get("is_sponsor"))
+
+
+def main():
+    for permission in ("subscribers", "moderators"):
+        mask = permission_mask(permission)  # Precalculada por comando en el registro
+        print(f"\npermiso '{permission}'")
+        for platform, data in CASES.items():
+            roles = ingest_roles(platform, data)  # Una vez por mensaje, en el conector
+            assert legacy_user_has_permission(platform, permission, data) == has_permission(roles, mask)
+            report(f"{platform}: antes (cadenas)",
+                   best_of(lambda: legacy_user_has_permission(platform, permission, data), N), "check")
+            report(f"{platform}: ahora has_permission(roles, mask)",
+                   best_of(lambda: has_permission(roles, mask), N), "check")
+            report(f"{platform}: cálculo de roles al recibir",
+                   best_of(lambda: ingest_roles(platform, data), N), "msg")
+
+
+if __name__ == "__main__":
+    main()
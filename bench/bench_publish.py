@@ -0,0 +1,47 @@
+"""
+Coste de publish() con 1, 5 y 20 suscriptores síncronos que no hacen nada:
+antes (iscoroutinefunction por callback y print por evento) contra el plan
+de despacho compilado, con y sin métricas.
+
+El print antiguo va a un buffer en memoria; en la consola real cuesta más.
+
+    python bench/bench_publish.py
+"""
+import contextlib
+import io
+
+from _common import best_of, report
+from _legacy_bus import LegacyEventBus
+
+from event_bus import EventBus
+
+N = 20_000
+
+
+
+def make(bus, subscribers):
+    for _ in range(subscribers):
+        bus.subscribe("topic", lambda data: None)
+    return lambda: bus.publish("topic", 1)
+
+
+def main():
+    for subscribers in (1, 5, 20):
+        print(f"\n{subscribers} suscriptor(es)")
+        legacy = LegacyEventBus()
+        with contextlib.redirect_stdout(io.StringIO()):
+            publish = make(legacy, subscribers)
+            seconds = best_of(publish, N)
+        report("antes", seconds, "publish")
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            bus = EventBus()
+            publish = make(bus, subscribers)
+        report("ahora (por defecto, sin métricas)", best_of(publish, N), "publish")
+        bus.set_metrics_enabled(True)
+        report("ahora (métricas activadas)", best_of(publish, N), "publish")
+        bus.shutdown()
+
+
+if __name__ == "__main__":
+    main()
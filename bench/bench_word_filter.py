@@ -0,0 +1,49 @@
+"""
+Filtro de palabras prohibidas del TTS: el bucle antiguo (lower() + subcadena
+por cada término) contra el autómata Aho-Corasick, con listas de 100, 1k y
+5k términos sobre líneas típicas de '!decir'. También mide la compilación.
+
+    python bench/bench_word_filter.py
+"""
+import random
+import string
+import time
+
+from _common import best_of, report
+
+from processing.word_filter import BannedWordFilter
+
+WORDS = "hola qué tal gg buen stream jajaja saludos desde méxico vamos equipo dice que".split()
+
+
+def legacy_contains(banned_words, texto_a_leer):
+    """Comprobación de chat_processor antes del autómata."""
+    return any(banned_word.lower() in texto_a_leer.lower() for banned_word in banned_words)
+
+
+def main():
+    rng = random.Random(5)
+    lines = [f"user{i} dice " + " ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 20))) for i in range(200)]
+    for size in (100, 1_000, 5_000):
+        banned = ["".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 10))) for _ in range(size)]
+        start = time.perf_counter()
+        f = BannedWordFilter(banned)
+        compile_seconds = time.perf_counter() - start
+        assert all(f.contains(line) == legacy_contains(banned, line) for line in lines)
+
+        def legacy():
+            for line in lines:
+                legacy_contains(banned, line)
+
+        def current():
+            for line in lines:
+                f.contains(line)
+
+        print(f"\n{size:,} términos ({len(lines)} mensajes)")
+        report("antes: lower() + subcadena por término", best_of(legacy, 1, repeat=3) / len(lines), "msg")
+        report("ahora: Aho-Corasick", best_of(current, 3) / len(lines), "msg")
+        print(f"    compilación: {compile_seconds * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Mensaje de chat normalizado que publican todos los conectores en
+'chat:message_received'.
+
+Usa __slots__ (sin __dict__ por instancia) y la plataforma es una cadena
+internada. El payload original de la plataforma es opcional: se guarda tal
+cual o como una función que lo construye la primera vez que se lee 'raw'.
+"""
+import sys
+
+from connectors.roles import ROLE_BROADCASTER, ROLE_MODERATOR, ROLE_SUBSCRIBER
+
+PLATFORM_TWITCH = sys.intern("twitch")
+PLATFORM_KICK = sys.intern("kick")
+PLATFORM_YOUTUBE = sys.intern("youtube")
+
+_PLATFORMS = {p: p for p in (PLATFORM_TWITCH, PLATFORM_KICK, PLATFORM_YOUTUBE)}
+
+
+class ChatMessage:
+    __slots__ = ("platform", "sender", "content", "roles", "timestamp", "avatar", "_raw", "_raw_loader")
+
+    def __init__(self, platform: str, sender: str, content: str, roles: int = 0,
+                 timestamp=None, avatar=None, raw=None, raw_loader=None):
+        self.platform = _PLATFORMS.get(platform) or sys.intern(platform)
+        self.sender = sender
+        self.content = content
+        self.roles = roles
+        self.timestamp = timestamp
+        self.avatar = avatar
+        self._raw = raw
+        self._raw_loader = raw_loader
+
+    @property
+    def raw(self):
+        """Payload original de la plataforma (IRCMessage en Twitch, dict en Kick), o None."""
+        if self._raw is None and self._raw_loader is not None:
+            self._raw = self._raw_loader()
+            self._raw_loader = None
+        return self._raw
+
+    # --- Compatibilidad con los consumidores que aún esperan un dict ---
+    def get(self, key, default=None):
+        if key in _FIELDS:
+            value = getattr(self, key)
+        elif key == "raw_message":
+            value = self.raw
+        elif key == "irc":
+            value = self.raw if self.platform is PLATFORM_TWITCH else None
+        elif key in _ROLE_FLAGS:
+            value = bool(self.roles & _ROLE_FLAGS[key])
+        else:
+            value = None
+        return default if value is None else value
+
+    def __getitem__(self, key):
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def to_dict(self) -> dict:
+        """Vista serializable (sin el payload original), p. ej. para el frontend."""
+        return {
+            "platform": self.platform,
+            "sender": self.sender,
+            "content": self.content,
+            "roles": self.roles,
+            "timestamp": self.timestamp,
+            "avatar": self.avatar,
+        }
+
+    def __repr__(self):
+        return f"ChatMessage({self.platform}, {self.sender!r}, {self.content[:40]!r})"
+
+
+_FIELDS = frozenset(("platform", "sender", "content", "roles", "timestamp", "avatar"))
+_ROLE_FLAGS = {
+    "is_owner": ROLE_BROADCASTER,
+    "is_moderator": ROLE_MODERATOR,
+    "is_sponsor": ROLE_SUBSCRIBER,
+}
@@ -0,0 +1,164 @@
+"""
+Parser IRCv3 para el chat de Twitch.
+
+parse_line() solo localiza los límites (tags, prefijo, comando, parámetros)
+de la línea. tag() lee un valor por offset sin trocear el resto, y los
+valores se des-escapan únicamente al leerlos.
+"""
+
+# Secuencias de escape de valores de tags (IRCv3 message-tags)
+_TAG_ESCAPES = {":": ";", "s": " ", "\\": "\\", "r": "\r", "n": "\n"}
+
+
+def unescape_tag_value(value: str) -> str:
+    """Des-escapa un valor de tag: '\\s' -> ' ', '\\:' -> ';', etc."""
+    if "\\" not in value:
+        return value
+    out = []
+    i = 0
+    n = len(value)
+    while i < n:
+        ch = value[i]
+        if ch == "\\":
+            i += 1
+            if i == n:
+                break  # Barra final suelta: se descarta
+            nxt = value[i]
+            out.append(_TAG_ESCAPES.get(nxt, nxt))
+        else:
+            out.append(ch)
+        i += 1
+    return "".join(out)
+
+
+class IRCMessage:
+    """Mensaje IRC ya delimitado. Los campos se materializan bajo demanda."""
+    __slots__ = ("line", "prefix", "command", "_tags_end", "_params_start", "_raw_tags", "_params")
+
+    def __init__(self, line: str, prefix, command: str, tags_end: int, params_start: int):
+        self.line = line
+        self.prefix = prefix
+        self.command = command
+        self._tags_end = tags_end          # 0 si la línea no trae tags
+        self._params_start = params_start  # -1 si no hay parámetros
+        self._raw_tags = None
+        self._params = None
+
+    # --- Tags ---
+    def _tags_raw(self):
+        raw = self._raw_tags
+        if raw is None:
+            raw = {}
+            if self._tags_end:
+                for item in self.line[1:self._tags_end].split(";"):
+                    key, sep, value = item.partition("=")
+                    if key:
+                        raw[key] = value
+            self._raw_tags = raw
+        return raw
+
+    def tag(self, key: str, default=None):
+        """Valor des-escapado de un tag (o default si no viene), sin trocear el resto."""
+        raw = self._raw_tags
+        if raw is not None:
+            value = raw.get(key)
+            return default if value is None else unescape_tag_value(value)
+
+        end = self._tags_end
+        if not end:
+            return default
+        line = self.line
+        needle = key + "="
+        pos = line.find(needle, 1, end)
+        # La clave debe empezar justo tras el '@' inicial o tras ';' (evita que 'mod=' case
+        # con 'first-mod=' o con un '@mod=' dentro del valor de otro tag)
+        while pos > 1 and line[pos - 1] != ";":
+            pos = line.find(needle, pos + 1, end)
+        if pos < 0:
+            return default
+        start = pos + len(needle)
+        stop = line.find(";", start, end)
+        return unescape_tag_value(line[start:stop if stop >= 0 else end])
+
+    @property
+    def tags(self) -> dict:
+        """Todos los tags, des-escapados (se construye en cada llamada: mejor usar tag())."""
+        return {key: unescape_tag_value(value) for key, value in self._tags_raw().items()}
+
+    # --- Prefijo ---
+    @property
+    def nick(self):
+        """'usuario' en ':usuario!usuario@usuario.tmi.twitch.tv'."""
+        if not self.prefix:
+            return None
+        return self.prefix.split("!", 1)[0]
+
+    # --- Parámetros ---
+    @property
+    def params(self) -> list:
+        params = self._params
+        if params is None:
+            params = []
+            start = self._params_start
+            line = self.line
+            if start >= 0:
+                if line.startswith(":", start):
+                    params.append(line[start + 1:])
+                else:
+                    middle, sep, trailing = line[start:].partition(" :")
+                    params.extend(middle.split())
+                    if sep:
+                        params.append(trailing)
+            self._params = params
+        return params
+
+    @property
+    def channel(self):
+        params = self.params
+        return params[0] if params and params[0].startswith("#") else None
+
+    @property
+    def trailing(self):
+        """Parámetro final ':...': el texto en PRIVMSG/USERNOTICE, el usuario en CLEARCHAT."""
+        start = self._params_start
+        if start < 0:
+            return ""
+        line = self.line
+        if line.startswith(":", start):
+            return line[start + 1:]
+        pos = line.find(" :", start)
+        return line[pos + 2:] if pos >= 0 else ""
+
+    def __repr__(self):
+        return f"IRCMessage({self.command!r}, {self.line[:60]!r})"
+
+
+def parse_line(line: str):
+    """Delimita una línea IRC (sin '\\r\\n'). Devuelve None si está vacía o mal formada."""
+    pos = 0
+    tags_end = 0
+    if line.startswith("@"):
+        tags_end = line.find(" ")
+        if tags_end < 0:
+            return None
+        pos = tags_end + 1
+
+    prefix = None
+    if line.startswith(":", pos):
+        end = line.find(" ", pos)
+        if end < 0:
+            return None
+        prefix = line[pos + 1:end]
+        pos = end + 1
+
+    end = line.find(" ", pos)
+    if end < 0:
+        command = line[pos:]
+        params_start = -1
+    else:
+        command = line[pos:end]
+        params_start = end + 1
+
+    if not command:
+        return None
+    return IRCMessage(line, prefix, command, tags_end, params_start)
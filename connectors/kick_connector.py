@@ -2,6 +2,8 @@ import asyncio
 from kickpython import KickAPI
 from data import tokens as token_manager
 from event_bus import bus
+from connectors.roles import kick_roles
+from connectors.chat_message import ChatMessage, PLATFORM_KICK
 import json
 from dotenv import load_dotenv
 import os
@@ -69,12 +71,11 @@ class KickConnector:
         
         print(f"(Kick) {sender}: {content}")
 
-        bus.publish("chat:message_received", {
-            "platform": "kick",
-            "sender": sender,
-            "content": content,
-            "raw_message": message 
-        })
+        bus.publish("chat:message_received", ChatMessage(
+            PLATFORM_KICK, sender, content,
+            roles=kick_roles(message),
+            raw=message
+        ))
 
 # --- Instancia y funciones de control ---
 kick_connector_instance = KickConnector()
@@ -0,0 +1,114 @@
+"""
+Roles del autor de un mensaje como máscara de bits.
+
+Cada conector calcula 'roles' una sola vez al recibir el mensaje; los
+permisos de comandos se comprueban luego con un único AND contra
+PERMISSION_MASKS (ver has_permission).
+"""
+
+ROLE_BROADCASTER = 1
+ROLE_MODERATOR = 2
+ROLE_VIP = 4
+ROLE_SUBSCRIBER = 8
+
+# Insignias de Twitch/Kick -> bit ('founder' son los primeros suscriptores del canal)
+_BADGE_ROLES = {
+    "broadcaster": ROLE_BROADCASTER,
+    "moderator": ROLE_MODERATOR,
+    "vip": ROLE_VIP,
+    "subscriber": ROLE_SUBSCRIBER,
+    "founder": ROLE_SUBSCRIBER,
+}
+
+# Permiso configurado en un comando -> roles que lo cumplen.
+# El streamer cumple cualquier permiso; None = sin restricción.
+PERMISSION_MASKS = {
+    "everyone": None,
+    "all": None,
+    "subscriber": ROLE_SUBSCRIBER | ROLE_BROADCASTER,
+    "subscribers": ROLE_SUBSCRIBER | ROLE_BROADCASTER,
+    "vip": ROLE_VIP | ROLE_MODERATOR | ROLE_BROADCASTER,
+    "vips": ROLE_VIP | ROLE_MODERATOR | ROLE_BROADCASTER,
+    "moderator": ROLE_MODERATOR | ROLE_BROADCASTER,
+    "moderators": ROLE_MODERATOR | ROLE_BROADCASTER,
+    "streamer": ROLE_BROADCASTER,
+}
+
+
+def permission_mask(permission):
+    """Máscara de un permiso ('moderators', 'all'...). Permisos desconocidos no los cumple nadie (0)."""
+    return PERMISSION_MASKS.get((permission or "all").lower(), 0)
+
+
+def has_permission(roles: int, mask) -> bool:
+    return mask is None or bool(roles & mask)
+
+
+# Las combinaciones de insignias se repiten mucho entre usuarios: se memoriza cada cadena
+_TWITCH_CACHE_MAX = 2048
+_twitch_cache = {}
+
+
+def twitch_roles(badges, mod_tag=None) -> int:
+    """Tag 'badges' de IRCv3 ('broadcaster/1,subscriber/3012'); cada insignia se compara entera."""
+    roles = _twitch_cache.get(badges) if badges else 0
+    if roles is None:
+        roles = 0
+        for badge in badges.split(","):
+            roles |= _BADGE_ROLES.get(badge.partition("/")[0], 0)
+        if len(_twitch_cache) >= _TWITCH_CACHE_MAX:
+            _twitch_cache.clear()
+        _twitch_cache[badges] = roles
+    if mod_tag == "1":
+        roles |= ROLE_MODERATOR
+    return roles
+
+
+def kick_roles(raw_message) -> int:
+    """Mensaje de Kick: insignias en sender.identity.badges ([{'type': ...}]) o flags is_*."""
+    try:
+        identity = raw_message.get("sender", {}).get("identity", {}) or {}
+    except AttributeError:
+        return 0
+    roles = 0
+    for badge in identity.get("badges") or ():
+        if isinstance(badge, dict):
+            roles |= _BADGE_ROLES.get(badge.get("type"), 0)
+    if identity.get("is_broadcaster"):
+        roles |= ROLE_BROADCASTER
+    if identity.get("is_moderator"):
+        roles |= ROLE_MODERATOR
+    if identity.get("is_subscriber"):
+        roles |= ROLE_SUBSCRIBER
+    return roles
+
+
+def youtube_roles(is_owner=False, is_moderator=False, is_sponsor=False) -> int:
+    """Autor de pytchat. En YouTube el 'Sponsor' (miembro del canal) equivale a suscriptor."""
+    roles = 0
+    if is_owner:
+        roles |= ROLE_BROADCASTER
+    if is_moderator:
+        roles |= ROLE_MODERATOR
+    if is_sponsor:
+        roles |= ROLE_SUBSCRIBER
+    return roles
+
+
+def roles_for_message(message_data: dict) -> int:
+    """Roles de un mensaje normalizado; si el conector no los trajo, se derivan aquí."""
+    roles = message_data.get("roles")
+    if roles is not None:
+        return roles
+    platform = message_data.get("platform")
+    if platform == "twitch":
+        irc = message_data.get("irc")
+        roles = twitch_roles(irc.tag("badges"), irc.tag("mod")) if irc else 0
+    elif platform == "kick":
+        roles = kick_roles(message_data.get("raw_message") or {})
+    elif platform == "youtube":
+        roles = youtube_roles(message_data.get("is_owner"), message_data.get("is_moderator"),
+                              message_data.get("is_sponsor"))
+    else:
+        roles = 0
+    return roles
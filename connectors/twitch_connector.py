@@ -1,120 +1,350 @@
-import socket
 import threading
 import asyncio
+import time
+from collections import deque
 from data import tokens as token_manager
 from event_bus import bus
+from connectors.irc_parser import parse_line
+from connectors.roles import twitch_roles, ROLE_MODERATOR, ROLE_BROADCASTER
+from connectors.chat_message import ChatMessage, PLATFORM_TWITCH
 import json
 
-# Esta clase interna manejará la conexión IRC
+# Comandos IRCv3 de Twitch que se reenvían al bus tal cual (el suscriptor lee los tags que necesite)
+_TWITCH_EVENTS = {
+    "USERNOTICE": "twitch:usernotice",
+    "CLEARCHAT": "twitch:clearchat",
+    "ROOMSTATE": "twitch:roomstate",
+}
+
+
+class _TwitchLoop:
+    """
+    Un único event loop (en un hilo daemon) para todas las conexiones IRC de
+    Twitch. Se arranca la primera vez que alguien lo pide.
+    """
+    def __init__(self):
+        self._loop = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        with self._lock:
+            if self._loop is None:
+                ready = threading.Event()
+                threading.Thread(target=self._run, args=(ready,), name="Twitch-IRC", daemon=True).start()
+                ready.wait()
+            return self._loop
+
+    def _run(self, ready):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        self._loop = loop
+        ready.set()
+        loop.run_forever()
+
+_twitch_loop = _TwitchLoop()
+
+
+# Límites de PRIVMSG de Twitch: (mensajes, ventana en segundos)
+RATE_LIMITS = {
+    "normal": (20, 30.0),
+    "moderator": (100, 30.0),  # Mod o broadcaster del canal
+    "verified": (7500, 30.0),  # Bot verificado por Twitch
+}
+
+
+class _TokenBucket:
+    """
+    Cubo de fichas que nunca supera 'limit' mensajes en ninguna ventana de
+    'period' segundos: ráfaga de limit/2 y recarga de limit/2 por ventana.
+    """
+    def __init__(self, limit, period):
+        self.capacity = max(1.0, limit / 2.0)
+        self.rate = self.capacity / period
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def available(self):
+        self._refill()
+        return int(self.tokens)
+
+    def wait_time(self):
+        self._refill()
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def consume(self, n):
+        self.tokens -= n
+
+
+# Esta clase interna manejará la conexión IRC (asyncio streams)
 class _TwitchIRCBot:
-    def __init__(self, username, token, channel, message_callback):
-        self.server = 'irc.chat.twitch.tv'
-        self.port = 6667
+    RECONNECT_MIN_DELAY = 1
+    RECONNECT_MAX_DELAY = 60
+    READ_CHUNK = 4096
+    OUTBOX_MAX = 200      # Respuestas pendientes antes de descartar las más viejas
+    # PRIVMSG agrupados en una sola escritura. Como mod, una ráfaga de 60 respuestas sale
+    # en escrituras de 20, 20 y 10 (las 50 fichas del cubo) y después una cada ~0,6 s
+    MAX_BATCH = 20
+
+    def __init__(self, username, token, channel, message_callback, server='irc.chat.twitch.tv', port=6667,
+                 verified=False):
+        self.server = server
+        self.port = port
         self.username = username
         self.token = f"oauth:{token}"
         self.current_token_raw = token
         self.channel = f"#{channel}"
-        
-        self.sock = socket.socket()
+
+        self.loop = None
+        self.writer = None
         self.running = True
         self.message_callback = message_callback # Callback para el conector
+        self._future = None
+        self._auth_failed = False
+        self._gave_up = False
+        self._reconnect_delay = self.RECONNECT_MIN_DELAY
 
-    def connect(self):
-        self.sock.connect((self.server, self.port))
-        self.sock.send(f"PASS {self.token}\r\n".encode('utf-8'))
-        self.sock.send(f"NICK {self.username}\r\n".encode('utf-8'))
-        self.sock.send(f"JOIN {self.channel}\r\n".encode('utf-8'))
-        
-        self.sock.send("CAP REQ :twitch.tv/tags\r\n".encode('utf-8'))
-        print(f"(Twitch IRC) Conectado al chat de {self.channel}")
-    
-    def update_token(self, new_token):
-        self.token = f"oauth:{new_token}"
-
+        # --- Cola de salida con límite de ritmo ---
+        self._outbox = deque()  # (bytes, encolado_en)
+        self._outbox_ready = None  # asyncio.Event, se crea dentro del loop
+        self._rate_level = "verified" if verified else "normal"
+        self._bucket = _TokenBucket(*RATE_LIMITS[self._rate_level])
+        self._verified = verified
+        self._sent = 0
+        self._dropped = 0
+        self._send_waits = deque(maxlen=256)
 
-    def send_message(self, message: str):
-        if not self.running: return
+    # --- Ciclo de vida (se ejecuta dentro del loop de Twitch) ---
+    async def run(self):
+        """Conecta, lee y reconecta con backoff exponencial hasta que se llame a stop()."""
+        self._outbox_ready = asyncio.Event()
+        if self._outbox:
+            self._outbox_ready.set()
+        sender = asyncio.ensure_future(self._sender_loop())
+        # El sender se cancela pase lo que pase: una cancelación mientras se espera a
+        # _close_writer() no debe dejarlo vivo
         try:
-            self.sock.send(f"PRIVMSG {self.channel} :{message}\r\n".encode('utf-8'))
-            print(f"(Twitch IRC) Mensaje enviado: {message}")
-        except Exception as e:
-            print(f"(Twitch IRC) Error al enviar: {e}")
-
-    def _parse_tags(self, raw_line):
-        tags_dict = {}
-        if not raw_line.startswith('@'): return tags_dict
-        tags_string = raw_line[1:].split(' ', 1)[0]
-        for tag in tags_string.split(';'):
-            try: key, value = tag.split('=', 1); tags_dict[key] = value
-            except ValueError: pass
-        return tags_dict
-
-    def listen(self):
-        buffer = ""
+            while self.running:
+                try:
+                    reader, self.writer = await asyncio.open_connection(self.server, self.port)
+                    self._send_raw(
+                        "CAP REQ :twitch.tv/tags twitch.tv/commands\r\n"
+                        f"PASS {self.token}\r\n"
+                        f"NICK {self.username}\r\n"
+                        f"JOIN {self.channel}\r\n"
+                    )
+                    await self.writer.drain()
+                    print(f"(Twitch IRC) Conectado al chat de {self.channel}")
+                    await self._read_loop(reader)
+                except asyncio.CancelledError:
+                    break
+                except (OSError, ConnectionError) as e:
+                    if self.running: print(f"(Twitch IRC) Error de conexión: {e}")
+                finally:
+                    await self._close_writer()
+
+                if not self.running:
+                    break
+
+                if self._auth_failed:
+                    self._auth_failed = False
+                    print("(Twitch IRC) Autenticación falló. Intentando refrescar token...")
+                    new_tokens = await asyncio.get_running_loop().run_in_executor(None, token_manager.refresh_twitch_token)
+                    if not new_tokens:
+                        print("(Twitch IRC) No se pudo refrescar el token.")
+                        self.running = False
+                        self._gave_up = True
+                        break
+                    self.update_token(new_tokens['access_token'])
+                    print("(Twitch IRC) Token actualizado. Reconectando...")
+                    continue
+
+                delay = self._reconnect_delay
+                print(f"(Twitch IRC) Reconectando en {delay}s...")
+                try:
+                    await asyncio.sleep(delay)
+                except asyncio.CancelledError:
+                    break
+                self._reconnect_delay = min(delay * 2, self.RECONNECT_MAX_DELAY)
+        finally:
+            sender.cancel()
+
+        print("(Twitch IRC) Bucle de escucha detenido.")
+        if self._gave_up:
+            # Notificar al conector de que el bot se rindió (no fue un stop() manual)
+            bus.publish("twitch:disconnected", {})
+
+    async def _read_loop(self, reader):
+        """
+        Lee bloques de bytes y corta por '\\r\\n' sobre un bytearray, decodificando
+        solo líneas completas (así un carácter UTF-8 partido entre lecturas no se
+        rompe).
+        """
+        buffer = bytearray()
         while self.running:
+            chunk = await reader.read(self.READ_CHUNK)
+            if not chunk:
+                raise ConnectionResetError("El servidor cerró la conexión")
+            buffer += chunk
+            start = 0
+            with memoryview(buffer) as view:
+                while True:
+                    end = buffer.find(b"\r\n", start)
+                    if end < 0:
+                        break
+                    line = str(view[start:end], "utf-8", "replace")
+                    start = end + 2
+                    if self._handle_line(line):
+                        # 001 = bienvenida: la conexión es buena, reiniciamos el backoff
+                        self._reconnect_delay = self.RECONNECT_MIN_DELAY
+                    if self._auth_failed:
+                        return
+            if start:
+                del buffer[:start]
+
+    def _handle_line(self, line):
+        """Procesa una línea IRC. Devuelve True si es el mensaje de bienvenida."""
+        msg = parse_line(line)
+        if msg is None:
+            return False
+        command = msg.command
+
+        if command == "PRIVMSG":
+            self.message_callback(ChatMessage(
+                PLATFORM_TWITCH,
+                msg.tag('display-name') or msg.nick or 'Desconocido',
+                msg.trailing,
+                roles=twitch_roles(msg.tag('badges')),  # Los mods siempre traen la insignia 'moderator'
+                raw=msg  # Tags sin decodificar: se leen con msg.tag('badges'), etc.
+            ))
+            return False
+
+        if command == "PING":
+            self._send_raw(f"PONG :{msg.trailing or 'tmi.twitch.tv'}\r\n")
+            return False
+
+        if command in _TWITCH_EVENTS:
+            # Subs/raids (USERNOTICE), baneos/timeouts (CLEARCHAT), modos del canal (ROOMSTATE)
+            bus.publish(_TWITCH_EVENTS[command], {"platform": "twitch", "irc": msg})
+            return False
+
+        if command == "USERSTATE":
+            # Nuestro propio estado en el canal: si somos mod/broadcaster, Twitch nos deja ir más rápido
+            is_mod = bool(twitch_roles(msg.tag('badges'), msg.tag('mod')) & (ROLE_MODERATOR | ROLE_BROADCASTER))
+            self._set_rate_level("moderator" if is_mod else "normal")
+            return False
+
+        if command == "NOTICE" and "authentication failed" in msg.trailing:
+            self._auth_failed = True
+            return False
+
+        return command == "001"
+
+    def _set_rate_level(self, level):
+        if self._verified or level == self._rate_level:
+            return
+        self._rate_level = level
+        self._bucket = _TokenBucket(*RATE_LIMITS[level])
+        print(f"(Twitch IRC) Límite de envío: {level} ({RATE_LIMITS[level][0]} msgs/{int(RATE_LIMITS[level][1])}s)")
+
+    def _enqueue(self, data: bytes):
+        if len(self._outbox) >= self.OUTBOX_MAX:
+            self._outbox.popleft()
+            self._dropped += 1
+        self._outbox.append((data, time.monotonic()))
+        if self._outbox_ready is not None:
+            self._outbox_ready.set()
+
+    async def _sender_loop(self):
+        """Vacía la cola respetando el cubo de fichas y agrupa lo que quepa en un solo write."""
+        while True:
+            if not self._outbox:
+                self._outbox_ready.clear()
+                await self._outbox_ready.wait()
+                continue
+            writer = self.writer
+            if writer is None or writer.is_closing():
+                await asyncio.sleep(0.5)  # Reconectando: la cola espera
+                continue
+            wait = self._bucket.wait_time()
+            if wait > 0:
+                await asyncio.sleep(wait)
+                continue
+
+            n = min(self._bucket.available(), len(self._outbox), self.MAX_BATCH)
+            batch = [self._outbox.popleft() for _ in range(n)]
+            self._bucket.consume(n)
             try:
-                data = self.sock.recv(2048).decode('utf-8')
-                if not data: break
-                buffer += data
-                while "\r\n" in buffer:
-                    line, buffer = buffer.split("\r\n", 1)
-                    
-                    if line.startswith("PING"):
-                        self.sock.send("PONG :tmi.twitch.tv\r\n".encode('utf-8'))
-                        continue
-                    
-                    if "Login authentication failed" in line or "authentication failed" in line:
-                        print("(Twitch IRC) Autenticación falló. Intentando refrescar token...")
-
-                        new_tokens = token_manager.refresh_twitch_token()
-                        if new_tokens:
-                            # actualizar token interno
-                            self.token = f"oauth:{new_tokens['access_token']}"
-                            print("(Twitch IRC) Token actualizado. Reconectando...")
-                            self.sock.close()
-                            self.connect()
-                            continue
-                        else:
-                            print("(Twitch IRC) No se pudo refrescar el token.")
-                            self.running = False
-                            break
-                        
-                    
-                    if "PRIVMSG" in line:
-                        tags = self._parse_tags(line)
-                        username = tags.get('display-name', 'Desconocido')
-                        content = line.split("PRIVMSG",1)[1].split(":",1)[1]
-                        
-                        self.message_callback({
-                            "platform": "twitch",
-                            "sender": username,
-                            "content": content,
-                            "raw_message": line, 
-                            "tags": tags 
-                        })
-                        
-            except Exception as e:
-                if self.running: print(f"(Twitch IRC) Error leyendo: {e}")
-                break
-        
-        print("(Twitch IRC) Hilo de escucha detenido.")
-        # Notificar al conector si se cayó
-        bus.publish("twitch:disconnected", {})
-        self.sock.close()
+                writer.write(b"".join(data for data, _ in batch))
+                await writer.drain()
+            except (OSError, ConnectionError) as e:
+                # Se devuelven a la cola en orden para reintentar tras reconectar
+                self._outbox.extendleft(reversed(batch))
+                print(f"(Twitch IRC) Error al enviar: {e}")
+                await asyncio.sleep(0.5)
+                continue
+            now = time.monotonic()
+            for _, queued_at in batch:
+                self._send_waits.append(now - queued_at)
+            self._sent += n
+
+    def _send_raw(self, data: str):
+        if self.writer is not None and not self.writer.is_closing():
+            self.writer.write(data.encode('utf-8'))
+
+    async def _close_writer(self):
+        writer, self.writer = self.writer, None
+        if writer is None:
+            return
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except Exception:
+            pass
+
+    # --- API pública (segura desde cualquier hilo) ---
+    def update_token(self, new_token):
+        self.token = f"oauth:{new_token}"
+        self.current_token_raw = new_token
+
+    def send_message(self, message: str):
+        if not self.running or self.loop is None: return
+        data = f"PRIVMSG {self.channel} :{message}\r\n".encode('utf-8')
+        self.loop.call_soon_threadsafe(self._enqueue, data)
+        print(f"(Twitch IRC) Mensaje encolado: {message}")
+
+    def send_stats(self):
+        """Profundidad de la cola de salida y tiempo hasta el envío (ms)."""
+        waits = sorted(self._send_waits)
+        n = len(waits)
+
+        def pct(q):
+            return round(waits[min(n - 1, int(n * q / 100.0))] * 1000.0, 1) if n else 0.0
+
+        return {
+            "depth": len(self._outbox),
+            "sent": self._sent,
+            "dropped": self._dropped,
+            "rate_limit": self._rate_level,
+            "time_to_send_p50_ms": pct(50),
+            "time_to_send_p95_ms": pct(95),
+            "time_to_send_max_ms": round(waits[-1] * 1000.0, 1) if n else 0.0,
+        }
 
     def start(self):
-        self.connect()
-        listener_thread = threading.Thread(target=self.listen, daemon=True)
-        listener_thread.start()
-        print("(Twitch IRC) Hilo de escucha iniciado.")
-    
+        self.loop = _twitch_loop.get()
+        self._future = asyncio.run_coroutine_threadsafe(self.run(), self.loop)
+        print("(Twitch IRC) Conexión programada en el loop de Twitch.")
+
     def stop(self):
         self.running = False
-        try:
-            self.sock.shutdown(socket.SHUT_RDWR) # Notifica al hilo que cierre
-        except OSError:
-            pass # El socket ya podría estar cerrado
-        self.sock.close() 
+        if self._future is not None:
+            # Cancela lecturas o esperas de reconexión en curso; run() cierra el socket
+            self.loop.call_soon_threadsafe(self._future.cancel)
         print("(Twitch IRC) Detenido.")
 
 # --- Clase Conector (La que tu app ve) ---
@@ -154,7 +384,8 @@ class TwitchConnector:
                 username=tokens["username"],
                 token=tokens["access_token"],
                 channel=tokens["channel"],
-                message_callback=self._handle_message 
+                message_callback=self._handle_message,
+                verified=bool(tokens.get("verified_bot", False))
             )
             self.bot.start() 
             self.running = True
@@ -182,9 +413,9 @@ class TwitchConnector:
         self.bot = None
         print("(Twitch Connector) Detenido.")
 
-    def _handle_message(self, message: dict):
+    def _handle_message(self, message: ChatMessage):
         """Callback del IRC, publica en el bus."""
-        print(f"(Twitch) {message['sender']}: {message['content']}")
+        print(f"(Twitch) {message.sender}: {message.content}")
         bus.publish("chat:message_received", message)
 
     # --- Manejadores de eventos del Bus ---
@@ -206,6 +437,9 @@ class TwitchConnector:
         else:
             print("(Twitch Connector) Quiso enviar respuesta pero no está conectado.")
 
+    def send_stats(self):
+        return self.bot.send_stats() if self.bot else {}
+
     # --- ¡NUEVA FUNCIÓN! ---
     def on_auth_complete(self, data):
         """Escucha el evento de login exitoso."""
@@ -216,9 +450,9 @@ class TwitchConnector:
             self.start()
     
     def _on_disconnect(self, data):
-        print("(Twitch Connector) Desconectado. Intentando reconectar...")
+        # El bot ya reintenta solo con backoff; si avisa es porque se rindió (token inválido)
+        print("(Twitch Connector) Desconectado definitivamente. Inicia sesión de nuevo.")
         self.stop()
-        self.start()
 
 
 # --- Instancia y funciones de control ---
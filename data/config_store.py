@@ -0,0 +1,114 @@
+import os
+import copy
+import json
+import threading
+
+APP_DATA = os.path.join(os.getenv("LOCALAPPDATA"), "StreamCoreData")
+
+# Documento -> archivo JSON dentro de APP_DATA
+CONFIG_FILES = {
+    "tts": "tts_config.json",
+    "settings": "settings.json",
+    "asistencia": "asistencia_config.json",
+    "youtube": "youtube_config.json",
+}
+
+# Valores por defecto de cada documento (lo guardado en disco los sobrescribe)
+CONFIG_DEFAULTS = {
+    "tts": {
+        "voice": "es-ES-Standard-A",
+        "speed": 1.0,
+        "pitch": 1.0,
+        "volume": 80,
+        "tts_permission": "all"  # Valor por defecto seguro
+    },
+    "settings": {
+        "tts_enabled": True,
+        "commands_enabled": True,
+        "attendance_enabled": True,
+        "chat_workers": 4  # Hilos que procesan el chat (al arrancar)
+    },
+    "asistencia": {
+        "command": "!asistencia",
+        "aliases": "",
+        "cooldown": 0,
+        "reset_mode": "stream",
+        "sound_enabled": False,
+        "sound_file": "",
+        "msg_success": "@{user}, tu asistencia ha sido registrada correctamente ✔️",
+        "msg_error": "@{user}, ya registraste tu asistencia hoy ❌"
+    },
+    "youtube": {},
+}
+
+
+class ConfigStore:
+    """
+    Configuración JSON de la app, leída del disco una sola vez por documento
+    y guardada en memoria. get() devuelve una copia (nadie modifica la caché
+    por accidente); update() fusiona, guarda en disco y actualiza la caché.
+    """
+    def __init__(self, base_dir=APP_DATA):
+        self.base_dir = base_dir
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.base_dir, CONFIG_FILES[name])
+
+    def _load_locked(self, name):
+        data = self._cache.get(name)
+        if data is None:
+            data = copy.deepcopy(CONFIG_DEFAULTS.get(name, {}))
+            path = self.path(name)
+            try:
+                if os.path.exists(path):
+                    with open(path, "r", encoding="utf-8") as f:
+                        data.update(json.load(f))
+            except Exception as e:
+                print(f"(Config) Error leyendo {CONFIG_FILES[name]}: {e}")
+            self._cache[name] = data
+        return data
+
+    def get(self, name: str) -> dict:
+        with self._lock:
+            return copy.deepcopy(self._load_locked(name))
+
+    def exists(self, name: str) -> bool:
+        """True si el documento está guardado en disco (p. ej. YouTube ya vinculado)."""
+        return os.path.exists(self.path(name))
+
+    def update(self, name: str, changes: dict) -> dict:
+        """Fusiona 'changes', guarda el documento completo y devuelve una copia."""
+        with self._lock:
+            data = self._load_locked(name)
+            data.update(changes or {})
+            self._write_locked(name, data)
+            return copy.deepcopy(data)
+
+    def _write_locked(self, name, data):
+        os.makedirs(self.base_dir, exist_ok=True)
+        path = self.path(name)
+        tmp_path = path + ".tmp"
+        # Escritura atómica: un cierre a medias nunca deja el JSON truncado
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=4)
+        os.replace(tmp_path, path)
+
+    def reload(self, name: str = None):
+        """Olvida la caché (de un documento o de todos) para releer el disco."""
+        with self._lock:
+            if name is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(name, None)
+
+    def modules_state(self) -> dict:
+        """Estado ON/OFF de cada módulo; 'tts_enabled' lo manda la config TTS si existe."""
+        state = self.get("settings")
+        if self.exists("tts"):
+            state["tts_enabled"] = self.get("tts").get("tts_enabled", True)
+        return state
+
+
+config_store = ConfigStore()
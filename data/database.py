@@ -82,6 +82,22 @@ def log_user_assistance(nickname: str, platform: str):
         """, (nickname.lower(), platform.lower()))
         conn.commit()
 
+def log_user_assistance_many(rows):
+    """
+    Versión por lotes de log_user_assistance: una sola transacción.
+    rows: [(nickname, platform, asistencias_a_sumar), ...]
+    """
+    if not rows:
+        return
+    with get_connection() as conn:
+        conn.executemany("""
+            INSERT INTO asistencias (nickname, platform, total_asistencias)
+            VALUES (?, ?, ?)
+            ON CONFLICT(nickname, platform) DO UPDATE SET
+                total_asistencias = total_asistencias + excluded.total_asistencias
+        """, [(nickname.lower(), platform.lower(), count) for nickname, platform, count in rows])
+        conn.commit()
+
 def get_all_asistencias():
     """Obtiene la lista de todas las asistencias, ordenadas."""
     # Usamos la conexión que devuelve diccionarios
@@ -180,6 +196,14 @@ def get_command_for_bot(command_name: str):
             return dict(row) # Devuelve el comando como un diccionario
         return None # No se encontró el comando
     
+def get_command_by_id(command_id):
+    """Obtiene una fila de comando por ID (para refrescar el registro en memoria)."""
+    with get_db_conn_dict() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT * FROM comandos WHERE id = ?", (command_id,))
+        row = cursor.fetchone()
+        return dict(row) if row else None
+
 def clear_all_asistencias(platform: str):
     """
     Borra TODOS los registros de asistencia de una plataforma específica.
@@ -219,6 +243,29 @@ def increment_command_counter(command_name: str):
         row = cursor.fetchone()
         return row[0] if row else 0
     
+def get_command_counter(command_name: str) -> int:
+    """Valor actual del contador de un comando (0 si no existe)."""
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT current_count FROM comandos WHERE name = ?", (command_name.lower(),))
+        row = cursor.fetchone()
+        return row[0] if row else 0
+
+def apply_command_deltas(rows):
+    """
+    Aplica en una sola transacción los incrementos acumulados.
+    rows: [(delta_contador, delta_usos, nombre), ...]
+    """
+    if not rows:
+        return
+    with get_connection() as conn:
+        conn.executemany("""
+            UPDATE comandos
+            SET current_count = current_count + ?, uses = uses + ?
+            WHERE name = ?
+        """, rows)
+        conn.commit()
+
 # --- ESTADÍSTICAS ---
 
 def get_command_stats():
@@ -0,0 +1,118 @@
+import atexit
+import threading
+from collections import defaultdict
+from . import database as db
+
+
+class CommandCounterStore:
+    """
+    Contadores de comandos con escritura diferida (write-behind).
+
+    '{count}' se responde al instante desde memoria; los incrementos de
+    'current_count' y 'uses' se acumulan como deltas y se vuelcan a la tabla
+    'comandos' en una sola transacción cada FLUSH_INTERVAL segundos, al llegar
+    a FLUSH_THRESHOLD incrementos pendientes, o al cerrar la app.
+    """
+    FLUSH_INTERVAL = 2.0
+    FLUSH_THRESHOLD = 50
+
+    def __init__(self):
+        self._counts = {}  # nombre -> valor actual de current_count (BD + pendiente)
+        self._pending_count = defaultdict(int)
+        self._pending_uses = defaultdict(int)
+        self._pending_total = 0
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()  # Un volcado a la vez
+        self._generation = 0  # Sube con cada invalidate()
+        self._wake = threading.Event()
+        self._running = True
+        self._thread = threading.Thread(target=self._flush_loop, name="CommandCounters", daemon=True)
+        self._thread.start()
+
+    def _ensure_loaded(self, name: str):
+        while name not in self._counts:
+            # Primera vez: partimos del valor guardado. Con _flush_lock no hay ningún
+            # volcado a medias, así que BD + pendiente es exacto (ni se pierde ni se
+            # cuenta dos veces un lote que ya salió de _pending_count)
+            with self._flush_lock:
+                generation = self._generation
+                base = db.get_command_counter(name)
+                with self._lock:
+                    # Si hubo un invalidate() mientras leíamos, el valor puede ser viejo
+                    if generation == self._generation:
+                        self._counts.setdefault(name, base + self._pending_count.get(name, 0))
+
+    def get_counter(self, command_name: str) -> int:
+        """Valor actual del contador sin incrementarlo."""
+        name = command_name.lower()
+        while True:
+            self._ensure_loaded(name)
+            with self._lock:
+                if name in self._counts:  # Si no, hubo un invalidate() en medio: se relee
+                    return self._counts[name]
+
+    def increment_counter(self, command_name: str) -> int:
+        """Suma 1 al contador del comando y devuelve el nuevo valor (sin esperar a la BD)."""
+        name = command_name.lower()
+        while True:
+            self._ensure_loaded(name)
+            with self._lock:
+                if name in self._counts:  # Si no, hubo un invalidate() en medio: se relee
+                    self._counts[name] += 1
+                    self._pending_count[name] += 1
+                    self._note_pending()
+                    return self._counts[name]
+
+    def increment_uses(self, command_name: str):
+        """Suma 1 uso (estadísticas); se vuelca con el siguiente lote."""
+        with self._lock:
+            self._pending_uses[command_name.lower()] += 1
+            self._note_pending()
+
+    def _note_pending(self):
+        self._pending_total += 1
+        if self._pending_total >= self.FLUSH_THRESHOLD:
+            self._wake.set()
+
+    def flush(self):
+        """Vuelca todos los deltas pendientes en una única transacción."""
+        with self._flush_lock:
+            with self._lock:
+                if not self._pending_total:
+                    return
+                counts, uses = self._pending_count, self._pending_uses
+                self._pending_count, self._pending_uses = defaultdict(int), defaultdict(int)
+                self._pending_total = 0
+            rows = [(counts.get(name, 0), uses.get(name, 0), name) for name in set(counts) | set(uses)]
+            try:
+                db.apply_command_deltas(rows)
+            except Exception as e:
+                print(f"(Command Counters) Error volcando contadores, se reintentará: {e}")
+                with self._lock:
+                    for delta_count, delta_uses, name in rows:
+                        self._pending_count[name] += delta_count
+                        self._pending_uses[name] += delta_uses
+                        self._pending_total += delta_count + delta_uses
+
+    def invalidate(self):
+        """Olvida los valores en memoria (tras editar/borrar comandos); se releen al usarse."""
+        with self._lock:
+            self._counts.clear()
+            self._generation += 1
+
+    def _flush_loop(self):
+        while self._running:
+            self._wake.wait(self.FLUSH_INTERVAL)
+            self._wake.clear()
+            self.flush()
+
+    def close(self):
+        """Vuelca lo pendiente y detiene el hilo (llamar al cerrar la app)."""
+        self._running = False
+        self._wake.set()
+        self.flush()
+
+
+command_counters = CommandCounterStore()
+# Red de seguridad si la app termina sin pasar por main.py
+atexit.register(command_counters.flush)
@@ -1,49 +1,746 @@
 import asyncio
-from collections import defaultdict
+from collections import defaultdict, deque
 import threading # <<< --- ¡IMPORTANTE AÑADIR ESTA LÍNEA!
+import time
+
+# --- Políticas de desbordamiento para temas encolados ---
+POLICY_BLOCK = "block"              # El publicador espera a que haya hueco
+POLICY_DROP_OLDEST = "drop_oldest"  # Se descarta el evento más antiguo pendiente
+POLICY_DROP_NEWEST = "drop_newest"  # Se descarta el evento que llega
+POLICY_COALESCE = "coalesce"        # El nuevo reemplaza al pendiente con la misma clave
+QUEUE_POLICIES = (POLICY_BLOCK, POLICY_DROP_OLDEST, POLICY_DROP_NEWEST, POLICY_COALESCE)
+
+# --- Carriles de prioridad (menor número = se despacha antes) ---
+PRIORITY_HIGH = 0    # Respuestas al chat, TTS: lo que el espectador espera ver/oír
+PRIORITY_NORMAL = 1  # Contabilidad interna
+PRIORITY_LOW = 2     # Refrescos de la UI: pueden esperar
+_PRIORITY_NAMES = ("high", "normal", "low")
+
+# Plan de despacho vacío: (callbacks síncronos, callbacks async)
+_EMPTY_PLAN = ((), ())
+
+
+def _callback_name(callback):
+    module = getattr(callback, "__module__", None) or ""
+    name = getattr(callback, "__qualname__", None) or getattr(callback, "__name__", None) or repr(callback)
+    return f"{module}.{name}" if module else name
+
+
+def _subscriber_names(callbacks):
+    """
+    Nombres legibles y únicos: si dos suscriptores se llaman igual (el mismo
+    método de dos instancias), se les añade la identidad de la instancia.
+    """
+    names = [_callback_name(cb) for cb in callbacks]
+    repeated = {name for name in names if names.count(name) > 1}
+    return [
+        f"{name}@{id(getattr(cb, '__self__', cb)):x}" if name in repeated else name
+        for name, cb in zip(names, callbacks)
+    ]
+
+
+class _LatencyWindow:
+    """
+    Ventana circular con las últimas N duraciones (en segundos). Registrar es
+    un append O(1); los percentiles se calculan solo al pedir el snapshot.
+    """
+    __slots__ = ("samples", "count", "errors")
+
+    def __init__(self, size=1024):
+        self.samples = deque(maxlen=size)
+        self.count = 0
+        self.errors = 0
+
+    def record(self, seconds):
+        self.samples.append(seconds)
+        self.count += 1
+
+    def snapshot(self):
+        values = sorted(self.samples)
+        n = len(values)
+
+        def pct(q):
+            return round(values[min(n - 1, int(n * q / 100.0))] * 1000.0, 3) if n else 0.0
+
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "avg_ms": round(sum(values) * 1000.0 / n, 3) if n else 0.0,
+            "p50_ms": pct(50),
+            "p95_ms": pct(95),
+            "p99_ms": pct(99),
+            "max_ms": round(values[-1] * 1000.0, 3) if n else 0.0,
+        }
+
+
+class _TopicMetrics:
+    __slots__ = ("published", "queue_wait", "async_wait", "subscribers")
+
+    def __init__(self):
+        self.published = 0
+        self.queue_wait = _LatencyWindow()  # Cola del tema o carril -> entrega
+        self.async_wait = _LatencyWindow()  # submit() -> arranque en el bucle async
+        self.subscribers = {}  # callback suscrito -> _LatencyWindow (se borra al desuscribir)
+
+    def subscriber(self, callback):
+        window = self.subscribers.get(callback)
+        if window is None:
+            window = self.subscribers.setdefault(callback, _LatencyWindow())
+        return window
+
+
+class _BusMetrics:
+    """
+    Métricas por tema y por suscriptor. Sin candados en el camino caliente:
+    bajo mucha concurrencia algún contador puede perder un incremento, a cambio
+    de que medir cueste ~100 ns por llamada.
+    """
+    def __init__(self):
+        self._topics = {}
+
+    def topic(self, event_type):
+        topic = self._topics.get(event_type)
+        if topic is None:
+            topic = self._topics.setdefault(event_type, _TopicMetrics())
+        return topic
+
+    def count_publish(self, event_type, n=1):
+        self.topic(event_type).published += n
+
+    def forget(self, event_type, callback):
+        """Suelta las métricas de una suscripción (y la referencia al callback)."""
+        topic = self._topics.get(event_type)
+        if topic is not None:
+            topic.subscribers.pop(callback, None)
+
+    def snapshot(self):
+        result = {}
+        for event_type, topic in list(self._topics.items()):
+            subscribers = list(topic.subscribers.items())
+            names = _subscriber_names([callback for callback, _ in subscribers])
+            result[event_type] = {
+                "published": topic.published,
+                "queue_wait": topic.queue_wait.snapshot(),
+                "async_wait": topic.async_wait.snapshot(),
+                "subscribers": {name: window.snapshot() for name, (_, window) in zip(names, subscribers)},
+            }
+        return result
+
+
+class _AsyncDispatcher:
+    """
+    Bucle asyncio persistente (en un único hilo daemon) donde se ejecutan
+    los suscriptores async. Evita crear un hilo + un event loop por evento.
+    """
+    def __init__(self):
+        self._loop = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def _ensure_loop(self):
+        # Arranque perezoso: solo creamos el hilo si alguien publica a un callback async
+        loop = self._loop
+        if loop is not None:
+            return loop
+        with self._lock:
+            if self._loop is None:
+                ready = threading.Event()
+                self._thread = threading.Thread(target=self._run, args=(ready,), name="EventBus-async", daemon=True)
+                self._thread.start()
+                ready.wait()
+            return self._loop
+
+    def _run(self, ready):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        self._loop = loop
+        ready.set()
+        try:
+            loop.run_forever()
+        finally:
+            loop.close()
+
+    def submit(self, event_type, callback, data, metrics=None):
+        """Programa callback(data) en el bucle compartido. Seguro desde cualquier hilo."""
+        loop = self._ensure_loop()
+        submitted_at = time.perf_counter() if metrics is not None else None
+        loop.call_soon_threadsafe(self._start_task, loop, event_type, callback, data, metrics, submitted_at)
+
+    def _start_task(self, loop, event_type, callback, data, metrics, submitted_at):
+        started_at = None
+        window = None
+        if metrics is not None:
+            started_at = time.perf_counter()
+            topic = metrics.topic(event_type)
+            topic.async_wait.record(started_at - submitted_at)
+            window = topic.subscriber(callback)
+        try:
+            task = loop.create_task(callback(data))
+        except Exception as e:
+            print(f"Error en callback async para '{event_type}': {e}")
+            if window is not None:
+                window.errors += 1
+            return
+        task.add_done_callback(lambda t: self._report(event_type, t, window, started_at))
+
+    @staticmethod
+    def _report(event_type, task, window, started_at):
+        if not task.cancelled():
+            e = task.exception()
+            if e is not None:
+                print(f"Error en callback async para '{event_type}': {e}")
+                if window is not None:
+                    window.errors += 1
+        if window is not None:
+            window.record(time.perf_counter() - started_at)
+
+    def stop(self, timeout=2.0):
+        """Detiene el bucle y espera a que el hilo termine."""
+        with self._lock:
+            loop, thread = self._loop, self._thread
+            self._loop, self._thread = None, None
+        if loop is None:
+            return
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout)
+
+
+class _TopicQueue:
+    """
+    Cola acotada para un tema. El publicador solo encola y vuelve; los
+    workers del tema entregan los eventos a los suscriptores en su propio hilo.
+    """
+    def __init__(self, event_type, deliver, maxsize, policy, workers, coalesce_key):
+        self.event_type = event_type
+        self.maxsize = maxsize
+        self.policy = policy
+        self.dropped = 0
+        self._deliver = deliver
+        self._coalesce_key = coalesce_key
+        # Cada elemento es una "caja" [data, encolado_en, clave] para poder reemplazar el payload en sitio
+        self._items = deque()
+        self._pending = {}  # clave de coalescencia -> caja pendiente
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+        self._running = True
+        self._threads = []
+        for i in range(workers):
+            t = threading.Thread(target=self._worker, name=f"EventBus-{event_type}-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def put(self, data):
+        """Encola un evento aplicando la política de desbordamiento. Devuelve False si se descartó."""
+        with self._lock:
+            return self._put_locked(data)
+
+    def put_many(self, items):
+        """Encola un lote completo tomando el candado una sola vez."""
+        with self._lock:
+            for data in items:
+                self._put_locked(data)
+
+    def _put_locked(self, data):
+        if not self._running:
+            self.dropped += 1  # Cola cerrada: ya nadie lo entregaría
+            return False
+        if self.policy == POLICY_COALESCE:
+            key = self._coalesce_key(data) if self._coalesce_key else None
+            box = self._pending.get(key)
+            if box is not None:
+                box[0] = data
+                self.dropped += 1
+                return True
+
+        if len(self._items) >= self.maxsize:
+            if self.policy == POLICY_BLOCK:
+                while self._running and len(self._items) >= self.maxsize:
+                    self._not_full.wait()
+                if not self._running:
+                    return False
+            elif self.policy == POLICY_DROP_NEWEST:
+                self.dropped += 1
+                return False
+            else:
+                # drop_oldest (y coalesce sin coincidencia) sacrifican al más viejo
+                self._forget(self._items.popleft())
+                self.dropped += 1
+
+        if self.policy == POLICY_COALESCE:
+            box = [data, time.perf_counter(), key]
+            self._pending[key] = box
+        else:
+            box = [data, time.perf_counter()]
+        self._items.append(box)
+        self._not_empty.notify()
+        return True
+
+    def _forget(self, box):
+        if len(box) > 2 and self._pending.get(box[2]) is box:
+            del self._pending[box[2]]
+
+    def depth(self):
+        return len(self._items)
+
+    def _worker(self):
+        while True:
+            with self._lock:
+                while self._running and not self._items:
+                    self._not_empty.wait()
+                if not self._items:
+                    return  # Cerrada y vacía (al cerrar se entrega antes lo pendiente)
+                box = self._items.popleft()
+                self._forget(box)
+                self._not_full.notify()
+            self._deliver(self.event_type, box[0], box[1])
+
+    def close(self):
+        """Deja de aceptar eventos; los workers terminan de entregar lo encolado y salen."""
+        with self._lock:
+            self._running = False
+            self._not_empty.notify_all()
+            self._not_full.notify_all()
+
+    def join(self, deadline):
+        """Espera a los workers hasta 'deadline' (time.monotonic()). Devuelve cuántos eventos quedaron."""
+        for t in self._threads:
+            t.join(max(0.0, deadline - time.monotonic()))
+        return len(self._items)
+
+
+class _ShardedTopicQueue:
+    """
+    Varias colas de un solo worker; cada evento va a la que indique
+    hash(shard_key(data)). Eventos con la misma clave (p. ej. el mismo
+    usuario) conservan su orden; claves distintas se procesan en paralelo.
+    """
+    def __init__(self, event_type, deliver, maxsize, policy, workers, coalesce_key, shard_key):
+        self.event_type = event_type
+        self.maxsize = maxsize
+        self.policy = policy
+        self._shard_key = shard_key
+        per_shard = max(1, -(-maxsize // workers))
+        self._shards = [
+            _TopicQueue(f"{event_type}#{i}", deliver, per_shard, policy, 1, coalesce_key)
+            for i in range(workers)
+        ]
+        for shard in self._shards:
+            shard.event_type = event_type  # Los workers entregan con el nombre real del tema
+
+    def _shard_for(self, data):
+        return self._shards[hash(self._shard_key(data)) % len(self._shards)]
+
+    def put(self, data):
+        return self._shard_for(data).put(data)
+
+    def put_many(self, items):
+        """Agrupa el lote por shard para tomar cada candado una sola vez (conserva el orden)."""
+        batches = [[] for _ in self._shards]
+        for data in items:
+            batches[hash(self._shard_key(data)) % len(self._shards)].append(data)
+        for shard, batch in zip(self._shards, batches):
+            if batch:
+                shard.put_many(batch)
+
+    @property
+    def dropped(self):
+        return sum(shard.dropped for shard in self._shards)
+
+    def depth(self):
+        return sum(shard.depth() for shard in self._shards)
+
+    def close(self):
+        for shard in self._shards:
+            shard.close()
+
+    def join(self, deadline):
+        return sum(shard.join(deadline) for shard in self._shards)
+
+
+class _PriorityLanes:
+    """
+    Despachador compartido con un carril FIFO por prioridad. Cada worker toma
+    siempre del carril más prioritario con eventos; el worker 0 está reservado
+    para PRIORITY_HIGH, así una respuesta nunca espera detrás de un refresco
+    de UI lento aunque el resto de workers esté saturado.
+    """
+    def __init__(self, deliver, workers=2, maxsize=10000):
+        self.maxsize = maxsize
+        self.dropped = [0] * len(_PRIORITY_NAMES)
+        self._deliver = deliver
+        self._lanes = [deque() for _ in _PRIORITY_NAMES]
+        self._lock = threading.Lock()
+        # El worker reservado espera en su propia condición: con una sola, un notify()
+        # de NORMAL/LOW podía despertarlo a él, que no puede tomarlo, y el evento se quedaba parado
+        self._ready = threading.Condition(self._lock)
+        self._high_ready = threading.Condition(self._lock)
+        self._running = True
+        self._threads = []
+        for i in range(max(2, workers)):
+            max_priority = PRIORITY_HIGH if i == 0 else PRIORITY_LOW
+            t = threading.Thread(target=self._worker, args=(max_priority,),
+                                 name=f"EventBus-lanes-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def put(self, priority, event_type, data):
+        with self._lock:
+            lane = self._lanes[priority]
+            if len(lane) >= self.maxsize:
+                # Un carril desbordado pierde lo más viejo, nunca bloquea al publicador
+                lane.popleft()
+                self.dropped[priority] += 1
+            lane.append((event_type, data, time.perf_counter()))
+            if priority == PRIORITY_HIGH:
+                self._high_ready.notify()
+            self._ready.notify()
+
+    def _take_locked(self, max_priority):
+        for priority in range(max_priority + 1):
+            lane = self._lanes[priority]
+            if lane:
+                return lane.popleft()
+        return None
+
+    def _worker(self, max_priority):
+        ready = self._high_ready if max_priority == PRIORITY_HIGH else self._ready
+        while True:
+            with self._lock:
+                item = self._take_locked(max_priority)
+                while item is None and self._running:
+                    ready.wait()
+                    item = self._take_locked(max_priority)
+                if item is None:
+                    return
+            self._deliver(*item)
+
+    def stats(self):
+        return {
+            name: {"depth": len(self._lanes[p]), "dropped": self.dropped[p]}
+            for p, name in enumerate(_PRIORITY_NAMES)
+        }
+
+    def close(self):
+        """Como _TopicQueue.close(): los workers vacían los carriles antes de salir."""
+        with self._lock:
+            self._running = False
+            self._ready.notify_all()
+            self._high_ready.notify_all()
+
+    def join(self, deadline):
+        for t in self._threads:
+            t.join(max(0.0, deadline - time.monotonic()))
+        return sum(len(lane) for lane in self._lanes)
+
+
+def merge_payloads(old, new):
+    """Fusión por defecto de payloads coalescidos: dicts se combinan, lo demás gana el último."""
+    if isinstance(old, dict) and isinstance(new, dict):
+        merged = dict(old)
+        merged.update(new)
+        return merged
+    return new
+
+
+class _Coalescer:
+    """
+    Ventana de coalescencia de un tema: como máximo una entrega por 'window'
+    segundos, con todos los payloads intermedios fusionados en uno.
+    """
+    def __init__(self, event_type, deliver, window, merge):
+        self.event_type = event_type
+        self.window = window
+        self.merged = 0  # eventos absorbidos por la ventana
+        self._deliver = deliver
+        self._merge = merge
+        self._lock = threading.Lock()
+        self._pending = None
+        self._has_pending = False
+        self._timer = None
+        self._last_flush = 0.0
+
+    def add(self, items):
+        with self._lock:
+            for data in items:
+                if self._has_pending:
+                    self._pending = self._merge(self._pending, data)
+                    self.merged += 1
+                else:
+                    self._pending = data
+                    self._has_pending = True
+            if self._timer is not None:
+                return
+            delay = self._last_flush + self.window - time.monotonic()
+            if delay > 0:
+                self._timer = threading.Timer(delay, self._flush)
+                self._timer.daemon = True
+                self._timer.start()
+                return
+            # Flanco de subida: si la ventana ya pasó, se entrega sin esperar
+            data = self._take_locked()
+        self._deliver(self.event_type, data)
+
+    def _take_locked(self):
+        data = self._pending
+        self._pending = None
+        self._has_pending = False
+        self._last_flush = time.monotonic()
+        return data
+
+    def _flush(self):
+        with self._lock:
+            self._timer = None
+            if not self._has_pending:
+                return
+            data = self._take_locked()
+        self._deliver(self.event_type, data)
+
+    def close(self):
+        """Cancela el temporizador y entrega en el acto lo que quedara en la ventana."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._has_pending:
+                return
+            data = self._take_locked()
+        self._deliver(self.event_type, data)
+
 
 class EventBus:
     def __init__(self):
         self._subscribers = defaultdict(list)
+        # Planes de despacho inmutables por tema. Solo se reconstruyen (copy-on-write)
+        # al suscribir/desuscribir; publish() únicamente lee el dict.
+        self._plans = {}
+        self._subs_lock = threading.Lock()
+        # Instrumentación opcional (set_metrics_enabled). None = apagada: medir cada
+        # suscriptor multiplica el coste de publish() (ver bench/bench_publish.py)
+        self._metrics = None
+        self._async_dispatcher = _AsyncDispatcher()
+        self._queues = {}
+        self._coalescers = {}
+        self._priorities = {}
+        self._lanes = None  # se crean al asignar la primera prioridad
         print("Event Bus inicializado.")
 
     def subscribe(self, event_type: str, callback):
         """Registra una función para escuchar un evento."""
         print(f"Suscribiendo '{getattr(callback, '__name__', 'callback')}' al evento '{event_type}'")
-        self._subscribers[event_type].append(callback)
+        with self._subs_lock:
+            self._subscribers[event_type].append(callback)
+            self._rebuild_plan(event_type)
 
     def unsubscribe(self, event_type: str, callback):
         """Elimina una suscripción."""
-        try:
-            self._subscribers[event_type].remove(callback)
-            print(f"Desuscribiendo '{getattr(callback, '__name__', 'callback')}' del evento '{event_type}'")
-        except ValueError:
-            pass 
+        with self._subs_lock:
+            try:
+                self._subscribers[event_type].remove(callback)
+            except ValueError:
+                return
+            self._rebuild_plan(event_type)
+            metrics = self._metrics
+            if metrics is not None and callback not in self._subscribers[event_type]:
+                metrics.forget(event_type, callback)
+        print(f"Desuscribiendo '{getattr(callback, '__name__', 'callback')}' del evento '{event_type}'")
+
+    def _rebuild_plan(self, event_type):
+        """Compila la lista de suscriptores en tuplas separadas sync/async (con el candado tomado)."""
+        callbacks = self._subscribers[event_type]
+        if not callbacks:
+            self._plans.pop(event_type, None)
+            return
+        sync_callbacks = tuple(cb for cb in callbacks if not asyncio.iscoroutinefunction(cb))
+        async_callbacks = tuple(cb for cb in callbacks if asyncio.iscoroutinefunction(cb))
+        # Reemplazo atómico: quien esté publicando sigue con el plan anterior
+        self._plans[event_type] = (sync_callbacks, async_callbacks)
+
+    def configure_topic(self, event_type: str, maxsize: int = 1000, policy: str = POLICY_DROP_OLDEST,
+                        workers: int = 1, coalesce_key=None, shard_key=None):
+        """
+        Marca un tema como encolado: publish() solo encola y los suscriptores
+        se ejecutan en 'workers' hilos dedicados. 'coalesce_key(data)' agrupa
+        eventos equivalentes con la política 'coalesce' (por defecto, todo el tema).
+        Con 'shard_key(data)' cada worker tiene su propia cola y los eventos con
+        la misma clave van siempre al mismo worker (orden garantizado por clave).
+        """
+        if policy not in QUEUE_POLICIES:
+            raise ValueError(f"Política de cola desconocida: {policy}")
+        if maxsize < 1 or workers < 1:
+            raise ValueError("maxsize y workers deben ser >= 1")
+        old = self._queues.get(event_type)
+        if shard_key is not None and workers > 1:
+            queue = _ShardedTopicQueue(event_type, self._dispatch, maxsize, policy, workers, coalesce_key, shard_key)
+        else:
+            queue = _TopicQueue(event_type, self._dispatch, maxsize, policy, workers, coalesce_key)
+        self._queues[event_type] = queue
+        if old:
+            old.close()
+        print(f"Tema '{event_type}' encolado (max={maxsize}, política={policy}, workers={workers})")
+
+    def set_priority(self, event_type: str, priority: int):
+        """
+        Despacha un tema por los carriles de prioridad compartidos (fuera del
+        hilo del publicador). PRIORITY_HIGH adelanta a NORMAL y LOW bajo carga.
+        """
+        if priority not in (PRIORITY_HIGH, PRIORITY_NORMAL, PRIORITY_LOW):
+            raise ValueError(f"Prioridad desconocida: {priority}")
+        if self._lanes is None:
+            self._lanes = _PriorityLanes(self._dispatch)
+        self._priorities[event_type] = priority
+        print(f"Tema '{event_type}' con prioridad '{_PRIORITY_NAMES[priority]}'")
+
+    def set_coalescing(self, event_type: str, window: float = 0.25, merge=merge_payloads):
+        """
+        Limita un tema a una entrega cada 'window' segundos. Los eventos que
+        llegan dentro de la ventana se fusionan con 'merge(anterior, nuevo)'.
+        window=0 desactiva la coalescencia.
+        """
+        old = self._coalescers.pop(event_type, None)
+        if old:
+            old.close()
+        if window > 0:
+            self._coalescers[event_type] = _Coalescer(event_type, self._route, window, merge)
+            print(f"Tema '{event_type}' coalescido cada {int(window * 1000)} ms")
+
+    def set_metrics_enabled(self, enabled: bool):
+        """Activa/desactiva la instrumentación sin reiniciar. Al reactivar, empieza de cero."""
+        if enabled and self._metrics is None:
+            self._metrics = _BusMetrics()
+        elif not enabled:
+            self._metrics = None
+
+    def metrics_enabled(self):
+        return self._metrics is not None
+
+    def metrics_snapshot(self):
+        """Contadores e histogramas por tema y suscriptor (vacío si la instrumentación está apagada)."""
+        metrics = self._metrics
+        return metrics.snapshot() if metrics is not None else {}
+
+    def queue_stats(self):
+        """Profundidad y eventos descartados de cada tema encolado y de cada carril."""
+        stats = {
+            event_type: {
+                "depth": q.depth(),
+                "dropped": q.dropped,
+                "maxsize": q.maxsize,
+                "policy": q.policy,
+            }
+            for event_type, q in list(self._queues.items())
+        }
+        if self._lanes is not None:
+            for name, lane in self._lanes.stats().items():
+                stats[f"lane:{name}"] = lane
+        return stats
 
     def publish(self, event_type: str, data=None):
         """Envía un evento a todos los suscriptores."""
-        # Quitamos el log de 'data' para no spamear la consola con mensajes
-        print(f"Publicando evento '{event_type}'...") 
-        
-        if event_type in self._subscribers:
-            for callback in self._subscribers[event_type]:
-                
-                if asyncio.iscoroutinefunction(callback):
-                    def run_async_task(coro, data):
-                        try:
-                            asyncio.run(coro(data))
-                        except Exception as e:
-                            print(f"Error en hilo de callback async para '{event_type}': {e}")
-                    
-                    threading.Thread(target=run_async_task, args=(callback, data), daemon=True).start()
-                
-                else:
-                    # Los callbacks síncronos se ejecutan directamente
-                    try:
-                        callback(data)
-                    except Exception as e:
-                        print(f"Error ejecutando callback síncrono para '{event_type}': {e}")
+        metrics = self._metrics
+        if metrics is not None:
+            metrics.count_publish(event_type)
+
+        c = self._coalescers.get(event_type)
+        if c is not None:
+            c.add((data,))
+            return
+        self._route(event_type, data)
+
+    def publish_many(self, event_type: str, items):
+        """Publica un lote de eventos del mismo tema de una sola vez."""
+        items = list(items)
+        if not items:
+            return
+        metrics = self._metrics
+        if metrics is not None:
+            metrics.count_publish(event_type, len(items))
+
+        c = self._coalescers.get(event_type)
+        if c is not None:
+            c.add(items)
+            return
+        q = self._queues.get(event_type)
+        if q is not None:
+            q.put_many(items)
+            return
+        for data in items:
+            self._route(event_type, data)
+
+    def _route(self, event_type, data):
+        """Encola el evento en su cola o carril; si no tiene ninguno, lo entrega en el hilo actual."""
+        q = self._queues.get(event_type)
+        if q is not None:
+            q.put(data)
+            return
+        priority = self._priorities.get(event_type)
+        if priority is not None:
+            self._lanes.put(priority, event_type, data)
+            return
+        self._dispatch(event_type, data)
+
+    def _dispatch(self, event_type, data, enqueued_at=None):
+        """Entrega un evento a los suscriptores en el hilo actual."""
+        sync_callbacks, async_callbacks = self._plans.get(event_type, _EMPTY_PLAN)
+        metrics = self._metrics
+        if metrics is not None:
+            self._dispatch_measured(metrics, event_type, data, enqueued_at, sync_callbacks, async_callbacks)
+            return
+
+        # Los callbacks async van al bucle persistente del bus
+        for callback in async_callbacks:
+            self._async_dispatcher.submit(event_type, callback, data)
+
+        # Los callbacks síncronos se ejecutan directamente
+        for callback in sync_callbacks:
+            try:
+                callback(data)
+            except Exception as e:
+                print(f"Error ejecutando callback síncrono para '{event_type}': {e}")
+
+    def _dispatch_measured(self, metrics, event_type, data, enqueued_at, sync_callbacks, async_callbacks):
+        """Igual que _dispatch pero midiendo espera en cola, duración y errores."""
+        perf_counter = time.perf_counter
+        topic = metrics.topic(event_type)
+        if enqueued_at is not None:
+            topic.queue_wait.record(perf_counter() - enqueued_at)
+
+        for callback in async_callbacks:
+            self._async_dispatcher.submit(event_type, callback, data, metrics)
+
+        for callback in sync_callbacks:
+            window = topic.subscriber(callback)
+            start = perf_counter()
+            try:
+                callback(data)
+            except Exception as e:
+                window.errors += 1
+                print(f"Error ejecutando callback síncrono para '{event_type}': {e}")
+            window.record(perf_counter() - start)
+
+    def shutdown(self, timeout=2.0):
+        """
+        Detiene el bus sin perder lo pendiente (llamar al cerrar la app): entrega lo
+        que quede en las ventanas de coalescencia, deja que colas y carriles se
+        vacíen durante como mucho 'timeout' segundos y después para el bucle async.
+        """
+        deadline = time.monotonic() + timeout
+        coalescers, self._coalescers = self._coalescers, {}
+        for c in coalescers.values():
+            c.close()
+        # Primero las colas por tema: al vaciarse aún pueden publicar en los carriles
+        queues = list(self._queues.items())
+        for _, q in queues:
+            q.close()
+        left = {event_type: q.join(deadline) for event_type, q in queues}
+        if self._lanes is not None:
+            self._lanes.close()
+            left["carriles"] = self._lanes.join(deadline)
+        for event_type, count in left.items():
+            if count:
+                print(f"(Event Bus) '{event_type}': {count} eventos sin entregar al cerrar")
+        self._async_dispatcher.stop()
 
 
 # Instancia global única del bus de eventos
-bus = EventBus()
\ No newline at end of file
+bus = EventBus()
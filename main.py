@@ -2,17 +2,12 @@ import webview
 import os
 import pathlib
 import threading
-import json
 import asyncio
-from api import Api
-from event_bus import bus
-from connectors import kick_connector
-from processing import chat_processor, sender_processor
+from event_bus import bus, PRIORITY_LOW
 from services import auth_service
-from connectors import twitch_connector
 import sys
-# Al importar esto, el servicio TTS arranca automáticamente:
-from services import tts_service 
+# Contenedor único: crea Api, TTS, conectores y procesadores una sola vez
+from app_context import context
 
 # --------------------------------
 if sys.stdout is None:
@@ -49,14 +44,14 @@ async def start_connectors_async():
     
     if auth_service.check_auth_status("kick"):
         print("   - Kick está configurado. Intentando iniciar...")
-        tasks.append(asyncio.create_task(kick_connector.kick_connector_instance.start()))
+        tasks.append(asyncio.create_task(context.kick.start()))
     else:
         print("   - Kick no configurado, omitiendo inicio.")
 
     if auth_service.check_auth_status("twitch"):
         print("   - Twitch está configurado. Intentando iniciar...")
         loop = asyncio.get_running_loop()
-        tasks.append(loop.run_in_executor(None, twitch_connector.twitch_connector_instance.start))
+        tasks.append(loop.run_in_executor(None, context.twitch.start))
     else:
         print("   - Twitch no configurado, omitiendo inicio.")
 
@@ -81,12 +76,9 @@ if __name__ == '__main__':
     print("Iniciando StreamCore...")
     print("   - Inicializando procesadores (suscribiéndose)...")
     
-    # Inicializamos procesadores simplemente importándolos o referenciándolos
-    _ = chat_processor
-    _ = sender_processor
-    # _ = tts_service (Ya está importado arriba, así que ya está corriendo)
-
-    api_instance = Api()
+    # Crea todos los servicios una sola vez y lanza las reconexiones automáticas
+    context.start()
+    api_instance = context.api
 
     # Crea la ventana
     window = webview.create_window(
@@ -105,25 +97,20 @@ if __name__ == '__main__':
     # --- PUENTE DE EVENTOS TTS (Backend -> Frontend) ---
     def forward_tts_event():
         """
-        Escucha 'tts:new' en el event bus y lo despacha al frontend
-        para que se muestre en la lista visual (sin audio si viene del chat).
+        Escucha 'tts:queue:updated' en el event bus y avisa al frontend;
+        JS pide la cola real con get_tts_queue() y la vuelve a pintar.
         """
         def _handler(data):
             try:
-                payload = json.dumps(data)
-            except Exception as e:
-                print(f"[forward_tts_event] Error serializando payload: {e}")
-                payload = json.dumps({"user": "Error", "message": "Error serializando"})
-            
-            # Inyectamos el evento en JS
-            script = f"window.dispatchEvent(new CustomEvent('tts:new', {{ detail: {payload} }}));"
-            try:
-                window.evaluate_js(script)
+                window.evaluate_js("window.dispatchEvent(new CustomEvent('tts:queue'));")
             except Exception as e:
                 # Si la ventana no está lista aún, puede fallar, es normal al inicio
                 pass
 
-        bus.subscribe("tts:new", _handler)
+        # Solo es la lista visual: un aviso cada 250 ms y cediendo el paso a respuestas y audio
+        bus.set_coalescing("tts:queue:updated", 0.25)
+        bus.set_priority("tts:queue:updated", PRIORITY_LOW)
+        bus.subscribe("tts:queue:updated", _handler)
 
     # Iniciamos el puente
     forward_tts_event()
@@ -142,6 +129,9 @@ if __name__ == '__main__':
             except Exception as e:
                 print(f"Error enviando stats a UI: {e}")
 
+        # En ráfagas (raids) basta con un aviso cada 250 ms: JS vuelve a pedir todo igualmente
+        bus.set_coalescing("stats:updated", 0.25)
+        bus.set_priority("stats:updated", PRIORITY_LOW)
         bus.subscribe("stats:updated", _handler)
 
     forward_stats_event() # <--- ¡No olvides llamarla para que arranque!
@@ -150,18 +140,5 @@ if __name__ == '__main__':
     webview.start(debug=False)
 
     # --- Lógica de apagado ---
-    shutdown_loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(shutdown_loop)
-    try:
-        print("   - Solicitando detención de Kick...")
-        shutdown_loop.run_until_complete(kick_connector.shutdown())
-    except Exception as e: print(f"   - Error deteniendo Kick: {e}")
-
-    try:
-        print("   - Solicitando detención de Twitch...")
-        twitch_connector.shutdown()
-    except Exception as e: print(f"   - Error deteniendo Twitch: {e}")
-
-    print("\nAplicación cerrada. Deteniendo componentes...")
-    shutdown_loop.close()
+    context.shutdown()
     print("¡Adiós!")
\ No newline at end of file
@@ -1,14 +1,17 @@
 import os
-import json
-import time
 import pygame
-from event_bus import bus
-import datetime 
-from data.database import get_command_for_bot, increment_command_counter, increment_command_uses
-
-# Definir rutas (Igual que en API)
-APP_DATA = os.path.join(os.getenv("LOCALAPPDATA"), "StreamCoreData")
-CONFIG_FILE = os.path.join(APP_DATA, "asistencia_config.json")
+from event_bus import bus, POLICY_DROP_OLDEST
+from data.usage_counters import command_counters
+from processing.command_registry import command_registry
+from processing.word_filter import BannedWordFilter
+from processing.cooldowns import CooldownStore
+from processing.templates import TemplateContext
+from connectors.roles import permission_mask, has_permission, roles_for_message, ROLE_BROADCASTER
+from connectors.chat_message import ChatMessage
+from services.attendance_service import attendance_service
+from services.tts_service import tts_service
+from services.tts_scheduler import PRIORITY_NORMAL, PRIORITY_STREAMER
+from data.config_store import config_store
 
 # --- ESTADO GLOBAL DE CONFIGURACIÓN ---
 # Guardamos la config en memoria para no leer el disco en cada mensaje
@@ -24,9 +27,22 @@ current_tts_command_config = {
     "command": "!decir",
     "tts_permission": "all",
     "banned_words": [],
+    "banned_words_normalize": False,  # True = también detecta acentos y 'leet' (p0ll0)
     "tts_enabled": True 
 }
 
+# Autómata de palabras prohibidas (se recompila solo cuando cambia la lista)
+tts_word_filter = BannedWordFilter()
+tts_permission_mask = None  # Máscara de roles de 'tts_permission' (None = todos)
+
+def compile_tts_command_config():
+    global tts_permission_mask
+    tts_word_filter.compile(
+        current_tts_command_config.get("banned_words") or [],
+        normalize=current_tts_command_config.get("banned_words_normalize", False)
+    )
+    tts_permission_mask = permission_mask(current_tts_command_config.get("tts_permission", "all"))
+
 
 current_modules_state = {
     "tts_enabled": True,
@@ -37,11 +53,8 @@ current_modules_state = {
 def load_modules_state():
     global current_modules_state
     try:
-        from api import Api
-        res = Api().get_modules_status()
-        if res['success']:
-            current_modules_state.update(res['data'])
-            print(f"(Chat Processor) Estado de módulos cargado: {current_modules_state}")
+        current_modules_state.update(config_store.modules_state())
+        print(f"(Chat Processor) Estado de módulos cargado: {current_modules_state}")
     except: pass
 
 def on_modules_updated(new_state):
@@ -64,11 +77,8 @@ def load_config():
     """Carga la configuración desde el JSON al iniciar o actualizar."""
     global current_asistencia_config
     try:
-        if os.path.exists(CONFIG_FILE):
-            with open(CONFIG_FILE, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                current_asistencia_config.update(data)
-                print(f"(Chat Processor) Config asistencia cargada: {current_asistencia_config['command']}")
+        current_asistencia_config.update(config_store.get("asistencia"))
+        print(f"(Chat Processor) Config asistencia cargada: {current_asistencia_config['command']}")
     except Exception as e:
         print(f"(Chat Processor) Error cargando config: {e}")
 
@@ -87,14 +97,9 @@ def load_tts_config():
     """Carga la configuración TTS desde el JSON al iniciar o actualizar."""
     global current_tts_command_config
     try:
-        from api import Api 
-        
-        # Llamamos a la API para obtener la configuración completa
-        res = Api().get_tts_config() 
-        if res and res.get('success'):
-            data = res.get('data')
-            current_tts_command_config.update(data)
-            print(f"(Chat Processor) Config TTS cargada. Comando: {current_tts_command_config['command']}")
+        current_tts_command_config.update(config_store.get("tts"))
+        compile_tts_command_config()
+        print(f"(Chat Processor) Config TTS cargada. Comando: {current_tts_command_config['command']}")
     except Exception as e:
         print(f"(Chat Processor) Error cargando config TTS: {e}")
 
@@ -102,6 +107,7 @@ def on_tts_config_updated(new_config):
     """Callback: Se ejecuta cuando guardas cambios en el panel TTS."""
     global current_tts_command_config
     current_tts_command_config.update(new_config)
+    compile_tts_command_config()
     print("(Chat Processor) Configuración TTS actualizada en tiempo real.")
     
 bus.subscribe("tts:command_config_updated", on_tts_config_updated) 
@@ -110,62 +116,29 @@ bus.subscribe("tts:config", on_tts_config_updated)
 load_tts_config()
 
 
-# --- Función Helper de Permisos (Sin cambios) ---
+# --- Función Helper de Permisos ---
 def user_has_permission(platform: str, command_permission: str, message_data: dict) -> bool:
     """
-    Comprueba permisos. Optimizado para saltar chequeos si es 'everyone' o 'all'.
+    Comprueba permisos con la máscara de roles que calculó el conector
+    ('roles' en el mensaje). El camino caliente usa has_permission() con la
+    máscara ya precalculada del comando.
     """
-    if command_permission == 'everyone' or command_permission == 'all':
-        return True
-
-    # --- Datos del usuario ---
-    is_broadcaster = False
-    is_moderator = False
-    is_subscriber = False
-    
-    if platform == 'twitch':
-        badges = message_data.get('tags', {}).get('badges', '')
-        badges = badges if badges else ''
-        
-        is_broadcaster = 'broadcaster' in badges
-        is_moderator = 'moderator' in badges or is_broadcaster 
-        is_subscriber = 'subscriber' in badges or is_broadcaster 
-        
-    elif platform == 'kick':
-        identity = message_data.get('raw_message', {}).get('sender', {}).get('identity', {})
-        is_broadcaster = identity.get('is_broadcaster', False)
-        is_moderator = identity.get('is_moderator', False) or is_broadcaster
-        is_subscriber = identity.get('is_subscriber', False) or is_broadcaster
-        
-    elif platform == 'youtube':
-        # Pytchat envía estos booleanos directos en message_data (ver youtube_service.py)
-        is_broadcaster = message_data.get('is_owner', False)
-        is_moderator = message_data.get('is_moderator', False) or is_broadcaster
-        # En YouTube, 'Sponsor' equivale a Suscriptor de pago (Miembro)
-        is_subscriber = message_data.get('is_sponsor', False) or is_broadcaster
-
-    # --- Lógica Restrictiva ---
-    if command_permission == 'subscribers' or command_permission == 'subscriber':
-        return is_subscriber
-        
-    if command_permission == 'moderators' or command_permission == 'moderator':
-        return is_moderator
-        
-    if command_permission == 'streamer':
-        return is_broadcaster
-
-    return False
+    return has_permission(roles_for_message(message_data), permission_mask(command_permission))
 
 # --- Almacenamiento de Cooldowns ---
-command_last_used = {} 
-user_last_used = {} 
+# Caducan solos y tienen tope de memoria: no crecen con cada chatter nuevo del stream
+# Segundos entre comandos de la BD de un mismo usuario en la misma plataforma (cualquiera
+# de ellos; TTS y asistencia llevan su propio control). No es global entre plataformas
+USER_COMMANDS_COOLDOWN = 5
+COOLDOWN_MAX_ENTRIES = 50000
+cooldowns = CooldownStore(max_entries=COOLDOWN_MAX_ENTRIES)
 
 
 # --- Procesador Principal ---
-def process_chat_message(data: dict):
-    platform = data.get("platform")
-    sender = data.get("sender")
-    content = data.get("content", "").strip() 
+def process_chat_message(data: ChatMessage):
+    platform = data.platform
+    sender = data.sender
+    content = (data.content or "").strip()
     
     if not content: return
         
@@ -176,11 +149,8 @@ def process_chat_message(data: dict):
         trigger_command = current_asistencia_config["command"].lower()
 
         if command_name == trigger_command:
-            from api import Api
-            api_instance = Api()
-            result = api_instance.registrar_asistencia(sender, platform)
-
-            if result["success"]:
+            # Dedupe en memoria y guardado por lotes: sin Api() ni SQLite por mensaje
+            if attendance_service.register(sender, platform):
                 # A. Confirmar en Chat
                 bus.publish("command:reply", {
                     "platform": platform,
@@ -195,28 +165,22 @@ def process_chat_message(data: dict):
                 if current_asistencia_config["sound_enabled"]:
                     play_attendance_sound(current_asistencia_config["sound_file"])
             else:
-                # --- CASO 2: YA REGISTRADO (Error) ---
-                error_msg = result.get('error', '')
-
-                if "Ya registraste" in error_msg:
-                    msg_template = current_asistencia_config.get("msg_error", "@{user} ya registraste tu asistencia hoy")
-                    response_text = msg_template.replace("{user}", f"@{sender}")
-
-                    bus.publish("command:reply", {
-                        "platform": platform,
-                        "response": response_text,
-                        "original_message": data
-                    })
-                    print(f"(Asistencia) {sender} intentó registrarse de nuevo.")
-                else:
-                    print(f"(Asistencia Error Interno) {error_msg}")
+                # --- CASO 2: YA REGISTRADO ---
+                msg_template = current_asistencia_config.get("msg_error", "@{user} ya registraste tu asistencia hoy")
+                response_text = msg_template.replace("{user}", f"@{sender}")
+
+                bus.publish("command:reply", {
+                    "platform": platform,
+                    "response": response_text,
+                    "original_message": data
+                })
+                print(f"(Asistencia) {sender} intentó registrarse de nuevo.")
             return
 
     # 2. --- LÓGICA TTS DINÁMICO (CONFIGURABLE) ---
     # Obtenemos el comando y el permiso actual desde la configuración global
     if current_modules_state["tts_enabled"]:
         tts_command_trigger = current_tts_command_config.get("command", "!decir").lower()
-        tts_min_permission = current_tts_command_config.get("tts_permission", "all").lower()
 
         if command_name == tts_command_trigger:
             texto_tts = content[len(tts_command_trigger):].strip()
@@ -227,72 +191,55 @@ def process_chat_message(data: dict):
             texto_a_leer = f"{sender} dice {texto_tts}" 
 
             # Verificamos permisos (Igual que antes)
-            if not user_has_permission(platform, tts_min_permission, data):
+            if not has_permission(data.roles, tts_permission_mask):
                 return 
 
-            # Filtro de palabras prohibidas (Usando tu lógica de incluir el nombre)
-            banned_words = current_tts_command_config.get("banned_words", [])
-
-            # Revisamos si hay groserías en el nombre O en el mensaje
-            if any(banned_word.lower() in texto_a_leer.lower() for banned_word in banned_words):
+            # Revisamos si hay groserías en el nombre O en el mensaje (una sola pasada)
+            if tts_word_filter.contains(texto_a_leer):
                 print(f"(TTS) Bloqueado por filtro.")
                 return
 
-            # Encolar (Enviamos el texto CON el nombre para que lo lea)
-            from api import Api
-            Api().tts_enqueue(sender, texto_a_leer)
+            # Encolar (Enviamos el texto CON el nombre para que lo lea).
+            # El streamer pasa delante; los duplicados se comparan por usuario y texto
+            # (sin el "dice"), así que dos usuarios que escriben lo mismo se leen los dos.
+            priority = PRIORITY_STREAMER if data.roles & ROLE_BROADCASTER else PRIORITY_NORMAL
+            tts_service.enqueue(sender, texto_a_leer, priority=priority, dedupe_key=texto_tts)
             return
 
     # 3. --- COMANDOS GENERALES (DB) ---
     if current_modules_state["commands_enabled"]:
         if command_name.startswith("!"):
-            comando_db = get_command_for_bot(command_name)
+            # Registro en memoria: sin SQLite en el camino del chat
+            comando_db = command_registry.get(command_name)
 
             if not comando_db: return
             if not comando_db['active']: return
             if (platform == 'twitch' and not comando_db['active_twitch']) or \
                (platform == 'kick' and not comando_db['active_kick']):
                 return
-            if platform == 'kick':
-                comando_db = get_command_for_bot(command_name)  # recargar
-            if not comando_db or not comando_db['active_kick']:
-                return
 
 
-            # Permisos comandos generales (aseguramos minúsculas)
-            db_perm = comando_db['permission'].lower()
-            if not user_has_permission(platform, db_perm, data):
+            # Permisos comandos generales (máscara precalculada en el registro)
+            if not has_permission(data.roles, comando_db['permission_mask']):
                 return 
 
-            # Cooldowns
-            current_time = time.time()
-            if current_time - command_last_used.get(command_name, 0) < comando_db['cooldown']:
+            # Cooldowns: global del comando, del usuario en cualquier comando (por plataforma)
+            # y del usuario en este comando. O se activan todos o ninguno
+            if not cooldowns.try_acquire(
+                (("cmd", command_name), comando_db['cooldown']),
+                (("user", platform, sender), USER_COMMANDS_COOLDOWN),
+                (("cmd_user", command_name, platform, sender), comando_db.get('user_cooldown') or 0),
+            ):
                 return
-            if current_time - user_last_used.get(sender, 0) < 5: 
-                return
-
-            command_last_used[command_name] = current_time
-            user_last_used[sender] = current_time
-
-            # --- LÓGICA SEGÚN TIPO DE COMANDO ---
-            response_text = comando_db['response']
-            cmd_type = comando_db.get('type', 'text') 
 
-            # 1. CONTADOR
-            if cmd_type == 'counter':
-                new_count = increment_command_counter(command_name)
-                if '{count}' in response_text:
-                    response_text = response_text.replace('{count}', str(new_count))
+            # --- RESPUESTA (plantilla precompilada en el registro) ---
+            ctx = TemplateContext(platform, sender, comando_db['name'].lower(), content, data)
 
-            # 2. TEMPORIZADOR / TIEMPO
-            elif cmd_type == 'timer':
-                now = datetime.datetime.now().strftime("%H:%M:%S")
-                if '{time}' in response_text:
-                    response_text = response_text.replace('{time}', now)
+            # Los contadores suman en cada uso, aunque la respuesta no muestre {count}
+            if comando_db.get('type', 'text') == 'counter':
+                ctx.count = command_counters.increment_counter(ctx.command)
 
-            # 4. VARIABLES GLOBALES
-            if '{user}' in response_text:
-                response_text = response_text.replace('{user}', sender)
+            response_text = comando_db['template'].render(ctx)
 
             # --- ENVIAR RESPUESTA ---
             bus.publish("command:reply", {
@@ -300,7 +247,7 @@ def process_chat_message(data: dict):
                 "response": response_text,
                 "original_message": data 
             })
-            increment_command_uses(command_name)
+            command_counters.increment_uses(ctx.command)  # Nombre canónico, como el contador
             bus.publish("stats:updated", {})
 
 # --- Reproductor de Sonido (Efectos) ---
@@ -322,5 +269,24 @@ def play_attendance_sound(file_path):
         print(f"(Audio) Error reproduciendo sonido: {e}")
 
 # Suscripción principal
+# Los conectores solo encolan: el procesado (SQLite, audio, TTS) corre en los workers
+# del tema y nunca frena la lectura del socket. Si la cola se llena, se pierde lo más viejo.
+# Reparto por plataforma+usuario: usuarios distintos en paralelo, cada usuario en orden.
+# El número de workers sale de 'chat_workers' en settings.json (se aplica al arrancar).
+DEFAULT_CHAT_WORKERS = 4
+
+def configured_chat_workers():
+    """Workers del chat según la config; DEFAULT_CHAT_WORKERS si falta o no es un entero >= 1."""
+    try:
+        workers = int(config_store.get("settings").get("chat_workers", DEFAULT_CHAT_WORKERS))
+    except (TypeError, ValueError):
+        return DEFAULT_CHAT_WORKERS
+    return workers if workers >= 1 else DEFAULT_CHAT_WORKERS
+
+def _chat_shard_key(data):
+    return (data.platform, data.sender)
+
+bus.configure_topic("chat:message_received", maxsize=2000, policy=POLICY_DROP_OLDEST,
+                    workers=configured_chat_workers(), shard_key=_chat_shard_key)
 bus.subscribe("chat:message_received", process_chat_message)
 print("(Chat Processor) Listo.")
\ No newline at end of file
@@ -0,0 +1,91 @@
+import threading
+from event_bus import bus
+import data.database as db
+from processing.templates import compile_template
+from connectors.roles import permission_mask
+
+
+class CommandRegistry:
+    """
+    Comandos de chat en memoria, indexados por nombre (en minúsculas). Se
+    carga una vez desde la BD y se actualiza con 'commands:changed', así el
+    enrutado de '!comando' nunca toca el disco.
+
+    Cada fila lleva su respuesta ya compilada en row['template'] y su
+    permiso como máscara de roles en row['permission_mask'].
+
+    Los índices son copy-on-write: cada cambio publica dicts nuevos y los
+    lectores (workers del chat) solo hacen un .get() sin candado.
+    """
+    def __init__(self):
+        self._by_name = {}
+        self._by_id = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _prepare(row):
+        row['template'] = compile_template(row.get('response') or '')
+        row['permission_mask'] = permission_mask(row.get('permission'))
+        return row
+
+    def load(self):
+        """(Re)carga todos los comandos de la BD."""
+        rows = db.get_commands()
+        by_name, by_id = {}, {}
+        for row in rows:
+            self._prepare(row)
+            by_id[row['id']] = row
+            by_name[row['name'].lower()] = row
+        with self._lock:
+            self._by_name, self._by_id = by_name, by_id
+        print(f"(Command Registry) {len(by_id)} comandos cargados en memoria.")
+
+    def get(self, name: str):
+        """Comando por nombre (en minúsculas), o None."""
+        return self._by_name.get(name)
+
+    def __len__(self):
+        return len(self._by_id)
+
+    def upsert(self, command_id):
+        """Relee una sola fila (tras crear/editar/activar) y la sustituye en los índices."""
+        row = db.get_command_by_id(command_id)
+        with self._lock:
+            by_name, by_id = self._without(command_id)
+            if row:
+                self._prepare(row)
+                by_id[row['id']] = row
+                by_name[row['name'].lower()] = row
+            self._by_name, self._by_id = by_name, by_id
+
+    def remove(self, command_id):
+        with self._lock:
+            self._by_name, self._by_id = self._without(command_id)
+
+    def _without(self, command_id):
+        """Copias de los índices sin el comando dado (con el candado tomado)."""
+        by_name = dict(self._by_name)
+        by_id = dict(self._by_id)
+        old = by_id.pop(command_id, None)
+        if old and by_name.get(old['name'].lower()) is old:
+            del by_name[old['name'].lower()]
+        return by_name, by_id
+
+    def on_commands_changed(self, data):
+        """Callback del bus: {'action': 'upsert'|'delete', 'id': ...}; sin id se recarga todo."""
+        try:
+            action = (data or {}).get("action")
+            command_id = (data or {}).get("id")
+            if command_id is None:
+                self.load()
+            elif action == "delete":
+                self.remove(command_id)
+            else:
+                self.upsert(command_id)
+        except Exception as e:
+            print(f"(Command Registry) Error actualizando comandos: {e}")
+
+
+command_registry = CommandRegistry()
+bus.subscribe("commands:changed", command_registry.on_commands_changed)
+command_registry.load()
@@ -0,0 +1,104 @@
+import heapq
+import itertools
+import sys
+import threading
+import time
+
+
+class CooldownStore:
+    """
+    Cooldowns con caducidad automática y memoria acotada.
+
+    Cada clave guarda el instante en que deja de estar en cooldown; un
+    montículo ordenado por ese instante permite purgar las vencidas en
+    orden de caducidad (no de uso). Si se supera 'max_entries', se borran
+    primero todas las vencidas y solo después las activas que antes iban a
+    caducar (quien pierde el cooldown es a quien menos le quedaba).
+    """
+    PURGE_PER_INSERT = 4  # Vencidas que se intentan limpiar por inserción
+
+    def __init__(self, max_entries=50000):
+        self.max_entries = max_entries
+        self.evicted = 0
+        self._entries = {}  # clave -> expira_en (time.monotonic)
+        self._heap = []  # (expira_en, n, clave); puede tener restos de claves renovadas
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    def try_acquire(self, *rules, now=None) -> bool:
+        """
+        rules: pares (clave, segundos). Si ninguna clave está en cooldown, las
+        activa todas y devuelve True; si alguna lo está, no toca nada y devuelve False.
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            entries = self._entries
+            for key, seconds in rules:
+                if seconds > 0:
+                    expires_at = entries.get(key)
+                    if expires_at is not None and expires_at > now:
+                        return False
+            for key, seconds in rules:
+                if seconds > 0:
+                    expires_at = now + seconds
+                    entries[key] = expires_at
+                    heapq.heappush(self._heap, (expires_at, next(self._counter), key))
+            self._purge(now)
+            return True
+
+    def remaining(self, key, now=None) -> float:
+        """Segundos que le quedan a una clave (0 si no está en cooldown)."""
+        now = time.monotonic() if now is None else now
+        expires_at = self._entries.get(key)
+        return max(0.0, expires_at - now) if expires_at is not None else 0.0
+
+    def _pop_stale(self):
+        """Quita de la cima del montículo los restos de claves renovadas o ya borradas."""
+        heap, entries = self._heap, self._entries
+        while heap and entries.get(heap[0][2]) != heap[0][0]:
+            heapq.heappop(heap)
+
+    def _purge(self, now):
+        heap, entries = self._heap, self._entries
+        for _ in range(self.PURGE_PER_INSERT):
+            self._pop_stale()
+            if not heap or heap[0][0] > now:
+                break
+            del entries[heapq.heappop(heap)[2]]
+        if len(entries) > self.max_entries:
+            # Lleno: fuera todas las vencidas y, si no basta, las que antes caducan
+            while len(entries) > self.max_entries:
+                self._pop_stale()
+                expires_at, _, key = heapq.heappop(heap)
+                del entries[key]
+                if expires_at > now:
+                    self.evicted += 1
+        if len(heap) > 2 * len(entries) + 64:
+            # Demasiados restos de renovaciones: se reconstruye
+            self._heap = [(e, next(self._counter), k) for k, e in entries.items()]
+            heapq.heapify(self._heap)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._heap.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def memory_usage(self):
+        """Entradas vivas y una estimación de bytes ocupados (dict + claves + floats)."""
+        with self._lock:
+            entries = list(self._entries.items())
+            heap_size = sys.getsizeof(self._heap) + len(self._heap) * sys.getsizeof((0.0, 0, None))
+        size = sys.getsizeof(self._entries) + heap_size
+        for key, expires_at in entries:
+            size += sys.getsizeof(key) + sys.getsizeof(expires_at)
+            if isinstance(key, tuple):
+                size += sum(sys.getsizeof(part) for part in key)
+        return {
+            "entries": len(entries),
+            "max_entries": self.max_entries,
+            "evicted": self.evicted,
+            "approx_bytes": size,
+        }
@@ -2,7 +2,7 @@ import requests
 import json
 import asyncio
 from data import tokens as token_manager
-from event_bus import bus
+from event_bus import bus, PRIORITY_HIGH
 
 # --- Función de Envío KICK ---
 async def send_kick_message(message_text: str):
@@ -52,6 +52,8 @@ async def handle_reply_event(data: dict):
         print(f"(Sender Processor) Plataforma desconocida para enviar: {platform}")
 
 # Suscribirse al evento de respuestas
+# Las respuestas van por el carril prioritario: no esperan detrás de refrescos de UI
+bus.set_priority("command:reply", PRIORITY_HIGH)
 bus.subscribe("command:reply", handle_reply_event)
 print("(Sender Processor) Suscrito a eventos de respuesta.")
 
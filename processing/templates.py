@@ -0,0 +1,168 @@
+import random
+import datetime
+from functools import lru_cache
+
+
+class TemplateContext:
+    """
+    Datos de una invocación de comando. Los proveedores de variables leen de
+    aquí; 'count' se rellena solo en comandos tipo contador (ya incrementado).
+    """
+    __slots__ = ("platform", "sender", "command", "content", "message", "count", "_args")
+
+    def __init__(self, platform, sender, command, content="", message=None, count=None):
+        self.platform = platform
+        self.sender = sender
+        self.command = command
+        self.content = content
+        self.message = message
+        self.count = count
+        self._args = None
+
+    @property
+    def args(self) -> list:
+        """Palabras tras el nombre del comando (se trocea solo si alguna variable lo pide)."""
+        if self._args is None:
+            self._args = self.content.split()[1:]
+        return self._args
+
+
+# --- Proveedores de variables ---
+# Cada proveedor recibe (ctx, parámetro) y devuelve el texto a insertar.
+# El parámetro es lo que va tras ':' en '{nombre:parámetro}' (o None).
+_providers = {}
+
+
+def register_variable(name: str, provider):
+    """Registra (o reemplaza) la variable '{name}'. Las plantillas ya compiladas la ven al renderizar."""
+    _providers[name] = provider
+
+
+def _var_user(ctx, param):
+    return ctx.sender or ""
+
+
+def _var_platform(ctx, param):
+    return ctx.platform or ""
+
+
+def _var_count(ctx, param):
+    if ctx.count is None:
+        # Comando que no es contador: se muestra el valor actual sin sumar
+        from data.usage_counters import command_counters
+        ctx.count = command_counters.get_counter(ctx.command)
+    return str(ctx.count)
+
+
+def _var_time(ctx, param):
+    return datetime.datetime.now().strftime(param or "%H:%M:%S")
+
+
+def _var_args(ctx, param):
+    """'{args}' = todo el texto tras el comando; '{args:1}' = primera palabra."""
+    if param is None:
+        return " ".join(ctx.args)
+    try:
+        index = int(param)
+    except ValueError:
+        return ""
+    # Los índices empiezan en 1: '{args:0}' o negativos no dan la vuelta a la lista
+    if index < 1 or index > len(ctx.args):
+        return ""
+    return ctx.args[index - 1]
+
+
+def _var_random(ctx, param):
+    """'{random}' = 1..100; '{random:1-6}' = rango propio."""
+    low, high = 1, 100
+    if param:
+        try:
+            a, b = param.split("-", 1)
+            low, high = sorted((int(a), int(b)))
+        except ValueError:
+            pass
+    return str(random.randint(low, high))
+
+
+register_variable("user", _var_user)
+register_variable("platform", _var_platform)
+register_variable("count", _var_count)
+register_variable("time", _var_time)
+register_variable("args", _var_args)
+register_variable("random", _var_random)
+
+
+class Template:
+    """
+    Respuesta ya troceada en literales y variables. render() hace una sola
+    pasada y solo evalúa las variables que aparecen en el texto.
+    """
+    __slots__ = ("source", "_parts", "variables")
+
+    def __init__(self, source: str):
+        self.source = source
+        parts = []       # str (literal) o tupla (nombre, parámetro, texto original)
+        variables = set()
+        literal = []
+        i = 0
+        n = len(source)
+        while i < n:
+            start = source.find("{", i)
+            if start < 0:
+                literal.append(source[i:])
+                break
+            end = source.find("}", start + 1)
+            if end < 0:
+                literal.append(source[i:])
+                break
+            inner = source[start + 1:end]
+            if "{" in inner:
+                # '{{x}' y similares: la primera llave es texto
+                literal.append(source[i:start + 1])
+                i = start + 1
+                continue
+            literal.append(source[i:start])
+            name, sep, param = inner.partition(":")
+            if literal:
+                parts.append("".join(literal))
+                literal = []
+            parts.append((name, param if sep else None, source[start:end + 1]))
+            variables.add(name)
+            i = end + 1
+        if literal:
+            parts.append("".join(literal))
+        self._parts = tuple(p for p in parts if p != "")
+        self.variables = frozenset(variables)
+
+    def uses(self, name: str) -> bool:
+        return name in self.variables
+
+    def render(self, ctx: TemplateContext) -> str:
+        parts = self._parts
+        if len(parts) == 1 and parts[0].__class__ is str:
+            return parts[0]  # Sin variables
+        out = []
+        providers = _providers
+        for part in parts:
+            if part.__class__ is str:
+                out.append(part)
+                continue
+            provider = providers.get(part[0])
+            if provider is None:
+                out.append(part[2])  # Variable desconocida: se deja tal cual
+                continue
+            try:
+                out.append(provider(ctx, part[1]))
+            except Exception as e:
+                print(f"(Templates) Error en variable '{part[0]}': {e}")
+                out.append(part[2])
+        return "".join(out)
+
+    def __repr__(self):
+        return f"Template({self.source!r})"
+
+
+@lru_cache(maxsize=512)
+def compile_template(source: str) -> Template:
+    """Compila (con caché) una respuesta de comando."""
+    return Template(source or "")
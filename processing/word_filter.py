@@ -0,0 +1,97 @@
+import unicodedata
+
+# Sustituciones "leet" habituales para esquivar filtros (p0ll0 -> pollo)
+_LEET_MAP = str.maketrans({
+    "0": "o", "1": "i", "3": "e", "4": "a", "5": "s", "7": "t",
+    "@": "a", "$": "s", "!": "i",
+})
+
+
+def normalize_text(text: str) -> str:
+    """Minúsculas, sin acentos y con los números/símbolos 'leet' traducidos a letras."""
+    text = unicodedata.normalize("NFKD", text.casefold())
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return text.translate(_LEET_MAP)
+
+
+class BannedWordFilter:
+    """
+    Filtro de palabras prohibidas con un autómata Aho-Corasick: se compila una
+    vez por cambio de configuración y cada mensaje se recorre en una sola
+    pasada, sin importar cuántos términos haya en la lista.
+    Sirve igual para el TTS que para respuestas de comandos.
+    """
+    def __init__(self, words=None, normalize=False):
+        # (transiciones, enlaces de fallo, salidas, normalizar) se sustituye entero al recompilar
+        self._automaton = None
+        self._source = None
+        if words:
+            self.compile(words, normalize)
+
+    def _prepare(self, text, normalize):
+        return normalize_text(text) if normalize else text.lower()
+
+    def compile(self, words, normalize=False):
+        """Construye el autómata. No hace nada si la lista y el modo no han cambiado."""
+        source = (tuple(words or ()), bool(normalize))
+        if source == self._source:
+            return
+        # Cada término tal cual se escribió (espacios incluidos: " ass " solo casa la palabra
+        # suelta, no dentro de "class"); solo se descartan los vacíos
+        patterns = {self._prepare(w, normalize): w for w in source[0] if w}
+        patterns.pop("", None)
+
+        goto = [{}]       # nodo -> {carácter: nodo}
+        output = [None]   # nodo -> palabra original que termina aquí (o por su enlace de fallo)
+        for pattern, original in patterns.items():
+            node = 0
+            for ch in pattern:
+                nxt = goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[node][ch] = nxt
+                    goto.append({})
+                    output.append(None)
+                node = nxt
+            output[node] = original
+
+        # Enlaces de fallo por anchura (BFS)
+        fail = [0] * len(goto)
+        frontier = list(goto[0].values())
+        while frontier:
+            next_frontier = []
+            for node in frontier:
+                for ch, child in goto[node].items():
+                    f = fail[node]
+                    while f and ch not in goto[f]:
+                        f = fail[f]
+                    target = goto[f].get(ch, 0)
+                    fail[child] = target if target != child else 0
+                    if output[child] is None:
+                        output[child] = output[fail[child]]
+                    next_frontier.append(child)
+            frontier = next_frontier
+
+        self._automaton = (goto, fail, output, source[1]) if patterns else None
+        self._source = source
+
+    def find(self, text: str):
+        """Primera palabra prohibida encontrada en el texto (tal como se configuró), o None."""
+        automaton = self._automaton
+        if automaton is None or not text:
+            return None
+        goto, fail, output, normalize = automaton
+        node = 0
+        for ch in self._prepare(text, normalize):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if output[node] is not None:
+                return output[node]
+        return None
+
+    def contains(self, text: str) -> bool:
+        return self.find(text) is not None
+
+    def __len__(self):
+        return len(self._source[0]) if self._source else 0
@@ -0,0 +1,84 @@
+import atexit
+import threading
+from collections import defaultdict
+import data.database as db
+
+
+class AttendanceService:
+    """
+    Registro de asistencias de la sesión.
+
+    El control de "ya registrado" vive en memoria (un set por sesión), así que
+    un '!asistencia' cuesta un lookup y un add. Las altas se acumulan y se
+    guardan con executemany en una sola transacción cada FLUSH_INTERVAL
+    segundos, al llegar a FLUSH_THRESHOLD pendientes, antes de leer/editar la
+    tabla desde la API, o al cerrar la app.
+    """
+    FLUSH_INTERVAL = 1.0
+    FLUSH_THRESHOLD = 100
+
+    def __init__(self):
+        self._session = set()                  # (nickname, platform) ya registrados en esta sesión
+        self._pending = defaultdict(int)       # (nickname, platform) -> asistencias por guardar
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()    # Un volcado a la vez
+        self._wake = threading.Event()
+        self._running = True
+        self._thread = threading.Thread(target=self._flush_loop, name="Attendance", daemon=True)
+        self._thread.start()
+
+    def register(self, nickname: str, platform: str) -> bool:
+        """True si es su primera asistencia de la sesión (queda registrada); False si ya estaba."""
+        key = (nickname.lower(), platform.lower())
+        with self._lock:
+            if key in self._session:
+                return False
+            self._session.add(key)
+            self._pending[key] += 1
+            if len(self._pending) >= self.FLUSH_THRESHOLD:
+                self._wake.set()
+        return True
+
+    def is_registered(self, nickname: str, platform: str) -> bool:
+        return (nickname.lower(), platform.lower()) in self._session
+
+    def reset_session(self):
+        """Nueva sesión: todos pueden volver a registrarse (lo pendiente se guarda igual)."""
+        with self._lock:
+            self._session.clear()
+
+    def session_size(self) -> int:
+        return len(self._session)
+
+    def flush(self):
+        """Guarda todas las asistencias pendientes en una única transacción."""
+        with self._flush_lock:
+            with self._lock:
+                if not self._pending:
+                    return
+                pending, self._pending = self._pending, defaultdict(int)
+            rows = [(nickname, platform, count) for (nickname, platform), count in pending.items()]
+            try:
+                db.log_user_assistance_many(rows)
+            except Exception as e:
+                print(f"(Attendance) Error guardando asistencias, se reintentará: {e}")
+                with self._lock:
+                    for key, count in pending.items():
+                        self._pending[key] += count
+
+    def _flush_loop(self):
+        while self._running:
+            self._wake.wait(self.FLUSH_INTERVAL)
+            self._wake.clear()
+            self.flush()
+
+    def close(self):
+        """Guarda lo pendiente y detiene el hilo (llamar al cerrar la app)."""
+        self._running = False
+        self._wake.set()
+        self.flush()
+
+
+attendance_service = AttendanceService()
+# Red de seguridad si la app termina sin pasar por main.py
+atexit.register(attendance_service.flush)
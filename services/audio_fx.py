@@ -0,0 +1,142 @@
+"""
+Efecto de velocidad del TTS en el propio proceso (sin lanzar FFmpeg).
+
+Reproduce lo que hace 'asetrate=44100*speed,aresample=44100': el audio se
+decodifica una vez con pygame, se filtra con un paso bajo (sinc con ventana)
+cuando se acelera y se re-muestrea con NumPy. Es opcional
+('tts_effects_backend': "numpy"); por defecto TTSService usa FFmpeg, que en
+bench/bench_audio_fx.py sigue saliendo más rápido. Sin NumPy, o si pygame no
+puede decodificar el audio, se vuelve a FFmpeg.
+"""
+import io
+import struct
+import threading
+import wave
+
+try:
+    import numpy as np
+except ImportError:  # Dependencia opcional
+    np = None
+
+import pygame
+
+BASE_RATE = 44100
+LOWPASS_HALF_TAPS = 32  # Coeficientes a cada lado del filtro anti-aliasing (65 en total)
+
+# SDL_mixer no garantiza decodificar en paralelo: una decodificación a la vez
+_decode_lock = threading.Lock()
+
+# Frecuencias de muestreo de la cabecera MP3: [versión][índice]
+_MP3_RATES = {
+    3: (44100, 48000, 32000),  # MPEG-1
+    2: (22050, 24000, 16000),  # MPEG-2
+    0: (11025, 12000, 8000),   # MPEG-2.5
+}
+
+
+def available() -> bool:
+    """True si el efecto en proceso puede usarse (NumPy instalado y mezclador de pygame activo)."""
+    return np is not None and bool(pygame.mixer.get_init())
+
+
+def source_sample_rate(data: bytes, fmt: str) -> int:
+    """Frecuencia original del audio (WAV o MP3), leída de la cabecera."""
+    if fmt == "wav":
+        with wave.open(io.BytesIO(data), "rb") as w:
+            return w.getframerate()
+
+    pos = 0
+    if data[:3] == b"ID3" and len(data) >= 10:
+        # Etiqueta ID3v2: tamaño 'syncsafe' de 4 bytes (7 bits cada uno)
+        size = (data[6] << 21) | (data[7] << 14) | (data[8] << 7) | data[9]
+        pos = 10 + size
+    while pos + 4 <= len(data):
+        if data[pos] == 0xFF and (data[pos + 1] & 0xE0) == 0xE0:
+            header = struct.unpack(">I", data[pos:pos + 4])[0]
+            version = (header >> 19) & 0x3
+            rate_index = (header >> 10) & 0x3
+            if version in _MP3_RATES and rate_index < 3:
+                return _MP3_RATES[version][rate_index]
+        pos += 1
+    raise ValueError("No se encontró una cabecera MP3 válida")
+
+
+def decode(data: bytes):
+    """Decodifica con pygame al formato del mezclador. Devuelve (muestras int16 [n, canales], frecuencia)."""
+    freq = pygame.mixer.get_init()[0]
+    with _decode_lock:
+        samples = pygame.sndarray.array(pygame.mixer.Sound(file=io.BytesIO(data)))
+    if samples.ndim == 1:
+        samples = samples.reshape(-1, 1)
+    return samples, freq
+
+
+def lowpass_kernel(cutoff: float, half_taps: int = LOWPASS_HALF_TAPS):
+    """FIR sinc con ventana de Blackman; 'cutoff' en ciclos por muestra (0.5 = Nyquist), ganancia 1."""
+    n = np.arange(-half_taps, half_taps + 1, dtype=np.float64)
+    kernel = np.sinc(2 * cutoff * n) * np.blackman(len(n))
+    return kernel / kernel.sum()
+
+
+def resample(samples, step: float, out_len: int = None, band: float = 0.5):
+    """
+    Re-muestreo vectorizado: la muestra de salida k sale de la posición
+    k*step de la entrada (np.interp). Con step > 1 se salta muestras, así
+    que antes se filtra por debajo del nuevo Nyquist (0.5/step): sin eso,
+    al acelerar lo que queda por encima se pliega como aliasing. 'band' es
+    hasta dónde llega de verdad la señal (ciclos por muestra); si ya cabe,
+    el filtro se omite. Si todos los canales son iguales (voz mono que
+    pygame duplicó), se calcula uno y se replica.
+    """
+    n, channels = samples.shape
+    if out_len is None:
+        out_len = max(1, int(n / step))
+    positions = np.arange(out_len, dtype=np.float64) * step
+    grid = np.arange(n, dtype=np.float64)
+    kernel = lowpass_kernel(0.5 / step) if 0.5 / step < band else None
+
+    def channel(x):
+        if kernel is not None:
+            x = np.convolve(x.astype(np.float64), kernel, mode="same")
+        return np.rint(np.clip(np.interp(positions, grid, x), -32768, 32767))
+
+    identical = channels > 1 and all(np.array_equal(samples[:, 0], samples[:, c]) for c in range(1, channels))
+    if identical or channels == 1:
+        mono = channel(samples[:, 0]).astype(np.int16)
+        return np.repeat(mono[:, None], channels, axis=1)
+    out = np.empty((out_len, channels), dtype=np.int16)
+    for c in range(channels):
+        out[:, c] = channel(samples[:, c])
+    return out
+
+
+def to_wav(samples, rate: int) -> bytes:
+    """Empaqueta muestras int16 [n, canales] como WAV en memoria."""
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as w:
+        w.setnchannels(samples.shape[1])
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes(np.ascontiguousarray(samples).tobytes())
+    return buffer.getvalue()
+
+
+def apply_speed(data: bytes, fmt: str, speed: float, mono: bool = False) -> bytes:
+    """
+    Equivalente en proceso de FFmpeg 'asetrate=44100*speed,aresample=44100'.
+
+    FFmpeg reinterpreta las muestras originales (a 'source_rate') como si
+    fueran de 44100*speed Hz; aquí se decodifica al ritmo del mezclador y se
+    avanza 44100*speed/source_rate muestras por cada muestra de salida. El
+    WAV resultante ya está en el formato del mezclador: pygame lo reproduce
+    sin convertir. 'mono' mezcla los canales (vistas previas más ligeras).
+    """
+    source_rate = source_sample_rate(data, fmt)
+    samples, mixer_rate = decode(data)
+    new_rate = int(BASE_RATE * speed)
+    step = new_rate / source_rate
+    # Lo decodificado solo tiene contenido hasta el Nyquist del original
+    out = resample(samples, step, band=min(0.5, source_rate / (2 * mixer_rate)))
+    if mono and out.shape[1] > 1:
+        out = np.rint(out.mean(axis=1)).astype(np.int16).reshape(-1, 1)
+    return to_wav(out, mixer_rate)
@@ -0,0 +1,141 @@
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+
+APP_DATA = os.path.join(os.getenv("LOCALAPPDATA"), "StreamCoreData")
+TTS_CACHE_DIR = os.path.join(APP_DATA, "tts_cache")
+DEFAULT_CACHE_MB = 64
+
+
+class TTSCache:
+    """
+    Caché de audio TTS direccionada por contenido.
+
+    La clave es un hash de (texto, idioma, velocidad, tono, formato, motor):
+    la misma frase con los mismos ajustes se sirve desde disco sin volver a
+    sintetizar ni pasar por FFmpeg. El índice vive en memoria en orden LRU y
+    se expulsa lo menos usado cuando se supera 'max_bytes'.
+    """
+    def __init__(self, directory=TTS_CACHE_DIR, max_bytes=DEFAULT_CACHE_MB * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._index = OrderedDict()  # nombre de archivo -> tamaño (el final es lo más reciente)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._load_index()
+
+    @staticmethod
+    def key(text: str, lang: str, speed: float, pitch: float, fmt: str, engine: str = "gtts") -> str:
+        normalized = " ".join(text.split())
+        raw = f"{engine}\x1f{lang}\x1f{float(speed):.3f}\x1f{float(pitch):.3f}\x1f{normalized}"
+        return f"{hashlib.sha256(raw.encode('utf-8')).hexdigest()}.{fmt}"
+
+    def _load_index(self):
+        """Recupera lo cacheado en sesiones anteriores (más antiguo primero)."""
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            entries = []
+            for entry in os.scandir(self.directory):
+                if entry.is_file() and not entry.name.endswith(".tmp"):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, entry.name, stat.st_size))
+            for _, name, size in sorted(entries):
+                self._index[name] = size
+                self._bytes += size
+            self._evict_locked()
+        except Exception as e:
+            print(f"(TTS Cache) Error leyendo caché: {e}")
+
+    def get(self, key: str):
+        """Audio cacheado (bytes) o None."""
+        with self._lock:
+            if key not in self._index:
+                self.misses += 1
+                return None
+            self._index.move_to_end(key)
+        path = os.path.join(self.directory, key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)  # La recencia sobrevive a reinicios
+        except OSError:
+            with self._lock:
+                self._bytes -= self._index.pop(key, 0)
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return data
+
+    def put(self, key: str, data: bytes):
+        if not data or len(data) > self.max_bytes:
+            return
+        path = os.path.join(self.directory, key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"(TTS Cache) No se pudo guardar en caché: {e}")
+            return
+        with self._lock:
+            self._bytes -= self._index.pop(key, 0)
+            self._index[key] = len(data)
+            self._bytes += len(data)
+            self._evict_locked()
+
+    def get_or_create(self, key: str, factory):
+        """Devuelve lo cacheado o llama a factory() y guarda el resultado."""
+        data = self.get(key)
+        if data is None:
+            data = factory()
+            self.put(key, data)
+        return data
+
+    def _evict_locked(self):
+        while self._bytes > self.max_bytes and self._index:
+            name, size = self._index.popitem(last=False)
+            self._bytes -= size
+            self.evictions += 1
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                pass
+
+    def set_budget(self, max_mb: float):
+        with self._lock:
+            self.max_bytes = int(float(max_mb) * 1024 * 1024)
+            self._evict_locked()
+
+    def clear(self):
+        with self._lock:
+            names = list(self._index)
+            self._index.clear()
+            self._bytes = 0
+        for name in names:
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                pass
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._index),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+tts_cache = TTSCache()
@@ -0,0 +1,221 @@
+import time
+import itertools
+import threading
+from collections import deque, defaultdict
+
+PRIORITY_STREAMER = 0  # Pruebas del panel y mensajes del propio streamer: primero
+PRIORITY_NORMAL = 1    # Chat
+
+# Valores por defecto (la config TTS los sobrescribe)
+DEFAULT_MAX_DEPTH = 50     # tts_queue_max: mensajes en espera como mucho
+DEFAULT_TTL = 120          # tts_queue_ttl: segundos; lo más viejo ya no viene a cuento
+DEFAULT_USER_QUOTA = 3     # tts_user_quota: mensajes en espera por usuario (0 = sin límite)
+DEFAULT_DEDUPE_WINDOW = 30  # tts_dedupe_window: segundos en los que se ignora el mismo texto
+
+# Motivos de rechazo/descarte (también son las claves de stats())
+REJECT_FULL = "full"
+REJECT_QUOTA = "quota"
+REJECT_DUPLICATE = "duplicate"
+DROP_EXPIRED = "expired"
+DROP_EVICTED = "evicted"
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.casefold().split())
+
+
+class TTSItem:
+    """Mensaje en espera. 'enqueued_at' es perf_counter (TTL y TTFA); 'created' es hora de reloj para el panel."""
+    __slots__ = ("id", "user", "text", "priority", "enqueued_at", "created")
+
+    def __init__(self, item_id, user, text, priority, enqueued_at, created):
+        self.id = item_id
+        self.user = user
+        self.text = text
+        self.priority = priority
+        self.enqueued_at = enqueued_at
+        self.created = created
+
+    def to_dict(self, now: float) -> dict:
+        return {
+            "id": self.id,
+            "user": self.user,
+            "message": self.text,
+            "priority": self.priority,
+            "age": round(now - self.enqueued_at, 1),
+            "created": self.created,
+        }
+
+
+class TTSScheduler:
+    """
+    Cola del TTS con límites, en lugar de un queue.Queue sin fondo.
+
+    - Un carril por prioridad: lo del streamer sale antes que el chat.
+    - 'max_depth': con la cola llena se rechaza lo nuevo, salvo que tenga más
+      prioridad que lo que espera (entonces sale el mensaje normal más viejo).
+    - 'ttl': lo que lleva más de 'ttl' segundos esperando se descarta al llegar
+      su turno (en una raid no se leen mensajes de hace diez minutos).
+    - 'user_quota': mensajes en espera por usuario.
+    - Duplicados: el mismo texto (sin importar mayúsculas/espacios) del mismo
+      usuario se ignora durante 'dedupe_window' segundos; dos usuarios que
+      dicen lo mismo se leen los dos.
+    Cuota y duplicados solo aplican al chat, nunca a PRIORITY_STREAMER.
+    """
+    def __init__(self, max_depth=DEFAULT_MAX_DEPTH, ttl=DEFAULT_TTL, user_quota=DEFAULT_USER_QUOTA,
+                 dedupe_window=DEFAULT_DEDUPE_WINDOW, clock=time.perf_counter):
+        self.max_depth = max_depth
+        self.ttl = ttl
+        self.user_quota = user_quota
+        self.dedupe_window = dedupe_window
+        self._clock = clock
+        self._lanes = (deque(), deque())  # Índice = prioridad
+        self._per_user = defaultdict(int)
+        self._recent = {}  # (usuario, texto normalizado) -> instante en que se aceptó
+        self._ids = itertools.count(1)
+        self._cond = threading.Condition()
+        self.accepted = 0
+        self.dropped = defaultdict(int)
+
+    def configure(self, config: dict):
+        """Lee 'tts_queue_max', 'tts_queue_ttl', 'tts_user_quota' y 'tts_dedupe_window'."""
+        with self._cond:
+            self.max_depth = max(1, int(config.get("tts_queue_max", self.max_depth)))
+            self.ttl = float(config.get("tts_queue_ttl", self.ttl))
+            self.user_quota = int(config.get("tts_user_quota", self.user_quota))
+            self.dedupe_window = float(config.get("tts_dedupe_window", self.dedupe_window))
+
+    def __len__(self):
+        with self._cond:
+            return len(self._lanes[0]) + len(self._lanes[1])
+
+    def put(self, user, text, priority=PRIORITY_NORMAL, dedupe_key=None):
+        """
+        Encola un mensaje. Devuelve (TTSItem, None) si entra, o (None, motivo)
+        si se rechaza. 'dedupe_key' permite comparar solo el mensaje y no el
+        "<usuario> dice ..." que se va a leer (el usuario ya va en la clave).
+        """
+        priority = PRIORITY_STREAMER if priority == PRIORITY_STREAMER else PRIORITY_NORMAL
+        user = user or "Anon"
+        now = self._clock()
+        with self._cond:
+            if priority == PRIORITY_NORMAL:
+                if self.dedupe_window > 0:
+                    self._prune_recent_locked(now)
+                    key = (user, _normalize(dedupe_key or text))
+                    if key in self._recent:
+                        self.dropped[REJECT_DUPLICATE] += 1
+                        return None, REJECT_DUPLICATE
+                if self.user_quota > 0 and self._per_user[user] >= self.user_quota:
+                    self.dropped[REJECT_QUOTA] += 1
+                    return None, REJECT_QUOTA
+
+            if len(self._lanes[0]) + len(self._lanes[1]) >= self.max_depth:
+                self._expire_locked(now)
+            if len(self._lanes[0]) + len(self._lanes[1]) >= self.max_depth:
+                if priority == PRIORITY_NORMAL or not self._lanes[PRIORITY_NORMAL]:
+                    self.dropped[REJECT_FULL] += 1
+                    return None, REJECT_FULL
+                self._release_locked(self._lanes[PRIORITY_NORMAL].popleft())
+                self.dropped[DROP_EVICTED] += 1
+
+            item = TTSItem(next(self._ids), user, text, priority, now, time.time())
+            self._lanes[priority].append(item)
+            self._per_user[user] += 1
+            if priority == PRIORITY_NORMAL and self.dedupe_window > 0:
+                self._recent[key] = now
+            self.accepted += 1
+            self._cond.notify()
+            return item, None
+
+    def get(self, timeout=None):
+        """Siguiente mensaje vigente (el de más prioridad, el más viejo primero) o None."""
+        deadline = None if timeout is None else self._clock() + timeout
+        with self._cond:
+            while True:
+                item = self._pop_locked()
+                if item is not None:
+                    return item
+                remaining = None if deadline is None else deadline - self._clock()
+                if remaining is not None and remaining <= 0:
+                    return None
+                self._cond.wait(remaining)
+
+    def get_nowait(self):
+        with self._cond:
+            return self._pop_locked()
+
+    def _pop_locked(self):
+        now = self._clock()
+        for lane in self._lanes:
+            while lane:
+                item = lane.popleft()
+                self._release_locked(item)
+                if self.ttl > 0 and now - item.enqueued_at > self.ttl:
+                    self.dropped[DROP_EXPIRED] += 1
+                    continue
+                return item
+        return None
+
+    def _expire_locked(self, now):
+        if self.ttl <= 0:
+            return
+        for lane in self._lanes:
+            while lane and now - lane[0].enqueued_at > self.ttl:
+                self._release_locked(lane.popleft())
+                self.dropped[DROP_EXPIRED] += 1
+
+    def _release_locked(self, item):
+        count = self._per_user[item.user] - 1
+        if count > 0:
+            self._per_user[item.user] = count
+        else:
+            self._per_user.pop(item.user, None)
+
+    def _prune_recent_locked(self, now):
+        # Insertados en orden de llegada: basta con recortar por el principio
+        limit = now - self.dedupe_window
+        while self._recent:
+            key, accepted_at = next(iter(self._recent.items()))
+            if accepted_at > limit:
+                break
+            del self._recent[key]
+
+    def remove(self, item_id) -> bool:
+        """Quita un mensaje en espera por su id."""
+        with self._cond:
+            for lane in self._lanes:
+                for item in lane:
+                    if item.id == item_id:
+                        lane.remove(item)
+                        self._release_locked(item)
+                        return True
+        return False
+
+    def clear(self) -> int:
+        """Vacía la cola; devuelve cuántos mensajes había."""
+        with self._cond:
+            count = len(self._lanes[0]) + len(self._lanes[1])
+            for lane in self._lanes:
+                lane.clear()
+            self._per_user.clear()
+            return count
+
+    def snapshot(self) -> list:
+        """Mensajes en espera en el orden en que se leerán (sin los ya caducados)."""
+        with self._cond:
+            now = self._clock()
+            self._expire_locked(now)
+            return [item.to_dict(now) for lane in self._lanes for item in lane]
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "pending": len(self._lanes[0]) + len(self._lanes[1]),
+                "accepted": self.accepted,
+                "dropped": dict(self.dropped),
+                "max_depth": self.max_depth,
+                "ttl": self.ttl,
+                "user_quota": self.user_quota,
+                "dedupe_window": self.dedupe_window,
+            }
@@ -1,17 +1,88 @@
 import threading
-import queue
 import os
+import io
+import re
 import time
-import json
 import sys
 import subprocess # <--- Nuevo: Para llamar a FFmpeg
+from collections import deque, OrderedDict
+from concurrent.futures import ThreadPoolExecutor, CancelledError
 import pygame
-from gtts import gTTS
-from event_bus import bus
+from event_bus import bus, PRIORITY_HIGH
+from data.config_store import config_store
+from services.tts_synth import GTTSSynthesizer
+from services.tts_cache import tts_cache, DEFAULT_CACHE_MB
+from services import audio_fx
+from services.tts_scheduler import TTSScheduler, PRIORITY_NORMAL
 
 # Rutas
 APP_DATA = os.path.join(os.getenv("LOCALAPPDATA"), "StreamCoreData")
-TTS_CONFIG_FILE = os.path.join(APP_DATA, "tts_config.json")
+
+# Fragmentos que se sintetizan por adelantado mientras suena el actual
+DEFAULT_PREFETCH = 3
+
+# Troceo de mensajes largos: se empieza a hablar con la primera frase
+CHUNK_MAX_CHARS = 150   # Tope por fragmento (gTTS también corta hacia los 100-200)
+CHUNK_MIN_CHARS = 40    # Frases más cortas se juntan con la siguiente (menos peticiones)
+TTFA_SAMPLES = 200      # Mensajes recientes para la estadística de tiempo hasta el primer audio
+
+_SENTENCE_END = re.compile(r"(?<=[.!?…;:])\s+|\n+")
+_PHRASE_END = re.compile(r"(?<=[,])\s+")
+# Un punto tras estas palabras (o tras una inicial: "J. R. R.") no cierra la frase
+_ABBREVIATIONS = {"sr.", "sra.", "srta.", "sres.", "dr.", "dra.", "lic.", "ing.", "prof.", "arq.",
+                  "ej.", "p.ej.", "aprox.", "núm.", "pág.", "vs.", "mr.", "mrs.", "ms.", "st."}
+
+
+def _ends_with_abbreviation(sentence: str) -> bool:
+    last = sentence.rsplit(None, 1)[-1].lower()
+    return last in _ABBREVIATIONS or (len(last) == 2 and last[0].isalpha() and last[1] == ".")
+
+
+def split_text(text: str, max_chars: int = CHUNK_MAX_CHARS, min_chars: int = CHUNK_MIN_CHARS) -> list:
+    """
+    Trocea un mensaje en frases para sintetizarlas por separado. La primera
+    se devuelve en cuanto acaba (así empieza a sonar antes); las siguientes
+    se juntan hasta 'min_chars' y ninguna pasa de 'max_chars'.
+    """
+    sentences = []
+    for sentence in _SENTENCE_END.split(text.strip()):
+        sentence = sentence.strip()
+        if not sentence:
+            continue
+        if sentences and _ends_with_abbreviation(sentences[-1]):
+            sentences[-1] = f"{sentences[-1]} {sentence}"  # "el Sr. López" va junto
+        else:
+            sentences.append(sentence)
+
+    pieces = []
+    for sentence in sentences:
+        if len(sentence) <= max_chars:
+            pieces.append(sentence)
+            continue
+        # Frase larga: por comas y, si aún no cabe, por palabras
+        current = ""
+        for phrase in _PHRASE_END.split(sentence):
+            for word in phrase.split():
+                if current and len(current) + 1 + len(word) > max_chars:
+                    pieces.append(current)
+                    current = word
+                else:
+                    current = f"{current} {word}" if current else word
+            if len(current) >= min_chars:
+                pieces.append(current)
+                current = ""
+        if current:
+            pieces.append(current)
+
+    chunks = []
+    for piece in pieces:
+        if len(chunks) > 1 and len(chunks[-1]) < min_chars and len(chunks[-1]) + 1 + len(piece) <= max_chars:
+            chunks[-1] = f"{chunks[-1]} {piece}"
+        elif len(chunks) == 1 and len(chunks[0]) < 4 and len(chunks[0]) + 1 + len(piece) <= max_chars:
+            chunks[0] = f"{chunks[0]} {piece}"  # Un primer fragmento de 1-3 letras no vale una petición
+        else:
+            chunks.append(piece)
+    return chunks
 
 # ==========================================
 # 🛠️ CONFIGURACIÓN DE FFMPEG PORTABLE
@@ -25,13 +96,70 @@ def get_resource_path(relative_path):
 
 ffmpeg_exe = get_resource_path(os.path.join("bin", "ffmpeg.exe"))
 
+def _fix_wav_sizes(data: bytes) -> bytes:
+    """
+    Por una tubería FFmpeg no puede volver atrás a escribir los tamaños del
+    WAV y los deja en 0xFFFFFFFF; los corregimos con el tamaño real.
+    """
+    pos = data.find(b"data", 12)
+    if data[:4] != b"RIFF" or pos < 0:
+        return data
+    fixed = bytearray(data)
+    fixed[4:8] = (len(data) - 8).to_bytes(4, "little")
+    fixed[pos + 4:pos + 8] = (len(data) - pos - 8).to_bytes(4, "little")
+    return bytes(fixed)
+
 # ==========================================
 
+class TTSChunk:
+    """Fragmento de un mensaje: 'index' 0 es el que marca el tiempo hasta el primer audio."""
+    __slots__ = ("text", "index", "last", "item")
+
+    def __init__(self, text, index, last, item):
+        self.text = text
+        self.index = index
+        self.last = last
+        self.item = item  # TTSItem del que sale
+
+
+class PreparedAudio:
+    """Audio listo para sonar (WAV en memoria) más lo que costó prepararlo."""
+    __slots__ = ("chunk", "wav", "prepare_time")
+
+    def __init__(self, chunk, wav, prepare_time):
+        self.chunk = chunk
+        self.wav = wav
+        self.prepare_time = prepare_time
+
+    @property
+    def text(self):
+        return self.chunk.text
+
+
 class TTSService:
-    def __init__(self):
+    """
+    TTS en dos etapas:
+      1. Preparación: cada mensaje se trocea en frases (split_text) y un pool
+         de 'prefetch' hilos sintetiza y procesa los siguientes fragmentos,
+         cada uno en su propio buffer.
+      2. Reproducción: un solo hilo toma el audio ya preparado, en orden, y
+         lo reproduce desde memoria. Mientras suena, el pool ya va con los
+         siguientes: un mensaje largo empieza a sonar con su primera frase y
+         entre fragmentos y mensajes casi no hay silencio.
+
+    La espera la gestiona TTSScheduler (límite, caducidad, cuotas por usuario,
+    duplicados y prioridad); queue_snapshot() es lo que muestra el panel.
+
+    Solo la instancia con 'subscribe=True' (el singleton del módulo) escucha
+    "tts:speak" y "tts:config" en el bus; las demás (pruebas, benchmarks)
+    reciben lo que se les pasa a enqueue() y nada más.
+    """
+    def __init__(self, synthesizer=None, prefetch=None, autostart=True, cache=tts_cache, subscribe=False):
         print("(TTS Service) Inicializando Audio Global (FFmpeg Directo)...")
-        self.queue = queue.Queue()
+        self.queue = TTSScheduler()
         self.running = True
+        self.synthesizer = synthesizer or GTTSSynthesizer()
+        self.cache = cache  # None = sin caché
         
         # Configuración por defecto
         self.config = {
@@ -41,6 +169,18 @@ class TTSService:
         }
         
         self.load_config_from_disk()
+        self.queue.configure(self.config)
+        if self.cache is not None:
+            self.cache.set_budget(self.config.get("tts_cache_mb", DEFAULT_CACHE_MB))
+        self.prefetch = max(1, int(prefetch or self.config.get("tts_prefetch", DEFAULT_PREFETCH)))
+        self._executor = ThreadPoolExecutor(max_workers=self.prefetch, thread_name_prefix="TTS-Synth")
+        self._window = deque()  # (fragmento, future) de los próximos, en orden de llegada
+        self._chunks = deque()  # Fragmentos del mensaje actual aún sin lanzar
+        self._taken = OrderedDict()  # id -> TTSItem sacados de la cola y aún no terminados
+        self._current = None  # TTSItem que está sonando
+        self._ttfa = deque(maxlen=TTFA_SAMPLES)  # Segundos desde on_speak hasta que suena
+        self._window_lock = threading.Lock()
+        self._channel = None
 
         # Inicializar Pygame Mixer
         try:
@@ -48,113 +188,326 @@ class TTSService:
         except Exception as e:
             print(f"(TTS Error) No se pudo iniciar Pygame: {e}")
 
-        bus.subscribe("tts:speak", self.on_speak)
-        bus.subscribe("tts:config", self.on_config_update)
+        self.subscribed = subscribe
+        if subscribe:
+            bus.set_priority("tts:speak", PRIORITY_HIGH)
+            bus.subscribe("tts:speak", self.on_speak)
+            bus.subscribe("tts:config", self.on_config_update)
 
-        self.worker_thread = threading.Thread(target=self._process_queue, daemon=True)
-        self.worker_thread.start()
+        self.worker_thread = threading.Thread(target=self._process_queue, name="TTS-Playback", daemon=True)
+        if autostart:
+            self.worker_thread.start()
 
     def load_config_from_disk(self):
         try:
-            if os.path.exists(TTS_CONFIG_FILE):
-                with open(TTS_CONFIG_FILE, 'r') as f:
-                    data = json.load(f)
-                    self.config.update(data)
+            self.config.update(config_store.get("tts"))
         except: pass
 
+    def _volume(self):
+        return float(self.config.get("volume", 80)) / 100.0
+
     def on_config_update(self, new_settings):
         self.config.update(new_settings)
+        self.queue.configure(self.config)
+        if self.cache is not None and "tts_cache_mb" in new_settings:
+            self.cache.set_budget(new_settings["tts_cache_mb"])
         # Intentar actualizar volumen en tiempo real
-        vol_float = float(self.config.get("volume", 80)) / 100.0
-        if pygame.mixer.get_init():
-            try: pygame.mixer.music.set_volume(vol_float)
+        channel = self._channel
+        if channel is not None:
+            try: channel.set_volume(self._volume())
             except: pass
 
+    def enqueue(self, user, message, priority=PRIORITY_NORMAL, dedupe_key=None) -> bool:
+        """
+        Pide leer un mensaje. PRIORITY_STREAMER pasa delante del chat y no
+        cuenta para cuotas ni duplicados; 'dedupe_key' es el texto con el que
+        se detectan duplicados (por defecto, el propio mensaje).
+        """
+        if not message:
+            return False
+        data = {"user": user, "message": message, "priority": priority, "dedupe_key": dedupe_key}
+        if self.subscribed:
+            bus.publish("tts:speak", data)
+        else:
+            self.on_speak(data)  # Sin bus: otra instancia no debe leer este mensaje
+        return True
+
     def on_speak(self, data):
         if isinstance(data, dict):
-            msg = data.get("message")
+            user, msg = data.get("user"), data.get("message")
+            priority, dedupe_key = data.get("priority", PRIORITY_NORMAL), data.get("dedupe_key")
         else:
-            msg = str(data)
-        if msg:
-            self.queue.put(msg)
+            user, msg, priority, dedupe_key = None, str(data), PRIORITY_NORMAL, None
+        if not msg:
+            return
+        item, reason = self.queue.put(user, msg, priority, dedupe_key)
+        if item is None:
+            print(f"(TTS) Mensaje de {user} descartado ({reason})")
+            return
+        self._notify_queue()
+
+    def _notify_queue(self):
+        """Avisa al panel de que la cola cambió (main.py lo coalesce)."""
+        bus.publish("tts:queue:updated", None)
+
+    # --- Etapa 1: preparación (pool) ---
+    def _fill_window(self, block: bool):
+        """Lanza la preparación de fragmentos hasta tener 'prefetch' en vuelo."""
+        while len(self._window) < self.prefetch:
+            if not self._chunks:
+                item = self.queue.get(timeout=1) if block and not self._window else self.queue.get_nowait()
+                if item is None:
+                    return
+                parts = split_text(item.text)
+                if not parts:
+                    continue
+                with self._window_lock:
+                    self._taken[item.id] = item
+                    self._chunks.extend(TTSChunk(part, index, index == len(parts) - 1, item)
+                                        for index, part in enumerate(parts))
+                self._notify_queue()
+            with self._window_lock:
+                if not self._chunks:
+                    continue
+                chunk = self._chunks.popleft()
+                future = self._executor.submit(self._prepare, chunk, dict(self.config))
+                self._window.append((chunk, future))
+
+    def _prepare(self, chunk, config) -> PreparedAudio:
+        """Sintetiza y aplica el efecto de velocidad. Corre en el pool, con la config del momento."""
+        text = chunk.text
+        started = time.perf_counter()
+        lang = config.get("lang", "es")
+        speed = float(config.get("speed", 0.6))
+        key = None
+        if self.cache is not None:
+            key = self.cache.key(text, lang, speed, config.get("pitch", 1.0), "wav", self.synthesizer.name)
+            wav = self.cache.get(key)
+            if wav is not None:
+                return PreparedAudio(chunk, wav, time.perf_counter() - started)
 
+        print(f"(TTS) Procesando: '{text}' | Speed: {speed}")
+        raw = self.synthesizer.synthesize(text, lang)
+        wav = self._apply_speed(raw, speed)
+        if key is not None:
+            self.cache.put(key, wav)
+        return PreparedAudio(chunk, wav, time.perf_counter() - started)
+
+    def _in_process_effects(self) -> bool:
+        """
+        True si el efecto va con NumPy en proceso. Es opcional
+        ('tts_effects_backend': "numpy"): por defecto FFmpeg, que en las
+        mediciones de bench/bench_audio_fx.py sigue siendo más rápido.
+        """
+        return self.config.get("tts_effects_backend", "ffmpeg") == "numpy" and audio_fx.available()
+
+    def _apply_speed(self, raw: bytes, speed: float) -> bytes:
+        """Efecto de velocidad: FFmpeg por tuberías, o NumPy si se eligió (y si falla, FFmpeg)."""
+        if self._in_process_effects():
+            try:
+                return audio_fx.apply_speed(raw, self.synthesizer.format, speed)
+            except Exception as e:
+                print(f"(TTS) Efecto en proceso no disponible, uso FFmpeg: {e}")
+        return self._apply_speed_ffmpeg(raw, speed)
+
+    def _apply_speed_ffmpeg(self, raw: bytes, speed: float, out_format: str = "wav") -> bytes:
+        """
+        Efecto Ardilla/Monstruo con FFmpeg: cambiamos el 'sample rate' (asetrate)
+        y resampleamos. Esto cambia velocidad y tono juntos, igual que pydub.
+        Usamos el valor directo del slider: si dice 0.6, FFmpeg usará 0.6.
+
+        Todo por tuberías: el audio entra por stdin y sale por stdout, sin
+        archivos temporales, así que varias conversiones pueden ir a la vez.
+        """
+        base_rate = 44100
+        new_rate = int(base_rate * speed)
+
+        # Comando: ffmpeg -f mp3 -i pipe:0 -af "asetrate=NEW_RATE,aresample=44100" -f wav pipe:1
+        # -v error: Menos texto en consola
+        cmd = [
+            ffmpeg_exe, 
+            "-v", "error", 
+            "-f", self.synthesizer.format, "-i", "pipe:0", 
+            "-af", f"asetrate={new_rate},aresample={base_rate}", 
+            "-f", out_format, "pipe:1"
+        ]
+
+        # Ejecutar comando silenciosamente
+        result = subprocess.run(cmd, input=raw, capture_output=True, check=True,
+                                creationflags=subprocess.CREATE_NO_WINDOW if os.name=='nt' else 0)
+        audio = result.stdout
+        if out_format == "wav":
+            audio = _fix_wav_sizes(audio)
+        return audio
+
+    def render_preview(self, text: str):
+        """
+        Audio de prueba para el panel con la config actual: (mime, bytes).
+        MP3 vía FFmpeg; con el efecto en proceso, un WAV mono hecho con NumPy.
+        """
+        lang = self.config.get("lang", "es")
+        speed = float(self.config.get("speed", 0.6))
+        in_process = self._in_process_effects()
+        fmt = "wav-mono" if in_process else "mp3"
+
+        def render():
+            raw = self.synthesizer.synthesize(text, lang)
+            if in_process:
+                return audio_fx.apply_speed(raw, self.synthesizer.format, speed, mono=True)
+            return self._apply_speed_ffmpeg(raw, speed, out_format="mp3")
+
+        if self.cache is None:
+            audio = render()
+        else:
+            # Las frases repetidas salen de la caché, sin gTTS ni efecto
+            key = self.cache.key(text, lang, speed, self.config.get("pitch", 1.0), fmt, self.synthesizer.name)
+            audio = self.cache.get_or_create(key, render)
+        return ("audio/wav" if in_process else "audio/mp3"), audio
+
+    # --- Etapa 2: reproducción ---
     def _process_queue(self):
         while self.running:
             if not self.config.get('tts_enabled', True):
                 time.sleep(1) # Esperamos 1 segundo y volvemos a checar el estado
                 continue
-            try:
-                text = self.queue.get(timeout=1)
-            except queue.Empty:
+
+            self._fill_window(block=True)
+            with self._window_lock:
+                chunk, future = self._window.popleft() if self._window else (None, None)
+            if future is None:
                 continue
 
-            print(f"(TTS) Procesando: '{text}' | Speed: {self.config['speed']}")
-            
-            raw_file = os.path.join(APP_DATA, "tts_raw.mp3")
-            final_file = os.path.join(APP_DATA, "tts_final.wav")
-            
             try:
-                # 1. GENERAR (gTTS)
-                tts = gTTS(text=text, lang="es", slow=False)
-                tts.save(raw_file)
-
-                # 2. PROCESAR CON FFMPEG DIRECTO
-                # Efecto Ardilla/Monstruo: Cambiamos el 'sample rate' (asetrate) y resampleamos.
-                # Esto cambia velocidad y tono juntos, igual que pydub.
-                
-                speed_input = float(self.config.get("speed", 0.6))
-                
-                # --- SIN MATEMÁTICAS EXTRA ---
-                # Usamos el valor directo del slider.
-                # Si el slider dice 0.6, FFmpeg usará 0.6.
-                real_speed = speed_input 
-                
-                base_rate = 44100
-                new_rate = int(base_rate * real_speed)
-
-                # Comando: ffmpeg -y -i input.mp3 -af "asetrate=NEW_RATE,aresample=44100" output.wav
-                # -y: Sobrescribir sin preguntar
-                # -v error: Menos texto en consola
-                cmd = [
-                    ffmpeg_exe, 
-                    "-y", 
-                    "-i", raw_file, 
-                    "-af", f"asetrate={new_rate},aresample={base_rate}", 
-                    "-v", "error", 
-                    final_file
-                ]
-
-                # Ejecutar comando silenciosamente
-                subprocess.run(cmd, check=True, creationflags=subprocess.CREATE_NO_WINDOW if os.name=='nt' else 0)
-
-                # 3. REPRODUCIR
-                if pygame.mixer.get_init():
-                    pygame.mixer.music.load(final_file)
-                    vol_float = float(self.config.get("volume", 80)) / 100.0
-                    pygame.mixer.music.set_volume(vol_float)
-                    pygame.mixer.music.play()
-
-                    while pygame.mixer.music.get_busy():
-                        pygame.time.Clock().tick(10)
-                    
-                    pygame.mixer.music.unload()
-
+                audio = future.result()
+            except CancelledError:
+                audio = None
             except Exception as e:
                 print(f"(TTS Error) Fallo en proceso: {e}")
                 print(f"Verifica que ffmpeg.exe esté en: {ffmpeg_exe}")
-            
-            # Limpieza
-            try:
-                if os.path.exists(raw_file): os.remove(raw_file)
-                if os.path.exists(final_file): os.remove(final_file)
-            except: pass
+                audio = None
 
-            self.queue.task_done()
+            # Antes de reproducir, que el pool ya esté preparando los siguientes
+            self._fill_window(block=False)
+            if audio is not None:
+                self._play(audio)
+            if chunk.last:
+                self._finish(chunk.item)
+
+    def _finish(self, item):
+        with self._window_lock:
+            self._taken.pop(item.id, None)
+        self._notify_queue()
+
+    def _play(self, audio: PreparedAudio):
+        if not pygame.mixer.get_init():
+            return
+        try:
+            sound = pygame.mixer.Sound(file=io.BytesIO(audio.wav))
+            channel = sound.play()
+            if channel is None:
+                return
+            channel.set_volume(self._volume())
+            self._channel = channel
+            self._current = audio.chunk.item
+            self._note_started(audio.chunk)
+            while channel.get_busy() and self.running:
+                time.sleep(0.02)
+        except Exception as e:
+            print(f"(TTS Error) Fallo reproduciendo: {e}")
+        finally:
+            self._channel = None
+            self._current = None
+
+    def _note_started(self, chunk):
+        if chunk.index == 0:
+            self._ttfa.append(time.perf_counter() - chunk.item.enqueued_at)
+            self._notify_queue()
+
+    def stats(self) -> dict:
+        """Tiempo hasta el primer audio (TTFA) de los últimos mensajes, en ms, y estado de la caché."""
+        samples = sorted(self._ttfa)
+        ttfa = {"count": len(samples)}
+        if samples:
+            def pct(p):
+                return round(samples[min(len(samples) - 1, int(p * len(samples)))] * 1000, 1)
+            ttfa.update({
+                "avg_ms": round(sum(samples) / len(samples) * 1000, 1),
+                "p50_ms": pct(0.50),
+                "p95_ms": pct(0.95),
+                "max_ms": round(samples[-1] * 1000, 1),
+            })
+        return {
+            "ttfa": ttfa,
+            "queue": self.queue.stats(),
+            "preparing": len(self._window) + len(self._chunks),
+            "cache": self.cache.stats() if self.cache is not None else None,
+        }
+
+    def queue_snapshot(self) -> dict:
+        """
+        La cola real para el panel: lo que suena, lo que ya se está
+        preparando y lo que espera, en el orden en que se leerá.
+        """
+        now = time.perf_counter()
+        current = self._current
+        with self._window_lock:
+            taken = list(self._taken.values())
+        return {
+            "playing": current.to_dict(now) if current is not None else None,
+            "preparing": [item.to_dict(now) for item in taken if item is not current],
+            "pending": self.queue.snapshot(),
+            "enabled": bool(self.config.get("tts_enabled", True)),
+        }
+
+    def _drop_prepared(self, keep):
+        """Quita de la preparación los fragmentos cuyo mensaje no cumple 'keep(item)'."""
+        with self._window_lock:
+            dropped = [f for c, f in self._window if not keep(c.item)]
+            self._window = deque((c, f) for c, f in self._window if keep(c.item))
+            self._chunks = deque(c for c in self._chunks if keep(c.item))
+            for item_id in [i for i, item in self._taken.items() if not keep(item)]:
+                del self._taken[item_id]
+        for future in dropped:
+            future.cancel()
+
+    def remove(self, item_id) -> bool:
+        """Quita un mensaje: de la espera, de la preparación o, si está sonando, lo corta."""
+        item_id = int(item_id)
+        current = self._current
+        if current is not None and current.id == item_id:
+            return self.skip()
+        if self.queue.remove(item_id):
+            self._notify_queue()
+            return True
+        with self._window_lock:
+            found = item_id in self._taken
+        if found:
+            self._drop_prepared(lambda item: item.id != item_id)
+            self._notify_queue()
+        return found
+
+    def skip(self) -> bool:
+        """Corta el mensaje que está sonando (y sus fragmentos pendientes)."""
+        current, channel = self._current, self._channel
+        if current is None:
+            return False
+        self._drop_prepared(lambda item: item is not current)
+        if channel is not None:
+            try: channel.stop()
+            except: pass
+        self._notify_queue()
+        return True
 
     def clear_queue(self):
-        """Vacía la cola de mensajes."""
-        with self.queue.mutex:
-            self.queue.queue.clear()
+        """Vacía la cola de mensajes (también los que ya se estaban preparando)."""
+        self.queue.clear()
+        current = self._current
+        self._drop_prepared(lambda item: item is current)
+        self._notify_queue()
         print("(TTS Service) Cola de mensajes vaciada.")
 
-tts_service = TTSService()
\ No newline at end of file
+    def stop(self):
+        self.running = False
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+tts_service = TTSService(subscribe=True)
@@ -0,0 +1,69 @@
+"""
+Sintetizadores de voz para el TTS.
+
+Todos devuelven el audio en memoria (bytes), así varias síntesis pueden ir
+en paralelo sin pisarse archivos. TTSService usa GTTSSynthesizer; para
+pruebas sin red sirve StubSynthesizer.
+"""
+import io
+import math
+from abc import ABC, abstractmethod
+import struct
+import time
+import wave
+
+
+class Synthesizer(ABC):
+    """Interfaz: synthesize(texto, idioma) -> bytes de audio en 'format'."""
+    name = "base"
+    format = "mp3"
+
+    @abstractmethod
+    def synthesize(self, text: str, lang: str = "es") -> bytes:
+        """Audio del texto en 'format' (bytes en memoria)."""
+
+
+class GTTSSynthesizer(Synthesizer):
+    """Google TTS (red). Devuelve MP3 mono a 24 kHz."""
+    name = "gtts"
+    format = "mp3"
+
+    def synthesize(self, text: str, lang: str = "es") -> bytes:
+        from gtts import gTTS
+        buffer = io.BytesIO()
+        gTTS(text=text, lang=lang, slow=False).write_to_fp(buffer)
+        return buffer.getvalue()
+
+
+class StubSynthesizer(Synthesizer):
+    """
+    Sintetizador local para pruebas: genera un tono WAV cuya duración crece
+    con el texto y simula la latencia de red con 'delay' segundos (más
+    'delay_per_char' por carácter, como un servicio real con textos largos).
+    """
+    name = "stub"
+    format = "wav"
+
+    def __init__(self, delay: float = 0.3, sample_rate: int = 24000, seconds_per_char: float = 0.03,
+                 delay_per_char: float = 0.0):
+        self.delay = delay
+        self.delay_per_char = delay_per_char
+        self.sample_rate = sample_rate
+        self.seconds_per_char = seconds_per_char
+        self.calls = 0
+
+    def synthesize(self, text: str, lang: str = "es") -> bytes:
+        self.calls += 1
+        wait = self.delay + self.delay_per_char * len(text)
+        if wait:
+            time.sleep(wait)
+        frames = max(1, int(len(text) * self.seconds_per_char * self.sample_rate))
+        step = 2 * math.pi * 440 / self.sample_rate
+        pcm = struct.pack(f"<{frames}h", *(int(8000 * math.sin(i * step)) for i in range(frames)))
+        buffer = io.BytesIO()
+        with wave.open(buffer, "wb") as w:
+            w.setnchannels(1)
+            w.setsampwidth(2)
+            w.setframerate(self.sample_rate)
+            w.writeframes(pcm)
+        return buffer.getvalue()
@@ -3,6 +3,8 @@ import threading
 import time
 import pytchat
 from event_bus import bus
+from connectors.roles import youtube_roles
+from connectors.chat_message import ChatMessage, PLATFORM_YOUTUBE
 
 class YouTubeChatListener:
     def __init__(self):
@@ -40,28 +42,30 @@ class YouTubeChatListener:
         print("(YouTube Service) Conectado. Escuchando mensajes...")
 
         while self.is_running and self.chat.is_alive():
+            batch = []
             try:
                 for c in self.chat.get().sync_items():
                     # Normalizamos el mensaje al formato StreamCore
-                    message_data = {
-                        "platform": "youtube",
-                        "sender": c.author.name,
-                        "content": c.message,
-                        "avatar": c.author.imageUrl,
-                        "timestamp": c.datetime,
+                    message_data = ChatMessage(
+                        PLATFORM_YOUTUBE, c.author.name, c.message,
                         # Permisos específicos de YouTube/Pytchat
-                        "is_sponsor": c.author.isChatSponsor,
-                        "is_moderator": c.author.isChatModerator,
-                        "is_owner": c.author.isChatOwner
-                    }
+                        roles=youtube_roles(c.author.isChatOwner, c.author.isChatModerator,
+                                            c.author.isChatSponsor),
+                        timestamp=c.datetime,
+                        avatar=c.author.imageUrl
+                    )
                     
                     print(f"[YouTube] {c.author.name}: {c.message}")
                     
-                    # ENVIAR AL BUS (chat_processor lo recibirá)
-                    bus.publish("chat:message_received", message_data)
-                    
+                    batch.append(message_data)
+
             except Exception as e:
                 print(f"(YouTube Loop Error) {e}")
+            finally:
+                # ENVIAR AL BUS (chat_processor lo recibirá), todo el lote de una vez; si un
+                # mensaje falló a mitad, los ya normalizados salen igualmente
+                if batch:
+                    bus.publish_many("chat:message_received", batch)
             
             time.sleep(0.5) # Pausa para no saturar
 
@@ -0,0 +1,16 @@
+import os
+import sys
+import tempfile
+
+# Los módulos se importan desde la raíz del repo, igual que al ejecutar main.py
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+# Datos en una carpeta temporal: las pruebas nunca tocan la BD ni la config reales
+# (Windows usa LOCALAPPDATA; Linux, XDG_DATA_HOME)
+DATA_DIR = tempfile.mkdtemp(prefix="streamcore-tests-")
+os.environ["LOCALAPPDATA"] = DATA_DIR
+os.environ["XDG_DATA_HOME"] = DATA_DIR
+# pygame sin tarjeta de sonido
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
@@ -0,0 +1,102 @@
+import threading
+
+from services import attendance_service as attendance_module
+from services.attendance_service import AttendanceService
+
+
+class FakeDB:
+    """Tabla 'asistencias' en memoria; log_user_assistance_many puede fallar a voluntad."""
+    def __init__(self):
+        self.totals = {}
+        self.batches = []
+        self.fail = False
+        self.flushed = threading.Event()
+
+    def log_user_assistance_many(self, rows):
+        if self.fail:
+            raise RuntimeError("database is locked")
+        self.batches.append(list(rows))
+        for nickname, platform, count in rows:
+            key = (nickname, platform)
+            self.totals[key] = self.totals.get(key, 0) + count
+        self.flushed.set()
+
+
+def _stop_background(service):
+    service._running = False
+    service._wake.set()
+    service._thread.join(1)
+
+
+def _service(monkeypatch, background=False):
+    fake = FakeDB()
+    monkeypatch.setattr(attendance_module, "db", fake)
+    service = AttendanceService()
+    if not background:
+        _stop_background(service)  # La prueba decide cuándo se vuelca
+    return service, fake
+
+
+def test_second_check_in_of_the_session_is_ignored(monkeypatch):
+    service, fake = _service(monkeypatch)
+    assert service.register("Ana", "Twitch")
+    assert not service.register("ana", "twitch")
+    assert service.register("ana", "kick")  # Otra plataforma, otra persona
+    assert service.is_registered("ANA", "twitch")
+    assert service.session_size() == 2
+    assert fake.batches == []  # Nada toca la BD hasta el volcado
+
+
+def test_flush_writes_one_batch(monkeypatch):
+    service, fake = _service(monkeypatch)
+    for name in ("ana", "beto", "carla"):
+        service.register(name, "twitch")
+    service.flush()
+    assert len(fake.batches) == 1
+    assert sorted(fake.batches[0]) == [("ana", "twitch", 1), ("beto", "twitch", 1), ("carla", "twitch", 1)]
+    service.flush()
+    assert len(fake.batches) == 1  # Sin pendientes no hay transacción vacía
+
+
+def test_new_session_before_flush_accumulates(monkeypatch):
+    service, fake = _service(monkeypatch)
+    service.register("ana", "twitch")
+    service.reset_session()
+    assert service.register("ana", "twitch")
+    service.flush()
+    assert fake.batches == [[("ana", "twitch", 2)]]
+
+
+def test_failed_flush_keeps_the_rows_for_the_next_one(monkeypatch):
+    service, fake = _service(monkeypatch)
+    service.register("ana", "twitch")
+    fake.fail = True
+    service.flush()
+    service.register("beto", "twitch")
+    fake.fail = False
+    service.flush()
+    assert fake.totals == {("ana", "twitch"): 1, ("beto", "twitch"): 1}
+    assert not service.register("ana", "twitch")  # Sigue registrada en la sesión
+
+
+def test_close_saves_what_is_pending(monkeypatch):
+    service, fake = _service(monkeypatch, background=True)
+    service.FLUSH_INTERVAL = 60
+    service.register("ana", "twitch")
+    service.close()
+    service._thread.join(1)
+    assert not service._thread.is_alive()
+    assert fake.totals == {("ana", "twitch"): 1}
+
+
+def test_threshold_wakes_the_background_flush(monkeypatch):
+    monkeypatch.setattr(AttendanceService, "FLUSH_INTERVAL", 60)
+    monkeypatch.setattr(AttendanceService, "FLUSH_THRESHOLD", 5)
+    service, fake = _service(monkeypatch, background=True)
+    try:
+        for i in range(5):
+            service.register(f"user{i}", "twitch")
+        assert fake.flushed.wait(2)
+        assert sum(fake.totals.values()) == 5
+    finally:
+        service.close()
@@ -0,0 +1,107 @@
+import io
+import math
+import os
+import shutil
+import struct
+import wave
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pygame = pytest.importorskip("pygame")
+
+from services import audio_fx
+from services import tts_service as tts_module
+from services.tts_synth import Synthesizer
+
+SOURCE_RATE = 24000  # Como gTTS
+
+
+def _ffmpeg():
+    candidates = [os.environ.get("FFMPEG"), tts_module.ffmpeg_exe]
+    try:
+        import imageio_ffmpeg
+        candidates.append(imageio_ffmpeg.get_ffmpeg_exe())
+    except ImportError:
+        pass
+    candidates.append(shutil.which("ffmpeg"))
+    for path in candidates:
+        if path and os.path.isfile(path):
+            return path
+    pytest.skip("sin ffmpeg para comparar")
+
+
+def _tone(freq, seconds=1.0, rate=SOURCE_RATE):
+    frames = int(seconds * rate)
+    pcm = struct.pack(f"<{frames}h", *(int(8000 * math.sin(2 * math.pi * freq * i / rate)) for i in range(frames)))
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes(pcm)
+    return buffer.getvalue()
+
+
+def _samples(wav_bytes):
+    with wave.open(io.BytesIO(wav_bytes), "rb") as w:
+        data = np.frombuffer(w.readframes(w.getnframes()), dtype=np.int16).reshape(-1, w.getnchannels())
+        return data[:, 0].astype(np.float64), w.getframerate()
+
+
+def _peak_hz(x, rate):
+    spectrum = np.abs(np.fft.rfft(x * np.hanning(len(x))))
+    return np.argmax(spectrum) * rate / len(x)
+
+
+class _WavSource(Synthesizer):
+    name = "test"
+    format = "wav"
+
+    def synthesize(self, text: str, lang: str = "es") -> bytes:
+        return _tone(300)
+
+
+@pytest.fixture(scope="module")
+def service():
+    pygame.mixer.init(frequency=audio_fx.BASE_RATE)
+    if not audio_fx.available():
+        pytest.skip("mezclador de pygame no disponible")
+    tts_module.ffmpeg_exe = _ffmpeg()
+    svc = tts_module.TTSService(synthesizer=_WavSource(), autostart=False, cache=None)
+    yield svc
+    svc.stop()
+
+
+def test_ffmpeg_is_the_default_backend(service):
+    assert not service._in_process_effects()
+    service.config["tts_effects_backend"] = "numpy"
+    try:
+        assert service._in_process_effects()
+    finally:
+        del service.config["tts_effects_backend"]
+
+
+@pytest.mark.parametrize("speed", [0.6, 1.0, 1.5])
+def test_numpy_matches_ffmpeg(service, speed):
+    raw = _tone(300)
+    ours, rate = _samples(audio_fx.apply_speed(raw, "wav", speed))
+    ref, ref_rate = _samples(service._apply_speed_ffmpeg(raw, speed))
+    assert rate == ref_rate == audio_fx.BASE_RATE
+    assert abs(len(ours) - len(ref)) <= 0.01 * len(ref)
+    assert _peak_hz(ours, rate) == pytest.approx(_peak_hz(ref, rate), rel=0.01)
+    n = min(len(ours), len(ref))
+    mid = slice(n // 10, n - n // 10)  # Sin los bordes (los filtros de FFmpeg tienen su propio retardo)
+    corr = np.corrcoef(ours[mid], ref[mid])[0, 1]
+    assert corr > 0.98
+
+
+def test_speeding_up_does_not_alias():
+    pygame.mixer.init(frequency=audio_fx.BASE_RATE)
+    # 10 kHz a 24 kHz acelerado x1.5 acaba por encima del Nyquist de 44,1 kHz: debe desaparecer,
+    # no plegarse como un tono de ~16,5 kHz
+    raw = _tone(10000)
+    before, _ = _samples(raw)
+    out, _ = _samples(audio_fx.apply_speed(raw, "wav", 1.5))
+    core = out[len(out) // 10: -len(out) // 10]
+    assert np.sqrt(np.mean(core ** 2)) < 0.05 * np.sqrt(np.mean(before ** 2))
@@ -0,0 +1,36 @@
+import json
+
+import pytest
+
+pytest.importorskip("pygame")
+
+from data.config_store import ConfigStore
+from processing import chat_processor
+
+
+@pytest.fixture
+def settings(tmp_path, monkeypatch):
+    store = ConfigStore(base_dir=str(tmp_path))
+    monkeypatch.setattr(chat_processor, "config_store", store)
+
+    def write(**values):
+        with open(store.path("settings"), "w", encoding="utf-8") as f:
+            json.dump(values, f)
+        store.reload("settings")
+
+    return write
+
+
+def test_chat_workers_default(settings):
+    assert chat_processor.configured_chat_workers() == chat_processor.DEFAULT_CHAT_WORKERS == 4
+
+
+def test_chat_workers_from_settings(settings):
+    settings(chat_workers=8)
+    assert chat_processor.configured_chat_workers() == 8
+
+
+@pytest.mark.parametrize("value", [0, -2, "muchos", None])
+def test_invalid_chat_workers_fall_back_to_default(settings, value):
+    settings(chat_workers=value)
+    assert chat_processor.configured_chat_workers() == 4
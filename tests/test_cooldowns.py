@@ -0,0 +1,99 @@
+from processing.cooldowns import CooldownStore
+
+
+def test_single_rule_blocks_until_it_expires():
+    store = CooldownStore()
+    assert store.try_acquire((("cmd", "!hola"), 10), now=0)
+    assert not store.try_acquire((("cmd", "!hola"), 10), now=9.9)
+    assert store.remaining(("cmd", "!hola"), now=4) == 6
+    assert store.try_acquire((("cmd", "!hola"), 10), now=10)
+
+
+def test_zero_seconds_is_no_cooldown():
+    store = CooldownStore()
+    assert store.try_acquire((("cmd", "!x"), 0), now=0)
+    assert store.try_acquire((("cmd", "!x"), 0), now=0)
+    assert len(store) == 0
+
+
+def test_several_rules_all_or_nothing():
+    store = CooldownStore()
+    cmd_a, cmd_b = ("cmd", "!a"), ("cmd", "!b")
+    ana = ("user", "twitch", "ana")
+    beto = ("user", "twitch", "beto")
+
+    assert store.try_acquire((cmd_a, 30), (ana, 5), now=0)
+    # !b está libre pero ana sigue en su cooldown de usuario: se rechaza...
+    assert not store.try_acquire((cmd_b, 30), (ana, 5), now=1)
+    # ...y sin activar el de !b
+    assert store.remaining(cmd_b, now=1) == 0
+    assert store.try_acquire((cmd_b, 30), (beto, 5), now=1)
+    # !a sigue en cooldown global: beto no lo activa y su cooldown de usuario no se renueva
+    assert not store.try_acquire((cmd_a, 30), (beto, 5), now=7)
+    assert store.remaining(beto, now=7) == 0
+    # Pasado el de usuario, ana puede usar otro comando libre
+    assert store.try_acquire((("cmd", "!c"), 30), (ana, 5), now=6)
+
+
+def test_user_cooldown_is_per_platform():
+    store = CooldownStore()
+    assert store.try_acquire((("user", "twitch", "ana"), 5), now=0)
+    assert store.try_acquire((("user", "kick", "ana"), 5), now=0)
+
+
+def test_purge_goes_by_expiry_not_by_use_order():
+    store = CooldownStore()
+    store.PURGE_PER_INSERT = 100
+    store.try_acquire((("largo",), 1000), now=0)  # El más antiguo en uso, pero aún activo
+    for i in range(10):
+        store.try_acquire(((f"corto{i}",), 1), now=0)
+    store.try_acquire((("nuevo",), 1), now=5)  # Las 10 cortas vencidas se purgan aunque 'largo' vaya delante
+    assert len(store) == 2
+    assert store.remaining(("largo",), now=5) == 995
+
+
+def test_full_store_drops_expired_before_active():
+    store = CooldownStore(max_entries=3)
+    store.PURGE_PER_INSERT = 0  # Solo la expulsión por tope
+    store.try_acquire((("activo",), 100), now=0)
+    store.try_acquire((("vencido1",), 1), now=0)
+    store.try_acquire((("vencido2",), 1), now=0)
+    store.try_acquire((("nuevo",), 100), now=10)
+    assert len(store) == 3
+    assert store.remaining(("activo",), now=10) == 90  # El activo más viejo sigue en cooldown
+    assert store.evicted == 0
+
+
+def test_full_store_evicts_the_active_entry_closest_to_expiring():
+    store = CooldownStore(max_entries=2)
+    store.try_acquire((("largo",), 100), now=0)
+    store.try_acquire((("corto",), 20), now=1)
+    store.try_acquire((("nuevo",), 50), now=2)
+    assert store.remaining(("largo",), now=2) == 98
+    assert store.remaining(("corto",), now=2) == 0
+    assert store.evicted == 1
+
+
+def test_renewed_keys_keep_their_latest_expiry():
+    store = CooldownStore()
+    store.try_acquire((("a",), 5), now=0)
+    store.try_acquire((("a",), 5), now=10)  # Renovada: el resto viejo (vence en 5) no debe borrarla
+    store.try_acquire((("b",), 5), now=12)
+    assert store.remaining(("a",), now=12) == 3
+    assert len(store) == 2
+
+
+def test_heap_does_not_grow_without_bound():
+    store = CooldownStore()
+    for i in range(1000):
+        store.try_acquire((("mismo",), 5), now=i * 10)
+    assert len(store._heap) < 100
+
+
+def test_memory_usage_reports_entries():
+    store = CooldownStore(max_entries=10)
+    store.try_acquire((("user", "twitch", "ana"), 5), now=0)
+    usage = store.memory_usage()
+    assert usage["entries"] == 1
+    assert usage["max_entries"] == 10
+    assert usage["approx_bytes"] > 0
@@ -0,0 +1,168 @@
+"""
+Saturación de temas encolados: un suscriptor lento y una ráfaga de eventos
+contra una cola acotada, para cada política de desbordamiento, y carriles de
+prioridad con el carril bajo saturado.
+"""
+import threading
+import time
+
+import pytest
+
+from event_bus import (
+    EventBus, POLICY_BLOCK, POLICY_DROP_OLDEST, POLICY_DROP_NEWEST, POLICY_COALESCE,
+    PRIORITY_HIGH, PRIORITY_NORMAL, PRIORITY_LOW,
+)
+
+MAXSIZE = 10
+FLOOD = 1000
+
+
+class SlowSubscriber:
+    """Se queda atascado en el primer evento hasta release(); anota todo lo recibido."""
+    def __init__(self):
+        self.received = []
+        self.started = threading.Event()
+        self.gate = threading.Event()
+        self.done = threading.Event()
+        self.expected = None
+
+    def __call__(self, data):
+        self.started.set()
+        self.gate.wait(5)
+        self.received.append(data)
+        if self.expected is not None and len(self.received) >= self.expected:
+            self.done.set()
+
+    def release(self, expected):
+        self.expected = expected
+        if len(self.received) >= expected:
+            self.done.set()
+        self.gate.set()
+        assert self.done.wait(5), f"solo llegaron {len(self.received)} de {expected}"
+
+
+@pytest.fixture
+def bus():
+    bus = EventBus()
+    yield bus
+    bus.shutdown(timeout=0.2)  # Lo que sobre de las ráfagas no hace falta entregarlo
+
+
+def _saturate(bus, policy, **kwargs):
+    """Suscriptor lento atascado con el evento 0 y la cola vacía, lista para la ráfaga."""
+    subscriber = SlowSubscriber()
+    bus.configure_topic("flood", maxsize=MAXSIZE, policy=policy, **kwargs)
+    bus.subscribe("flood", subscriber)
+    bus.publish("flood", 0)
+    assert subscriber.started.wait(2)
+    return subscriber
+
+
+def _flood(bus):
+    start = time.perf_counter()
+    for i in range(1, FLOOD):
+        bus.publish("flood", i)
+    return time.perf_counter() - start
+
+
+def test_drop_oldest_keeps_newest_and_never_blocks(bus):
+    subscriber = _saturate(bus, POLICY_DROP_OLDEST)
+    elapsed = _flood(bus)
+
+    assert elapsed < 1.0  # El suscriptor sigue atascado: el publicador no esperó por él
+    stats = bus.queue_stats()["flood"]
+    assert stats["depth"] == MAXSIZE
+    assert stats["dropped"] == FLOOD - 1 - MAXSIZE
+
+    subscriber.release(1 + MAXSIZE)
+    assert subscriber.received == [0] + list(range(FLOOD - MAXSIZE, FLOOD))
+
+
+def test_drop_newest_keeps_oldest_and_never_blocks(bus):
+    subscriber = _saturate(bus, POLICY_DROP_NEWEST)
+    elapsed = _flood(bus)
+
+    assert elapsed < 1.0
+    stats = bus.queue_stats()["flood"]
+    assert stats["depth"] == MAXSIZE
+    assert stats["dropped"] == FLOOD - 1 - MAXSIZE
+
+    subscriber.release(1 + MAXSIZE)
+    assert subscriber.received == list(range(0, MAXSIZE + 1))
+
+
+def test_coalesce_keeps_latest_per_key_and_never_blocks(bus):
+    keys = 5
+    subscriber = _saturate(bus, POLICY_COALESCE, coalesce_key=lambda n: n % keys)
+    elapsed = _flood(bus)
+
+    assert elapsed < 1.0
+    stats = bus.queue_stats()["flood"]
+    assert stats["depth"] == keys
+    assert stats["dropped"] == FLOOD - 1 - keys
+
+    subscriber.release(1 + keys)
+    # Cada clave conserva su posición (la de su primer evento) con el último payload
+    assert subscriber.received == [0, 996, 997, 998, 999, 995]
+
+
+def test_block_applies_backpressure_without_dropping(bus):
+    subscriber = _saturate(bus, POLICY_BLOCK)
+    publisher = threading.Thread(target=_flood, args=(bus,), daemon=True)
+    publisher.start()
+
+    time.sleep(0.2)
+    assert publisher.is_alive()  # Esperando hueco: es la única política que frena al publicador
+    stats = bus.queue_stats()["flood"]
+    assert stats["depth"] == MAXSIZE
+    assert stats["dropped"] == 0
+
+    subscriber.release(FLOOD)
+    publisher.join(5)
+    assert not publisher.is_alive()
+    assert subscriber.received == list(range(FLOOD))
+    assert bus.queue_stats()["flood"]["dropped"] == 0
+
+
+def test_high_priority_is_not_delayed_by_saturated_low_lane(bus):
+    ui_seen = []
+    reply_latency = []
+    backlog_at_reply = []
+
+    def slow_ui(data):
+        time.sleep(0.005)
+        ui_seen.append(data)
+
+    def reply(sent_at):
+        reply_latency.append(time.perf_counter() - sent_at)
+        backlog_at_reply.append(bus.queue_stats()["lane:low"]["depth"])
+
+    bus.set_priority("ui", PRIORITY_LOW)
+    bus.set_priority("reply", PRIORITY_HIGH)
+    bus.subscribe("ui", slow_ui)
+    bus.subscribe("reply", reply)
+
+    for i in range(400):  # ~2 s de trabajo para el carril bajo
+        bus.publish("ui", i)
+    for _ in range(20):
+        bus.publish("reply", time.perf_counter())
+        time.sleep(0.01)
+
+    deadline = time.time() + 2
+    while len(reply_latency) < 20 and time.time() < deadline:
+        time.sleep(0.01)
+    assert len(reply_latency) == 20
+    assert max(reply_latency) < 0.05       # Respuestas al momento...
+    assert min(backlog_at_reply) > 0       # ...mientras la UI sigue esperando en su carril
+    assert len(ui_seen) < 400
+
+
+def test_lower_lanes_are_never_left_waiting_on_the_reserved_worker(bus):
+    """Un evento NORMAL suelto no puede quedarse parado porque el aviso despertó al worker de HIGH."""
+    delivered = threading.Event()
+    bus.set_priority("stats", PRIORITY_NORMAL)
+    bus.subscribe("stats", lambda data: delivered.set())
+    for _ in range(20):
+        delivered.clear()
+        bus.publish("stats", None)
+        assert delivered.wait(1)
@@ -0,0 +1,140 @@
+"""Ventanas de coalescencia (set_coalescing) y publicación por lotes (publish_many)."""
+import threading
+import time
+
+import pytest
+
+from event_bus import EventBus, merge_payloads
+
+WINDOW = 0.15
+
+
+class _Recorder:
+    def __init__(self):
+        self.items = []
+        self.times = []
+        self._cond = threading.Condition()
+
+    def __call__(self, data):
+        with self._cond:
+            self.items.append(data)
+            self.times.append(time.monotonic())
+            self._cond.notify_all()
+
+    def wait_for(self, n, timeout=2):
+        with self._cond:
+            assert self._cond.wait_for(lambda: len(self.items) >= n, timeout), self.items
+        return self.items
+
+
+@pytest.fixture
+def bus():
+    bus = EventBus()
+    yield bus
+    bus.shutdown(timeout=0.5)
+
+
+def test_merge_payloads():
+    assert merge_payloads({"a": 1, "b": 1}, {"b": 2}) == {"a": 1, "b": 2}
+    assert merge_payloads({"a": 1}, "nuevo") == "nuevo"
+    assert merge_payloads(None, 3) == 3
+
+
+def test_first_event_is_delivered_at_once_and_the_burst_is_merged(bus):
+    received = _Recorder()
+    bus.set_coalescing("stats", WINDOW)
+    bus.subscribe("stats", received)
+
+    start = time.monotonic()
+    bus.publish("stats", {"viewers": 1})
+    assert received.items == [{"viewers": 1}]  # Flanco de subida: en el hilo del publicador
+    for n in range(2, 6):
+        bus.publish("stats", {"viewers": n, f"k{n}": True})
+    assert len(received.items) == 1
+
+    received.wait_for(2)
+    assert received.items[1] == {"viewers": 5, "k2": True, "k3": True, "k4": True, "k5": True}
+    assert received.times[1] - start >= WINDOW * 0.9
+    assert bus._coalescers["stats"].merged == 3
+    time.sleep(WINDOW * 1.5)
+    assert len(received.items) == 2  # Sin eventos nuevos no hay entregas vacías
+
+
+def test_event_after_a_quiet_window_is_not_delayed(bus):
+    received = _Recorder()
+    bus.set_coalescing("stats", WINDOW)
+    bus.subscribe("stats", received)
+    bus.publish("stats", 1)
+    time.sleep(WINDOW * 1.2)
+    bus.publish("stats", 2)
+    assert received.items == [1, 2]
+
+
+def test_custom_merge(bus):
+    received = _Recorder()
+    bus.set_coalescing("chat", WINDOW, merge=lambda old, new: old + new)
+    bus.subscribe("chat", received)
+    bus.publish("chat", [1])
+    bus.publish("chat", [2])
+    bus.publish("chat", [3])
+    assert received.wait_for(2) == [[1], [2, 3]]
+
+
+def test_window_zero_disables_and_flushes_what_was_pending(bus):
+    received = _Recorder()
+    bus.set_coalescing("stats", 10)
+    bus.subscribe("stats", received)
+    bus.publish("stats", 1)
+    bus.publish("stats", 2)  # Retenido hasta dentro de 10 s
+    bus.set_coalescing("stats", 0)
+    assert received.items == [1, 2]
+    assert "stats" not in bus._coalescers
+    bus.publish("stats", 3)
+    bus.publish("stats", 4)
+    assert received.items == [1, 2, 3, 4]
+
+
+def test_publish_many_goes_through_the_window_as_one_delivery(bus):
+    received = _Recorder()
+    bus.set_coalescing("stats", WINDOW)
+    bus.subscribe("stats", received)
+    bus.publish_many("stats", [{"a": 1}, {"b": 2}, {"a": 3}])
+    assert received.items == [{"a": 3, "b": 2}]
+    assert bus._coalescers["stats"].merged == 2
+
+
+def test_coalesced_topic_still_uses_its_queue(bus):
+    received = _Recorder()
+    caller = threading.get_ident()
+    threads = []
+    bus.configure_topic("stats", maxsize=10, workers=1)
+    bus.set_coalescing("stats", WINDOW)
+    bus.subscribe("stats", lambda data: (threads.append(threading.get_ident()), received(data)))
+    bus.publish("stats", 1)
+    bus.publish("stats", 2)
+    assert received.wait_for(2) == [1, 2]
+    assert caller not in threads
+
+
+def test_publish_many_without_configuration_is_synchronous_and_ordered(bus):
+    received = []
+    bus.subscribe("t", received.append)
+    bus.publish_many("t", (n for n in range(5)))
+    assert received == [0, 1, 2, 3, 4]
+    bus.publish_many("t", [])
+    assert received == [0, 1, 2, 3, 4]
+
+
+def test_publish_many_to_a_queued_topic(bus):
+    received = _Recorder()
+    bus.configure_topic("q", maxsize=100, workers=1)
+    bus.subscribe("q", received)
+    bus.publish_many("q", range(20))
+    assert received.wait_for(20) == list(range(20))
+
+
+def test_publish_many_counts_every_event_in_metrics(bus):
+    bus.set_metrics_enabled(True)
+    bus.subscribe("t", lambda data: None)
+    bus.publish_many("t", range(7))
+    assert bus.metrics_snapshot()["t"]["published"] == 7
@@ -0,0 +1,79 @@
+"""Instrumentación del bus: opcional, con series separadas y limpia al desuscribir."""
+import gc
+import threading
+import weakref
+
+import pytest
+
+from event_bus import EventBus, PRIORITY_NORMAL
+
+
+@pytest.fixture
+def bus():
+    bus = EventBus()
+    yield bus
+    bus.shutdown()
+
+
+class Listener:
+    def __init__(self):
+        self.calls = 0
+
+    def on_event(self, data):
+        self.calls += 1
+
+
+def test_metrics_are_off_by_default(bus):
+    bus.subscribe("t", lambda data: None)
+    bus.publish("t", 1)
+    assert not bus.metrics_enabled()
+    assert bus.metrics_snapshot() == {}
+
+
+def test_async_submit_wait_has_its_own_series(bus):
+    bus.set_metrics_enabled(True)
+    done = threading.Event()
+
+    async def on_event(data):
+        done.set()
+
+    bus.subscribe("async", on_event)
+    bus.publish("async", 1)
+    assert done.wait(2)
+    bus.set_priority("queued", PRIORITY_NORMAL)
+    delivered = threading.Event()
+    bus.subscribe("queued", lambda data: delivered.set())
+    bus.publish("queued", 1)
+    assert delivered.wait(2)
+
+    snapshot = bus.metrics_snapshot()
+    assert snapshot["async"]["async_wait"]["count"] == 1
+    assert snapshot["async"]["queue_wait"]["count"] == 0  # Sin cola: no se mezcla con el submit
+    assert snapshot["queued"]["queue_wait"]["count"] == 1
+    assert snapshot["queued"]["async_wait"]["count"] == 0
+
+
+def test_bound_methods_of_different_instances_are_kept_apart(bus):
+    bus.set_metrics_enabled(True)
+    first, second = Listener(), Listener()
+    bus.subscribe("t", first.on_event)
+    bus.subscribe("t", second.on_event)
+    bus.publish("t", 1)
+    subscribers = bus.metrics_snapshot()["t"]["subscribers"]
+    assert len(subscribers) == 2
+    assert all(stats["count"] == 1 for stats in subscribers.values())
+
+
+def test_unsubscribe_releases_the_callback(bus):
+    bus.set_metrics_enabled(True)
+    listener = Listener()
+    ref = weakref.ref(listener)
+    bus.subscribe("t", listener.on_event)
+    bus.publish("t", 1)
+    assert len(bus.metrics_snapshot()["t"]["subscribers"]) == 1
+
+    bus.unsubscribe("t", listener.on_event)
+    assert bus.metrics_snapshot()["t"]["subscribers"] == {}
+    del listener
+    gc.collect()
+    assert ref() is None
@@ -0,0 +1,68 @@
+"""Cierre del bus: lo encolado o retenido en una ventana de coalescencia se entrega antes de parar."""
+import threading
+import time
+
+from event_bus import EventBus, POLICY_BLOCK, PRIORITY_LOW
+
+
+def test_shutdown_drains_queued_topics():
+    bus = EventBus()
+    received = []
+
+    def slow(data):
+        time.sleep(0.002)
+        received.append(data)
+
+    bus.configure_topic("reply", maxsize=100, policy=POLICY_BLOCK, workers=2)
+    bus.subscribe("reply", slow)
+    bus.publish_many("reply", range(50))
+    bus.shutdown(timeout=5)
+    assert sorted(received) == list(range(50))
+
+
+def test_shutdown_drains_priority_lanes_fed_by_queues():
+    bus = EventBus()
+    seen = []
+    bus.configure_topic("chat", maxsize=100, workers=1)
+    bus.set_priority("ui", PRIORITY_LOW)
+    bus.subscribe("chat", lambda data: (time.sleep(0.002), bus.publish("ui", data)))
+    bus.subscribe("ui", seen.append)
+    bus.publish_many("chat", range(20))
+    bus.shutdown(timeout=5)
+    assert sorted(seen) == list(range(20))
+
+
+def test_shutdown_flushes_pending_coalesced_payload():
+    bus = EventBus()
+    received = []
+    bus.set_coalescing("asistencias", window=10)
+    bus.subscribe("asistencias", received.append)
+    bus.publish("asistencias", {"a": 1})  # Flanco de subida: sale al momento
+    bus.publish("asistencias", {"b": 2})  # Estos dos esperan a la ventana de 10 s...
+    bus.publish("asistencias", {"c": 3})
+    assert received == [{"a": 1}]
+    bus.shutdown()
+    assert received == [{"a": 1}, {"b": 2, "c": 3}]  # ...y el cierre no los pierde
+
+
+def test_shutdown_gives_up_after_timeout():
+    bus = EventBus()
+    gate = threading.Event()
+    bus.configure_topic("stuck", maxsize=10)
+    bus.subscribe("stuck", lambda data: gate.wait(5))
+    bus.publish_many("stuck", range(5))
+    start = time.monotonic()
+    bus.shutdown(timeout=0.2)
+    assert time.monotonic() - start < 1
+    gate.set()
+
+
+def test_publish_after_shutdown_is_dropped_not_stranded():
+    bus = EventBus()
+    bus.configure_topic("late", maxsize=10)
+    bus.subscribe("late", lambda data: None)
+    bus.shutdown()
+    bus.publish("late", 1)
+    stats = bus.queue_stats()["late"]
+    assert stats["depth"] == 0
+    assert stats["dropped"] == 1
@@ -0,0 +1,52 @@
+from connectors.irc_parser import parse_line, unescape_tag_value
+
+PRIVMSG = (
+    "@badge-info=subscriber/8;badges=moderator/1,subscriber/6;color=#1E90FF;display-name=Mod\\sUser;"
+    "first-msg=0;mod=1;room-id=1234;subscriber=1;user-id=42 "
+    ":moduser!moduser@moduser.tmi.twitch.tv PRIVMSG #canal :!hola qué tal"
+)
+
+
+def test_privmsg_fields():
+    msg = parse_line(PRIVMSG)
+    assert msg.command == "PRIVMSG"
+    assert msg.nick == "moduser"
+    assert msg.channel == "#canal"
+    assert msg.trailing == "!hola qué tal"
+    assert msg.tag("display-name") == "Mod User"
+    assert msg.tag("badges") == "moderator/1,subscriber/6"
+    assert msg.tag("missing", "x") == "x"
+
+
+def test_tag_key_must_start_at_a_boundary():
+    msg = parse_line(PRIVMSG)
+    assert msg.tag("mod") == "1"          # No confunde 'mod=' con 'first-mod=' ni 'mod' de otro sitio
+    assert msg.tag("msg") is None          # 'first-msg=' no es 'msg='
+    assert msg.tag("badge-info") == "subscriber/8"  # Primera clave, justo tras '@'
+
+
+def test_tag_ignores_at_sign_inside_a_value():
+    line = "@reply-parent-msg-body=hola\\s@mod=1;mod=0;x=a@mod=1 :u!u@u.tmi.twitch.tv PRIVMSG #c :hi"
+    msg = parse_line(line)
+    assert msg.tag("mod") == "0"
+    assert msg.tags["mod"] == "0"
+    line = "@x=a@mod=1;badges= :u!u@u.tmi.twitch.tv PRIVMSG #c :hi"
+    assert parse_line(line).tag("mod") is None
+
+
+def test_unescape_tag_value():
+    assert unescape_tag_value("a\\sb\\:c\\\\d\\re\\nf") == "a b;c\\d\re\nf"
+    assert unescape_tag_value("fin\\") == "fin"
+    assert unescape_tag_value("\\x") == "x"
+
+
+def test_other_commands():
+    clear = parse_line("@ban-duration=600;room-id=1 :tmi.twitch.tv CLEARCHAT #canal :troll")
+    assert clear.command == "CLEARCHAT" and clear.trailing == "troll" and clear.tag("ban-duration") == "600"
+    notice = parse_line("@msg-id=sub;system-msg=Alguien\\sse\\ssuscribió :tmi.twitch.tv USERNOTICE #canal")
+    assert notice.command == "USERNOTICE" and notice.trailing == "" and notice.tag("system-msg") == "Alguien se suscribió"
+    room = parse_line("@emote-only=0;slow=10 :tmi.twitch.tv ROOMSTATE #canal")
+    assert room.tag("slow") == "10" and room.channel == "#canal"
+    assert parse_line("PING :tmi.twitch.tv").trailing == "tmi.twitch.tv"
+    assert parse_line("") is None
+    assert parse_line("@solo-tags") is None
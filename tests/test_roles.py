@@ -0,0 +1,119 @@
+from connectors.roles import (
+    ROLE_BROADCASTER, ROLE_MODERATOR, ROLE_VIP, ROLE_SUBSCRIBER,
+    twitch_roles, kick_roles, youtube_roles, roles_for_message,
+    permission_mask, has_permission,
+)
+
+
+# --- Twitch: tag 'badges' de IRCv3 ---
+
+def test_twitch_single_badges():
+    assert twitch_roles("broadcaster/1") == ROLE_BROADCASTER
+    assert twitch_roles("moderator/1") == ROLE_MODERATOR
+    assert twitch_roles("vip/1") == ROLE_VIP
+    assert twitch_roles("subscriber/3012") == ROLE_SUBSCRIBER
+
+
+def test_twitch_founder_counts_as_subscriber():
+    # Regresión real: la comprobación antigua ('subscriber' in badges) dejaba fuera
+    # a los fundadores, que Twitch muestra con 'founder' en lugar de 'subscriber'
+    assert twitch_roles("founder/0") == ROLE_SUBSCRIBER
+    assert twitch_roles("founder/0,premium/1") == ROLE_SUBSCRIBER
+
+
+def test_twitch_sub_gifter_is_not_a_subscriber():
+    # Se compara el nombre completo de la insignia: 'sub-gifter' (regalar subs) no implica
+    # estar suscrito, aunque empiece por "sub"
+    assert twitch_roles("sub-gifter/50") == 0
+    assert twitch_roles("sub-gift-leader/1,sub-gifter/100") == 0
+    assert twitch_roles("subscriber/6,sub-gifter/5") == ROLE_SUBSCRIBER
+
+
+def test_twitch_combined_badges():
+    assert twitch_roles("broadcaster/1,subscriber/0,sub-gifter/1") == ROLE_BROADCASTER | ROLE_SUBSCRIBER
+    assert twitch_roles("moderator/1,vip/1,founder/0") == ROLE_MODERATOR | ROLE_VIP | ROLE_SUBSCRIBER
+
+
+def test_twitch_empty_and_mod_tag():
+    assert twitch_roles("") == 0
+    assert twitch_roles(None) == 0
+    assert twitch_roles("", "1") == ROLE_MODERATOR
+    assert twitch_roles("vip/1", "0") == ROLE_VIP
+    assert twitch_roles("vip/1", "1") == ROLE_VIP | ROLE_MODERATOR
+
+
+def test_twitch_cache_does_not_leak_mod_tag():
+    # La caché guarda solo las insignias; el tag 'mod' se suma aparte en cada llamada
+    assert twitch_roles("subscriber/1", "1") == ROLE_SUBSCRIBER | ROLE_MODERATOR
+    assert twitch_roles("subscriber/1") == ROLE_SUBSCRIBER
+
+
+# --- Kick: sender.identity ---
+
+def _kick(badges=None, **flags):
+    return {"sender": {"identity": dict(badges=badges or [], **flags)}}
+
+
+def test_kick_badges():
+    assert kick_roles(_kick([{"type": "broadcaster", "text": "Broadcaster"}])) == ROLE_BROADCASTER
+    assert kick_roles(_kick([{"type": "moderator", "text": "Moderator"}])) == ROLE_MODERATOR
+    assert kick_roles(_kick([{"type": "vip", "text": "VIP"}])) == ROLE_VIP
+    assert kick_roles(_kick([{"type": "founder", "text": "Founder"}])) == ROLE_SUBSCRIBER
+    assert kick_roles(_kick([{"type": "subscriber", "text": "Subscriber", "count": 3}])) == ROLE_SUBSCRIBER
+
+
+def test_kick_sub_gifter_is_not_a_subscriber():
+    assert kick_roles(_kick([{"type": "sub_gifter", "text": "Sub Gifter", "count": 25}])) == 0
+    assert kick_roles(_kick([{"type": "sub_gifter", "count": 25}, {"type": "subscriber", "count": 1}])) == ROLE_SUBSCRIBER
+
+
+def test_kick_flags_and_malformed_input():
+    assert kick_roles(_kick(is_broadcaster=True)) == ROLE_BROADCASTER
+    assert kick_roles(_kick(is_moderator=True, is_subscriber=True)) == ROLE_MODERATOR | ROLE_SUBSCRIBER
+    assert kick_roles({}) == 0
+    assert kick_roles({"sender": {"identity": None}}) == 0
+    assert kick_roles(_kick(["vip"])) == 0  # Insignias que no son dicts se ignoran
+    assert kick_roles("no es un dict") == 0
+
+
+# --- YouTube: autor de pytchat ---
+
+def test_youtube_roles():
+    assert youtube_roles() == 0
+    assert youtube_roles(is_owner=True) == ROLE_BROADCASTER
+    assert youtube_roles(is_moderator=True) == ROLE_MODERATOR
+    assert youtube_roles(is_sponsor=True) == ROLE_SUBSCRIBER
+    assert youtube_roles(True, True, True) == ROLE_BROADCASTER | ROLE_MODERATOR | ROLE_SUBSCRIBER
+
+
+def test_roles_for_message_without_precomputed_roles():
+    assert roles_for_message({"platform": "kick", "raw_message": _kick(is_moderator=True)}) == ROLE_MODERATOR
+    assert roles_for_message({"platform": "youtube", "is_sponsor": True}) == ROLE_SUBSCRIBER
+    assert roles_for_message({"platform": "otro"}) == 0
+    assert roles_for_message({"platform": "twitch", "roles": ROLE_VIP}) == ROLE_VIP
+
+
+# --- Máscaras de permiso ---
+
+def test_permission_masks():
+    assert permission_mask("all") is None
+    assert permission_mask(None) is None
+    assert permission_mask("Moderators") == ROLE_MODERATOR | ROLE_BROADCASTER
+    assert permission_mask("desconocido") == 0
+
+
+def test_has_permission():
+    subs = permission_mask("subscribers")
+    mods = permission_mask("moderators")
+    vips = permission_mask("vip")
+    streamer = permission_mask("streamer")
+    assert has_permission(0, None)
+    assert not has_permission(0, subs)
+    assert has_permission(twitch_roles("founder/0"), subs)
+    assert not has_permission(twitch_roles("sub-gifter/5"), subs)
+    assert has_permission(twitch_roles("broadcaster/1"), subs)
+    assert has_permission(twitch_roles("broadcaster/1"), mods)
+    assert has_permission(twitch_roles("moderator/1"), vips)
+    assert not has_permission(twitch_roles("vip/1"), mods)
+    assert not has_permission(twitch_roles("moderator/1"), streamer)
+    assert not has_permission(ROLE_BROADCASTER, permission_mask("desconocido"))
@@ -0,0 +1,118 @@
+import datetime
+import random
+
+import pytest
+
+from processing import templates
+from processing.templates import Template, TemplateContext, compile_template, register_variable
+
+
+def _ctx(content="!cmd", **kwargs):
+    options = dict(platform="twitch", sender="ana", command="!cmd")
+    options.update(kwargs)
+    return TemplateContext(content=content, **options)
+
+
+def render(source, content="!cmd", **kwargs):
+    return Template(source).render(_ctx(content, **kwargs))
+
+
+def test_literal_only():
+    assert render("Hola a todos") == "Hola a todos"
+    assert render("") == ""
+    assert Template("Hola").variables == frozenset()
+
+
+def test_user_and_platform():
+    assert render("Hola {user} desde {platform}") == "Hola ana desde twitch"
+    assert Template("{user} {user}").variables == {"user"}
+
+
+def test_unknown_variables_are_left_as_written():
+    assert render("Hola {nadie} y {otra:cosa}") == "Hola {nadie} y {otra:cosa}"
+
+
+def test_braces_that_are_not_variables():
+    # No hay sintaxis de escape: como con el replace() anterior, lo que no es una
+    # variable conocida queda tal cual, y las llaves dobles envuelven a la variable
+    assert render("{{user}}") == "{ana}"
+    assert render("{{ hola }}") == "{{ hola }}"
+    assert render("una { suelta y } otra") == "una { suelta y } otra"
+    assert render("sin cerrar {user") == "sin cerrar {user"
+    assert render("{") == "{"
+    assert render("}{user}{") == "}ana{"
+
+
+def test_args_whole_and_indexed():
+    content = "!dado  ana   beto carla"
+    assert render("{args}", content) == "ana beto carla"
+    assert render("{args:1} vs {args:3}", content) == "ana vs carla"
+
+
+@pytest.mark.parametrize("param", ["4", "0", "-1", "x", ""])
+def test_args_out_of_range_or_invalid_is_empty(param):
+    assert render(f"[{{args:{param}}}]", "!dado ana beto carla") == "[]"
+
+
+def test_args_without_arguments():
+    assert render("[{args}] [{args:1}]", "!dado") == "[] []"
+
+
+def test_count_uses_the_value_already_incremented():
+    assert render("Van {count}", count=7) == "Van 7"
+
+
+def test_count_without_increment_reads_the_counter(monkeypatch):
+    from data import usage_counters
+    monkeypatch.setattr(usage_counters.command_counters, "get_counter", lambda name: 41 if name == "!cmd" else 0)
+    assert render("Lleva {count}") == "Lleva 41"
+
+
+def test_time_default_and_custom_format():
+    assert render("{time:%Y}") == str(datetime.datetime.now().year)
+    assert len(render("{time}").split(":")) == 3
+
+
+def test_random_ranges():
+    random.seed(5)
+    values = {int(render("{random:1-3}")) for _ in range(200)}
+    assert values == {1, 2, 3}
+    assert {int(render("{random:6-6}")) for _ in range(5)} == {6}
+    assert all(1 <= int(render("{random:mal}")) <= 100 for _ in range(50))
+    assert all(4 <= int(render("{random:9-4}")) <= 9 for _ in range(50))
+
+
+def test_failing_provider_keeps_the_placeholder(capsys):
+    register_variable("rota", lambda ctx, param: 1 / 0)
+    try:
+        assert render("a {rota} b") == "a {rota} b"
+    finally:
+        templates._providers.pop("rota")
+
+
+def test_compile_template_is_cached():
+    compile_template.cache_clear()
+    first = compile_template("Hola {user}")
+    assert compile_template("Hola {user}") is first
+    info = compile_template.cache_info()
+    assert (info.hits, info.misses) == (1, 1)
+    assert compile_template(None).render(_ctx()) == ""
+
+
+def test_variables_registered_later_apply_to_cached_templates():
+    template = compile_template("Hoy toca {juego}")
+    assert template.render(_ctx()) == "Hoy toca {juego}"
+    register_variable("juego", lambda ctx, param: "ajedrez")
+    try:
+        assert compile_template("Hoy toca {juego}") is template
+        assert template.render(_ctx()) == "Hoy toca ajedrez"
+    finally:
+        templates._providers.pop("juego")
+
+
+def test_args_are_split_only_when_needed():
+    ctx = _ctx("!cmd uno dos")
+    Template("Hola {user}").render(ctx)
+    assert ctx._args is None
+    Template("{args:2}").render(ctx)
+    assert ctx._args == ["uno", "dos"]
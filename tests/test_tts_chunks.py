@@ -0,0 +1,108 @@
+"""Troceo en frases (split_text) y orden en que los fragmentos llegan al reproductor."""
+import random
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("pygame")
+
+from services import tts_service as tts_module
+from services.tts_service import split_text, CHUNK_MAX_CHARS
+from services.tts_synth import Synthesizer
+
+
+def test_empty_input_gives_no_chunks():
+    assert split_text("") == []
+    assert split_text("   \n  ") == []
+
+
+def test_first_sentence_goes_alone_the_rest_are_joined():
+    text = "Hola a todos. Gracias por la raid. Qué bien. Vamos con la siguiente partida."
+    assert split_text(text) == [
+        "Hola a todos.",
+        "Gracias por la raid. Qué bien. Vamos con la siguiente partida.",
+    ]
+
+
+def test_sentence_boundaries():
+    assert split_text("¿Qué tal? ¡Genial!\nSeguimos") == ["¿Qué tal?", "¡Genial! Seguimos"]
+    assert split_text("Sin puntuación final") == ["Sin puntuación final"]
+
+
+def test_tiny_first_chunk_is_not_its_own_request():
+    assert split_text("Ok. Seguimos con el directo") == ["Ok. Seguimos con el directo"]
+
+
+def test_abbreviations_do_not_end_a_sentence():
+    assert split_text("Mañana por la tarde vendrá de visita el Sr. López a saludar.") == [
+        "Mañana por la tarde vendrá de visita el Sr. López a saludar.",
+    ]
+    assert split_text("Lo firmó J. R. R. Tolkien hace muchísimos años, en Oxford.") == [
+        "Lo firmó J. R. R. Tolkien hace muchísimos años, en Oxford.",
+    ]
+    assert split_text("Te dije que no. Vale, como quieras.") == ["Te dije que no.", "Vale, como quieras."]
+
+
+def test_long_sentence_without_punctuation_is_cut_by_words():
+    words = [f"palabra{i}" for i in range(80)]
+    chunks = split_text(" ".join(words))
+    assert len(chunks) > 1
+    assert all(len(c) <= CHUNK_MAX_CHARS for c in chunks)
+    assert " ".join(chunks).split() == words  # Ni se pierde ni se reordena nada
+
+
+def test_long_sentence_prefers_commas():
+    text = ("Esto es una frase larguísima, con muchas comas, que sigue y sigue sin parar, "
+            "porque el chat escribe así, sin puntos, y hay que cortarla en algún sitio, "
+            "a ser posible en una coma y no en mitad de una idea")
+    chunks = split_text(text)
+    assert all(len(c) <= CHUNK_MAX_CHARS for c in chunks)
+    assert all(c.endswith(",") for c in chunks[:-1])
+    assert " ".join(chunks) == text
+
+
+class _JitterSynth(Synthesizer):
+    """Tarda un tiempo al azar: los fragmentos se terminan de preparar desordenados."""
+    name = "jitter"
+    format = "wav"
+
+    def __init__(self):
+        self.rng = random.Random(3)
+
+    def synthesize(self, text: str, lang: str = "es") -> bytes:
+        time.sleep(self.rng.uniform(0, 0.03))
+        return text.encode()
+
+
+def test_chunks_reach_the_player_in_order():
+    service = tts_module.TTSService(synthesizer=_JitterSynth(), prefetch=3, autostart=False, cache=None)
+    service._apply_speed = lambda raw, speed: raw
+    played = []
+    done = threading.Event()
+    messages = [
+        "Primera frase del uno. Segunda frase del mensaje uno, ya algo más larga que la anterior.",
+        "Mensaje dos. Con su cola. Y un final largo que no se junta con lo de antes porque pasa de cuarenta.",
+        "Tres.",
+    ]
+    expected = [(i, part) for i, text in enumerate(messages) for part in split_text(text)]
+
+    def fake_play(audio):
+        played.append((audio.chunk.item.text, audio.chunk.index, audio.wav.decode()))
+        service._note_started(audio.chunk)
+        if len(played) == len(expected):
+            done.set()
+
+    service._play = fake_play
+    try:
+        for text in messages:
+            assert service.enqueue("ana", text)
+        service.worker_thread.start()
+        assert done.wait(5)
+    finally:
+        service.stop()
+
+    assert [(messages.index(text), wav) for text, _, wav in played] == expected
+    for text in messages:
+        assert [index for t, index, _ in played if t == text] == list(range(len(split_text(text))))
+    assert service.stats()["ttfa"]["count"] == len(messages)  # TTFA solo con el primer fragmento
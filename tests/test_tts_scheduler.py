@@ -0,0 +1,149 @@
+import pytest
+
+from services.tts_scheduler import (
+    TTSScheduler, PRIORITY_NORMAL, PRIORITY_STREAMER,
+    REJECT_FULL, REJECT_QUOTA, REJECT_DUPLICATE, DROP_EXPIRED, DROP_EVICTED,
+)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+def _scheduler(clock, **kwargs):
+    options = dict(max_depth=10, ttl=60, user_quota=0, dedupe_window=0)
+    options.update(kwargs)
+    return TTSScheduler(clock=clock, **options)
+
+
+def _drain(scheduler):
+    texts = []
+    while True:
+        item = scheduler.get_nowait()
+        if item is None:
+            return texts
+        texts.append(item.text)
+
+
+def test_streamer_goes_first_then_fifo(clock):
+    q = _scheduler(clock)
+    q.put("ana", "uno")
+    q.put("beto", "dos")
+    q.put("streamer", "prueba", PRIORITY_STREAMER)
+    q.put("carla", "tres")
+    assert [i["message"] for i in q.snapshot()] == ["prueba", "uno", "dos", "tres"]
+    assert _drain(q) == ["prueba", "uno", "dos", "tres"]
+
+
+def test_expired_messages_are_skipped(clock):
+    q = _scheduler(clock, ttl=30)
+    q.put("ana", "viejo")
+    clock.now += 20
+    q.put("beto", "nuevo")
+    clock.now += 15  # 'viejo' lleva 35 s, 'nuevo' 15 s
+    assert q.get_nowait().text == "nuevo"
+    assert q.stats()["dropped"] == {DROP_EXPIRED: 1}
+
+
+def test_ttl_zero_never_expires(clock):
+    q = _scheduler(clock, ttl=0)
+    q.put("ana", "eterno")
+    clock.now += 10_000
+    assert q.get_nowait().text == "eterno"
+
+
+def test_user_quota_counts_only_waiting_messages(clock):
+    q = _scheduler(clock, user_quota=2)
+    assert q.put("ana", "a")[1] is None
+    assert q.put("ana", "b")[1] is None
+    assert q.put("ana", "c") == (None, REJECT_QUOTA)
+    assert q.put("beto", "d")[1] is None
+    q.get_nowait()  # Sale 'a': ana vuelve a tener hueco
+    assert q.put("ana", "e")[1] is None
+
+
+def test_streamer_ignores_quota_and_duplicates(clock):
+    q = _scheduler(clock, user_quota=1, dedupe_window=30)
+    for _ in range(3):
+        assert q.put("yo", "probando", PRIORITY_STREAMER)[1] is None
+    assert len(q) == 3
+
+
+def test_duplicates_are_per_user_and_expire(clock):
+    q = _scheduler(clock, dedupe_window=30)
+    assert q.put("ana", "Hola  CHAT")[1] is None
+    assert q.put("ana", "hola chat") == (None, REJECT_DUPLICATE)
+    assert q.put("beto", "hola chat")[1] is None  # Otro usuario, mismo texto: se lee
+    clock.now += 31
+    assert q.put("ana", "hola chat")[1] is None
+
+
+def test_dedupe_key_ignores_the_spoken_prefix(clock):
+    q = _scheduler(clock, dedupe_window=30)
+    assert q.put("ana", "ana dice hola", dedupe_key="hola")[1] is None
+    assert q.put("ana", "ana dice HOLA", dedupe_key="HOLA") == (None, REJECT_DUPLICATE)
+    assert q.put("beto", "beto dice hola", dedupe_key="hola")[1] is None
+
+
+def test_full_queue_rejects_chat_but_streamer_evicts_oldest_chat(clock):
+    q = _scheduler(clock, max_depth=3)
+    for text in ("a", "b", "c"):
+        q.put(text, text)
+    assert q.put("d", "d") == (None, REJECT_FULL)
+    item, reason = q.put("yo", "urgente", PRIORITY_STREAMER)
+    assert reason is None
+    assert _drain(q) == ["urgente", "b", "c"]
+    assert q.stats()["dropped"] == {REJECT_FULL: 1, DROP_EVICTED: 1}
+
+
+def test_full_of_streamer_messages_rejects_even_streamer(clock):
+    q = _scheduler(clock, max_depth=2)
+    q.put("yo", "1", PRIORITY_STREAMER)
+    q.put("yo", "2", PRIORITY_STREAMER)
+    assert q.put("yo", "3", PRIORITY_STREAMER) == (None, REJECT_FULL)
+
+
+def test_full_queue_makes_room_by_expiring_first(clock):
+    q = _scheduler(clock, max_depth=2, ttl=10)
+    q.put("ana", "viejo")
+    clock.now += 5
+    q.put("beto", "medio")
+    clock.now += 6  # 'viejo' caduca, 'medio' no
+    assert q.put("carla", "nuevo")[1] is None
+    assert _drain(q) == ["medio", "nuevo"]
+
+
+def test_eviction_releases_the_user_quota(clock):
+    q = _scheduler(clock, max_depth=1, user_quota=1)
+    q.put("ana", "a")
+    q.put("yo", "urgente", PRIORITY_STREAMER)  # Expulsa el de ana
+    assert q.put("ana", "b") == (None, REJECT_FULL)  # Lleno, pero ya no por cuota
+    q.get_nowait()
+    assert q.put("ana", "b")[1] is None
+
+
+def test_remove_and_clear(clock):
+    q = _scheduler(clock, user_quota=1)
+    item, _ = q.put("ana", "a")
+    q.put("beto", "b")
+    assert q.remove(item.id)
+    assert not q.remove(item.id)
+    assert q.put("ana", "otra")[1] is None  # Quitarlo le devuelve el hueco
+    assert q.clear() == 2
+    assert len(q) == 0
+
+
+def test_configure_reads_panel_settings(clock):
+    q = _scheduler(clock)
+    q.configure({"tts_queue_max": "0", "tts_queue_ttl": 45, "tts_user_quota": 4, "tts_dedupe_window": 12})
+    stats = q.stats()
+    assert (stats["max_depth"], stats["ttl"], stats["user_quota"], stats["dedupe_window"]) == (1, 45.0, 4, 12.0)
@@ -0,0 +1,48 @@
+import pytest
+
+pytest.importorskip("pygame")
+
+from event_bus import bus
+from services import tts_service as tts_module
+from services.tts_scheduler import PRIORITY_NORMAL
+from services.tts_synth import Synthesizer
+
+
+class _NoSynth(Synthesizer):
+    name = "test"
+
+    def synthesize(self, text: str, lang: str = "es") -> bytes:
+        raise AssertionError("la prueba no debe sintetizar")
+
+
+def _service(**kwargs):
+    return tts_module.TTSService(synthesizer=_NoSynth(), autostart=False, cache=None, **kwargs)
+
+
+def test_only_the_singleton_listens_on_the_bus():
+    assert tts_module.tts_service.subscribed
+    second = _service()
+    try:
+        assert not second.subscribed
+        handlers = bus._subscribers.get("tts:speak", [])
+        assert second.on_speak not in handlers
+    finally:
+        second.stop()
+
+
+def test_enqueue_on_a_private_instance_stays_local():
+    singleton = tts_module.tts_service
+    before = len(singleton.queue)
+    second = _service()
+    try:
+        assert second.enqueue("ana", "hola solo para mí", priority=PRIORITY_NORMAL)
+        assert len(second.queue) == 1
+        assert second.queue.get_nowait().text == "hola solo para mí"
+        assert len(singleton.queue) == before
+    finally:
+        second.stop()
+
+
+def test_synthesizer_interface_is_abstract():
+    with pytest.raises(TypeError):
+        Synthesizer()
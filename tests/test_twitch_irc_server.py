@@ -0,0 +1,93 @@
+"""
+_TwitchIRCBot contra un servidor IRC falso en localhost (asyncio.start_server):
+lectura por bloques, PING/PONG y reconexión con backoff.
+"""
+import asyncio
+import time
+
+import pytest
+
+pytest.importorskip("requests")  # data.tokens (importado por el conector) lo necesita
+
+from connectors.twitch_connector import _TwitchIRCBot
+
+BACKOFF = 0.2
+
+
+class FakeTwitch:
+    """
+    Guion por conexión: la 1ª saluda, manda el chat troceado y cierra; la 2ª
+    cierra sin saludar (el backoff se duplica); la 3ª saluda y se queda.
+    """
+    def __init__(self):
+        self.connections = []  # instante de cada conexión
+        self.logins = []
+        self.pong = None
+        self.third = asyncio.Event()
+
+    async def handle(self, reader, writer):
+        self.connections.append(time.monotonic())
+        login = [(await reader.readline()).decode() for _ in range(4)]
+        self.logins.append(login)
+        if len(self.connections) == 1:
+            writer.write(b":tmi.twitch.tv 001 bot :Welcome, GLHF!\r\n")
+            await self.first_connection(reader, writer)
+        elif len(self.connections) == 3:
+            writer.write(b":tmi.twitch.tv 001 bot :Welcome, GLHF!\r\n")
+            await writer.drain()
+            await asyncio.sleep(0.05)
+            self.third.set()
+            await reader.read()  # Hasta que el bot cierre
+        writer.close()
+
+    async def first_connection(self, reader, writer):
+        async def send(data):
+            writer.write(data)
+            await writer.drain()
+            await asyncio.sleep(0.05)  # Bloques separados en la lectura del bot
+
+        line = "@display-name=Ana :ana!ana@ana.tmi.twitch.tv PRIVMSG #canal :hola ☕ ñandú\r\n".encode()
+        cut = line.index("☕".encode()) + 1  # A mitad del carácter de 3 bytes
+        await send(line[:cut])
+        await send(line[cut:])
+
+        second = b":beto!beto@beto.tmi.twitch.tv PRIVMSG #canal :segundo\r\n"
+        await send(second[:-1])  # '\r' en un bloque...
+        await send(second[-1:])  # ...'\n' en el siguiente
+
+        await send(b"PING :tmi.twitch.tv\r\n")
+        self.pong = (await asyncio.wait_for(reader.readline(), 2)).decode()
+        # Cerramos sin avisar: el bot debe reconectar tras el backoff
+
+
+def test_chunked_reads_ping_and_reconnect():
+    received = []
+
+    async def scenario():
+        fake = FakeTwitch()
+        server = await asyncio.start_server(fake.handle, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        bot = _TwitchIRCBot("bot", "token", "canal", received.append, server="127.0.0.1", port=port)
+        bot.RECONNECT_MIN_DELAY = BACKOFF
+        task = asyncio.ensure_future(bot.run())
+        try:
+            await asyncio.wait_for(fake.third.wait(), 5)
+            delay_after_welcome = bot._reconnect_delay
+        finally:
+            bot.running = False
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            server.close()
+            await server.wait_closed()
+        return fake, delay_after_welcome
+
+    fake, delay_after_welcome = asyncio.run(scenario())
+
+    assert [(m.sender, m.content) for m in received] == [("Ana", "hola ☕ ñandú"), ("beto", "segundo")]
+    assert fake.pong == "PONG :tmi.twitch.tv\r\n"
+    assert fake.logins[0] == fake.logins[1] == fake.logins[2]
+    assert fake.logins[0][1] == "PASS oauth:token\r\n"
+    first, second, third = fake.connections
+    assert second - first >= BACKOFF         # Esperó el backoff antes de volver...
+    assert third - second >= 2 * BACKOFF     # ...y lo duplicó tras un intento fallido
+    assert delay_after_welcome == BACKOFF    # El 001 lo reinicia
@@ -0,0 +1,114 @@
+import asyncio
+import time
+
+import pytest
+
+pytest.importorskip("requests")  # data.tokens (importado por el conector) lo necesita
+
+from connectors.twitch_connector import _TwitchIRCBot, _TokenBucket, RATE_LIMITS
+
+
+class FakeWriter:
+    def __init__(self):
+        self.writes = []  # (instante, nº de PRIVMSG en la escritura)
+        self.closed = False
+
+    def write(self, data):
+        self.writes.append((time.monotonic(), data.count(b"PRIVMSG")))
+
+    async def drain(self):
+        pass
+
+    def is_closing(self):
+        return self.closed
+
+    def close(self):
+        self.closed = True
+
+    async def wait_closed(self):
+        pass
+
+
+def _bot(level="normal"):
+    bot = _TwitchIRCBot("bot", "token", "canal", lambda message: None)
+    bot._rate_level = level
+    bot._bucket = _TokenBucket(*RATE_LIMITS[level])
+    return bot
+
+
+def test_moderator_burst_shape():
+    """Como mod: ráfaga de 50 (capacidad del cubo) en escrituras de MAX_BATCH, luego 1 cada 0,6 s."""
+    async def scenario():
+        bot = _bot("moderator")
+        bot.writer = FakeWriter()
+        bot._outbox_ready = asyncio.Event()
+        for i in range(60):
+            bot._enqueue(f"PRIVMSG #canal :respuesta {i}\r\n".encode())
+        sender = asyncio.ensure_future(bot._sender_loop())
+        await asyncio.sleep(0.8)
+        sender.cancel()
+        return bot
+
+    bot = asyncio.run(scenario())
+    sizes = [n for _, n in bot.writer.writes]
+    assert sizes[:3] == [20, 20, 10]
+    assert sizes[3:] == [1]  # Recarga: 100 msgs / 30 s a medias -> una ficha cada 0,6 s
+    start = bot.writer.writes[0][0]
+    assert bot.writer.writes[2][0] - start < 0.1
+    assert 0.5 < bot.writer.writes[3][0] - start < 0.75
+    assert len(bot._outbox) == 9
+    assert bot.send_stats()["sent"] == 51
+
+
+def test_normal_burst_never_exceeds_half_the_limit():
+    async def scenario():
+        bot = _bot("normal")
+        bot.writer = FakeWriter()
+        bot._outbox_ready = asyncio.Event()
+        for i in range(30):
+            bot._enqueue(f"PRIVMSG #canal :{i}\r\n".encode())
+        sender = asyncio.ensure_future(bot._sender_loop())
+        await asyncio.sleep(0.2)
+        sender.cancel()
+        return bot
+
+    bot = asyncio.run(scenario())
+    assert [n for _, n in bot.writer.writes] == [10]
+    assert len(bot._outbox) == 20
+
+
+class _ClosingWriter(FakeWriter):
+    """wait_closed() no termina hasta que se cancele: simula un cierre TCP lento."""
+    def __init__(self, closing):
+        super().__init__()
+        self._closing = closing
+
+    async def wait_closed(self):
+        self._closing.set()
+        await asyncio.Event().wait()
+
+
+class _EOFReader:
+    async def read(self, n):
+        return b""
+
+
+def test_cancel_while_closing_writer_stops_sender(monkeypatch):
+    async def scenario():
+        closing = asyncio.Event()
+
+        async def open_connection(host, port):
+            return _EOFReader(), _ClosingWriter(closing)
+
+        monkeypatch.setattr(asyncio, "open_connection", open_connection)
+        bot = _bot()
+        task = asyncio.ensure_future(bot.run())
+        await closing.wait()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        await asyncio.sleep(0)
+        others = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+        return others
+
+    assert asyncio.run(scenario()) == []
@@ -0,0 +1,58 @@
+import threading
+
+from data import usage_counters
+from data.usage_counters import CommandCounterStore
+
+
+class FakeDB:
+    """Tabla 'comandos' en memoria; apply_command_deltas puede quedarse a medias."""
+    def __init__(self):
+        self.counts = {}
+        self.applying = threading.Event()
+        self.release = threading.Event()
+        self.release.set()
+
+    def get_command_counter(self, name):
+        return self.counts.get(name, 0)
+
+    def apply_command_deltas(self, rows):
+        self.applying.set()
+        self.release.wait(5)
+        for delta_count, _, name in rows:
+            self.counts[name] = self.counts.get(name, 0) + delta_count
+
+
+def _store(monkeypatch):
+    fake = FakeDB()
+    monkeypatch.setattr(usage_counters, "db", fake)
+    store = CommandCounterStore()
+    store._running = False  # Sin volcados de fondo: la prueba decide cuándo
+    store._wake.set()
+    store._thread.join(1)
+    return store, fake
+
+
+def test_increments_are_flushed_as_deltas(monkeypatch):
+    store, fake = _store(monkeypatch)
+    fake.counts["!hola"] = 10
+    assert [store.increment_counter("!HOLA") for _ in range(3)] == [11, 12, 13]
+    assert fake.counts["!hola"] == 10
+    store.flush()
+    assert fake.counts["!hola"] == 13
+
+
+def test_reload_during_flush_neither_loses_nor_doubles(monkeypatch):
+    store, fake = _store(monkeypatch)
+    for _ in range(5):
+        store.increment_counter("!a")
+    store.invalidate()
+    fake.release.clear()
+    flusher = threading.Thread(target=store.flush)
+    flusher.start()
+    assert fake.applying.wait(1)  # El lote ya salió de los pendientes pero no está en la BD
+    threading.Timer(0.1, fake.release.set).start()
+    assert store.get_counter("!a") == 5
+    flusher.join(1)
+    assert store.increment_counter("!a") == 6
+    store.flush()
+    assert fake.counts["!a"] == 6
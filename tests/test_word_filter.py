@@ -0,0 +1,57 @@
+import random
+
+from processing.word_filter import BannedWordFilter, normalize_text
+
+
+def naive(words, text):
+    """La comprobación anterior al autómata: subcadena sin distinguir mayúsculas."""
+    return any(w.lower() in text.lower() for w in words if w)
+
+
+def test_substring_and_case_insensitive():
+    f = BannedWordFilter(["Feo", "tonto"])
+    assert f.find("usuario dice qué FEO eres") == "Feo"
+    assert f.contains("no seas tontorrón")
+    assert not f.contains("todo bien")
+
+
+def test_spaces_in_a_term_are_kept():
+    f = BannedWordFilter([" ass "])
+    assert f.contains("what an ass here")
+    assert not f.contains("first class seats")
+    assert not f.contains("ass")  # Sin espacios alrededor no es la palabra suelta
+
+
+def test_empty_terms_are_ignored():
+    f = BannedWordFilter(["", "malo"])
+    assert not f.contains("todo bien")
+    assert f.contains("algo malo")
+    assert not BannedWordFilter([""]).contains("cualquier cosa")
+
+
+def test_normalization_catches_accents_and_leet():
+    f = BannedWordFilter(["pollo"], normalize=True)
+    assert f.contains("qué P0LL0 más rico")
+    assert f.contains("póllo")
+    assert not BannedWordFilter(["pollo"]).contains("p0ll0")
+    assert normalize_text("Ñandú 4$!") == "nandu asi"
+
+
+def test_recompile_only_when_changed():
+    f = BannedWordFilter(["a"])
+    automaton = f._automaton
+    f.compile(["a"])
+    assert f._automaton is automaton
+    f.compile(["b"])
+    assert f.contains("b") and not f.contains("a")
+    f.compile([])
+    assert not f.contains("b") and len(f) == 0
+
+
+def test_matches_naive_substring_search():
+    rng = random.Random(11)
+    alphabet = "abc "
+    for _ in range(300):
+        words = ["".join(rng.choice(alphabet) for _ in range(rng.randint(1, 4))) for _ in range(rng.randint(1, 6))]
+        text = "".join(rng.choice(alphabet + "ABC") for _ in range(rng.randint(0, 30)))
+        assert BannedWordFilter(words).contains(text) == naive(words, text), (words, text)
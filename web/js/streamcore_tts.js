@@ -1,16 +1,9 @@
 // streamcore_tts.js - TTS Híbrido (WebAudio + Backend Control)
 
-// Cola de TTS
-let ttsQueue = []; // { id, user, message, audio, status: 'pending'|'playing' }
-let currentlyPlayingId = null;
+// Cola de TTS: la lleva Python (get_tts_queue); aquí solo se pinta
+let ttsSnapshot = { playing: null, preparing: [], pending: [] };
 let ttsEnabled = true;
 
-// Audio / WebAudio (Solo para pruebas locales en navegador)
-let audioCtx = null;
-let gainNode = null;
-let currentSource = null;
-
-// Valores de control (por defecto)
 // Valores de control (por defecto)
 let controlVolume = 80; 
 let controlSpeed = 0.7; // <--- CAMBIO CLAVE: De 1.0 a 0.6
@@ -41,33 +34,53 @@ function escapeHtml(text){
 }
 
 // ----------------- UI / Cola -----------------
+async function refreshQueue(){
+    if(!window.pywebview || !window.pywebview.api || !window.pywebview.api.get_tts_queue) return;
+    try {
+        const res = await window.pywebview.api.get_tts_queue();
+        if(res && res.success){
+            ttsSnapshot = res.data;
+            ttsEnabled = res.data.enabled;
+            const enableBtn = document.getElementById('enableTtsBtn');
+            if(enableBtn) enableBtn.textContent = ttsEnabled ? 'Pausar TTS' : 'Activar TTS';
+            updateQueueUI();
+        }
+    } catch(e){ console.error('Error leyendo la cola TTS', e); }
+}
+
 function updateQueueUI(){
     const list = document.getElementById('queueList');
     const count = document.getElementById('queueCount');
     if(!list || !count) return;
 
+    const items = [];
+    if(ttsSnapshot.playing) items.push({ ...ttsSnapshot.playing, status: 'playing' });
+    (ttsSnapshot.preparing || []).forEach(i => items.push({ ...i, status: 'preparing' }));
+    (ttsSnapshot.pending || []).forEach(i => items.push({ ...i, status: 'pending' }));
+
     list.innerHTML = '';
-    if(ttsQueue.length === 0){
+    if(items.length === 0){
         list.innerHTML = `<div style="padding:24px; color:#A9A9A9;">No hay mensajes en la cola</div>`;
         count.textContent = 'Cola vacía';
         return;
     }
 
-    count.textContent = ttsQueue.length === 1 ? '1 mensaje' : `${ttsQueue.length} mensajes`;
+    count.textContent = items.length === 1 ? '1 mensaje' : `${items.length} mensajes`;
 
-    ttsQueue.forEach(item=>{
+    const labels = { playing: 'Reproduciendo', preparing: 'Preparando', pending: 'En cola' };
+    items.forEach(item=>{
         const div = document.createElement('div');
-        div.className = 'queue-item ' + (item.status || 'pending');
+        div.className = 'queue-item ' + item.status;
         div.style.padding = '12px';
         div.style.borderBottom = '1px solid rgba(255,255,255,0.03)';
         div.innerHTML = `
             <div style="display:flex; justify-content:space-between; align-items:center;">
                 <strong style="font-size:14px;">${escapeHtml(item.user)}</strong>
-                <span style="font-size:12px; opacity:0.8;">${item.status === 'playing' ? 'Reproduciendo' : 'En cola'}</span>
+                <span style="font-size:12px; opacity:0.8;">${labels[item.status]} · ${Math.round(item.age)}s</span>
             </div>
             <div style="margin-top:8px; font-size:13px;">${escapeHtml(item.message)}</div>
             <div style="margin-top:8px;">
-                <button class="btn" onclick="skipTTS(${item.id})" style="margin-right:8px;">Saltar</button>
+                ${item.status === 'playing' ? `<button class="btn" onclick="skipTTS()" style="margin-right:8px;">Saltar</button>` : ''}
                 <button class="btn" onclick="removeTTS(${item.id})">Eliminar</button>
             </div>
         `;
@@ -75,139 +88,20 @@ function updateQueueUI(){
     });
 }
 
-function enqueueTTS(user, message, audioBase64=null){
-    const item = {
-        id: Date.now() + Math.floor(Math.random()*999),
-        user: user || 'Anon',
-        message: message || '',
-        audio: audioBase64 || null,
-        status: 'pending'
-    };
-    ttsQueue.push(item);
-    updateQueueUI();
-
-    if(!currentlyPlayingId && ttsEnabled){
-        playNextTTS();
-    }
-}
-
-// ----------------- WebAudio Setup -----------------
-function setupAudioSystemPro(){
-    if(!audioCtx){
-        audioCtx = new (window.AudioContext || window.webkitAudioContext)();
-    }
-    if(!gainNode){
-        gainNode = audioCtx.createGain();
-        gainNode.gain.value = controlVolume/100;
-        gainNode.connect(audioCtx.destination);
-    }
-}
-
-// ----------------- REPRODUCCIÓN (LÓGICA HÍBRIDA) -----------------
-async function playNextTTS(){
-    if(!ttsEnabled) return;
-    if(currentlyPlayingId) return;
-
-    const next = ttsQueue.find(i=>i.status==='pending');
-    if(!next) return;
-
-    next.status = 'playing';
-    currentlyPlayingId = next.id;
-    updateQueueUI();
-
-    setupAudioSystemPro();
-
-    try {
-        let base64Audio = next.audio;
-
-        // [MODIFICACIÓN IMPORTANTE]
-        // Si NO hay audio Base64, asumimos que el Backend (Python) lo está reproduciendo.
-        // Aquí solo mostramos la animación visual para no duplicar el sonido.
-        if(!base64Audio){
-            console.log("Audio gestionado por Backend (Segundo plano). Modo visual activo.");
-            
-            // Calculamos duración visual estimada (100ms por letra + 1s base)
-            const estimatedDuration = 1000 + (next.message.length * 100);
-
-            setTimeout(() => {
-                finishCurrentAndContinue(next.id);
-            }, estimatedDuration);
-            
-            return; // SALIR AQUÍ: No reproducir nada en el navegador
-        }
-
-        // [SI HAY AUDIO] (Ej: Botón de prueba "Test TTS")
-        // Reproducimos usando el navegador
-        const response = await fetch(base64Audio);
-        const arrayBuffer = await response.arrayBuffer();
-        const audioBuffer = await audioCtx.decodeAudioData(arrayBuffer);
-
-        if(currentSource){
-            currentSource.stop();
-        }
-
-        const source = audioCtx.createBufferSource();
-        source.buffer = audioBuffer;
-        
-        // Aplicamos efectos locales (Solo funcionan en pruebas web)
-        source.playbackRate.value = controlSpeed;
-        source.detune.value = controlPitchSemitones * 100; 
-        source.connect(gainNode);
-
-        source.onended = () => {
-            currentSource = null;
-            finishCurrentAndContinue(next.id);
-        };
-
-        currentSource = source;
-        source.start();
-
-    } catch(err){
-        console.error('Error reproduciendo TTS:', err);
-        finishCurrentAndContinue(next.id);
-    }
-}
-
-function finishCurrentAndContinue(id){
-    ttsQueue = ttsQueue.filter(i=>i.id!==id);
-    currentlyPlayingId = null;
-    updateQueueUI();
-    setTimeout(()=>playNextTTS(), 200);
-}
-
 // ----------------- Saltar / Eliminar -----------------
-function skipTTS(id){
-    // Si estamos reproduciendo audio web (Test), lo detenemos
-    if(currentlyPlayingId===id && currentSource){
-        currentSource.stop();
-        currentSource = null;
+function skipTTS(){
+    if (window.pywebview && window.pywebview.api) {
+        window.pywebview.api.skip_tts().then(refreshQueue);
     }
-    // Si es backend, no podemos detener el audio de python desde aquí fácilmente,
-    // pero limpiamos la UI inmediatamente.
-    
-    finishCurrentAndContinue(id);
 }
 
 function removeTTS(id){
-    // Si intentamos borrar algo que no se está reproduciendo
-    if (currentlyPlayingId !== id) {
-        ttsQueue = ttsQueue.filter(i=>i.id!==id);
-        updateQueueUI();
-    } else {
-        skipTTS(id);
+    if (window.pywebview && window.pywebview.api) {
+        window.pywebview.api.remove_tts_item(id).then(refreshQueue);
     }
 }
 
 // ----------------- Sliders / Controles -----------------
-function applyControlsPro(){
-    // Aplica cambios al audio web actual (si hay uno sonando)
-    if(gainNode) gainNode.gain.value = controlVolume/100;
-    if(currentSource){
-        currentSource.playbackRate.value = controlSpeed;
-        currentSource.detune.value = controlPitchSemitones*100;
-    }
-}
-
 function getUISpeed(rawValue) {
     // Convierte el valor REAL (0.6) al valor VISUAL (1.0)
     // Usamos parseFloat para asegurar la suma numérica
@@ -280,7 +174,6 @@ async function initControlsBindings(){
         volumeSlider.addEventListener('input', function(){
             controlVolume = parseInt(this.value) || 80;
             if(volumeValue) volumeValue.textContent = controlVolume + '%';
-            applyControlsPro();
             sendConfigToBackend();
         });
     }
@@ -298,32 +191,21 @@ async function initControlsBindings(){
 }
 
 // ----------------- Eventos pywebview -----------------
-window.addEventListener("tts:new", async (ev) => {
-    try {
-        const data = ev.detail || {};
-        const user = data.user || 'Anon';
-        const message = data.message || '';
-        const audio = data.audio || null; // Si es null, es modo Backend
-        enqueueTTS(user, message, audio);
-    } catch(e){ console.error('Error manejando tts:new', e); }
-});
+// Python avisa con 'tts:queue' cada vez que la cola cambia
+window.addEventListener("tts:queue", refreshQueue);
+window.addEventListener('pywebviewready', refreshQueue);
 
 // ----------------- Inicialización -----------------
 window.addEventListener('DOMContentLoaded',()=>{
-    setupAudioSystemPro();
     initControlsBindings();
 
     const enableBtn = document.getElementById('enableTtsBtn');
     if(enableBtn){
-        enableBtn.addEventListener('click', ()=>{
-            ttsEnabled = !ttsEnabled;
-            enableBtn.textContent = ttsEnabled ? 'Pausar TTS' : 'Activar TTS';
-            if(ttsEnabled) playNextTTS();
-        });
         enableBtn.textContent = ttsEnabled ? 'Pausar TTS' : 'Activar TTS';
     }
 
     updateQueueUI();
+    refreshQueue();
 });
 
 // ----------------- TEST TTS DESDE LA UI (MODO REAL) -----------------
@@ -340,8 +222,8 @@ async function testTTS(){
 
     // [CAMBIO IMPORTANTE]
     // En lugar de pedir el audio para tocarlo aquí, enviamos el mensaje 
-    // a la cola del Backend. Python se encargará del audio y enviará 
-    // el evento 'tts:new' para que se actualice la lista visual.
+    // a la cola del Backend. Python se encargará del audio y avisará
+    // con 'tts:queue' para que se actualice la lista visual.
     try {
         const res = await window.pywebview.api.tts_enqueue("Prueba", text);
         
@@ -349,7 +231,7 @@ async function testTTS(){
             alert("Error al encolar el TTS de prueba.");
         }
         // No necesitamos hacer nada más aquí. 
-        // El evento 'tts:new' que emite Python actualizará la UI automáticamente.
+        // El aviso 'tts:queue' que emite Python actualizará la UI automáticamente.
     } catch(e) {
         console.error("Error al llamar a tts_enqueue:", e);
     }
@@ -370,7 +252,6 @@ function toggleTTS() {
                 enableBtn.textContent = newState ? 'Pausar TTS' : 'Activar TTS';
                 // ... (lógica de clases visuales) ...
 
-                if (ttsEnabled) playNextTTS(); // Si activamos, intentamos reproducir
             }
         });
     }
@@ -382,10 +263,7 @@ function toggleTTS() {
 function clearQueue() {
     if (window.pywebview && window.pywebview.api) {
         window.pywebview.api.clear_tts_queue().then(res => {
-            if (res.success) {
-                ttsQueue = []; // Limpiamos la cola visual de JavaScript
-                updateQueueUI(); 
-            }
+            if (res.success) refreshQueue();
         });
     }
 }